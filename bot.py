@@ -4,7 +4,7 @@ import os
 import config
 import asyncio
 from datetime import datetime
-from flask import Flask
+from flask import Flask, request
 from threading import Thread
 
 # Set up Flask web server
@@ -14,6 +14,14 @@ app = Flask(__name__)
 def home():
     return "Bot is running!"
 
+@app.route('/youtube/websub', methods=['GET', 'POST'])
+def youtube_websub():
+    """WebSub callback for instant YouTube upload notifications."""
+    cog = bot.get_cog("YouTubeNotifications")
+    if cog is None:
+        return "YouTube notifications are not loaded", 503
+    return cog.handle_websub(request.method, request.args, request.headers, request.get_data())
+
 def run_web_server():
     app.run(host='0.0.0.0', port=8080)
 
@@ -53,6 +61,7 @@ async def on_ready():
     # Load all cogs
     async def load_extensions():
         for extension in [
+            "cogs.name_index",
             "cogs.moderation", 
             "cogs.roles", 
             "cogs.utils",
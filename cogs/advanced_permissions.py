@@ -1,31 +1,110 @@
 import discord
 from discord.ext import commands
+from discord.flags import alias_flag_value
 import config
+from cogs.name_index import did_you_mean
+from permissions.store import JsonStore
+from permissions.scheduler import PermissionScheduler
+from permissions.progress import ProgressReporter
+from permissions.snapshots import PermissionSnapshotStore
+from permissions.index import PermissionIndex
+from permissions.drift import PermissionDriftDetector
+from permissions.effective import EffectivePermissionResolver
+from permissions.classifier import ChannelClassifier
+from permissions.policy import PermissionPolicy
 import asyncio
-import json
+import copy
+import csv
+import gzip
+import io
 import os
+import tempfile
 from typing import Optional, List, Dict, Union, Tuple
 import datetime
 
+# Canonical permission names (aliases such as view_channel are left out) mapped to their bit values
+PERMISSION_FLAGS = {
+    name: value for name, value in discord.Permissions.VALID_FLAGS.items()
+    if not isinstance(discord.Permissions.__dict__.get(name), alias_flag_value)
+}
+
+# Channel name keywords for each label of the built-in presets, checked in this order
+CHANNEL_PRESETS = {
+    "crypto": {
+        "public": ["welcome", "rules", "verification", "faq", "announcements"],
+        "info_only": ["announcements", "news", "updates"],
+        "verified_only": ["general", "chat", "discussion", "price", "trading", "market", "analysis", "signals"],
+        "trader_only": ["signals", "vip", "premium"],
+        "admin_only": ["admin", "mod", "staff"]
+    },
+    "community": {
+        "public": ["welcome", "rules", "verification", "announcements"],
+        "info_only": ["announcements", "news", "updates", "rules"],
+        "verified_only": ["general", "chat", "discussion", "media", "memes", "showcase", "support"],
+        "admin_only": ["admin", "mod", "staff"]
+    },
+    "minimal": {
+        "public": ["welcome", "rules", "verification"],
+        "verified_only": ["general", "chat"],
+        "admin_only": ["admin"]
+    }
+}
+
+# Channel name keywords used by setup_xgc_permissions
+XGC_CHANNEL_KEYWORDS = {
+    "public": ["verification", "welcome", "rules", "total-members", "xrp-price", "xrp_price"],
+    "info_only": ["welcome", "rules", "announcement", "news", "roles"],
+    "general": ["general", "chat", "voice", "raid", "giveaway", "game", "project"],
+    "alpha": ["alpha"],
+    "mod": ["mod", "admin", "log", "staff", "bot-log", "modlog", "testing"],
+    "bot": ["bot-log", "bot_log"]
+}
+
+# Channel name keywords used by quicksetup
+QUICKSETUP_CHANNEL_KEYWORDS = {
+    "public": ["welcome", "verify", "rules"],
+    "trading": ["trading", "market", "price"],
+    "community": ["general", "chat", "discussion"],
+    "admin": ["admin", "mod", "staff"]
+}
+
 class AdvancedPermissions(commands.Cog):
     """Advanced permission management for Discord servers."""
 
     def __init__(self, bot):
         self.bot = bot
         self.permissions_file = "channel_permissions.json"
+        self.policy_dir = "policies"
+        self.permissions_store = JsonStore(self.permissions_file)
         self.permissions_data = self.load_permissions()
+        self.scheduler = PermissionScheduler(bot)
+        # Lockdowns are latency-critical, so they fan out wider; each channel has its own edit bucket
+        self.lockdown_scheduler = PermissionScheduler(bot, concurrency=25)
+        self.snapshots = PermissionSnapshotStore()
+        self.index = PermissionIndex()
+        self.resolver = EffectivePermissionResolver(self.index)
+        self.index.set_groups(self.permissions_data["channel_groups"])
+        self.jobs_store = JsonStore("permission_jobs.json", delay=1.0, journal=False)
+        self.jobs_data = self.jobs_store.load() or {"next_id": 1, "jobs": []}
+        self.classifier = ChannelClassifier()
+        for preset_name, keywords in CHANNEL_PRESETS.items():
+            self.classifier.register(f"preset:{preset_name}", keywords)
+        self.classifier.register("xgc", XGC_CHANNEL_KEYWORDS)
+        self.classifier.register("quicksetup", QUICKSETUP_CHANNEL_KEYWORDS)
+        self.drift = PermissionDriftDetector()
+        self._own_writes = {}  # channel_id -> overwrites the cog is writing, to tell its edits from manual ones
+        self._heal_tasks = {}  # guild_id -> pending auto-heal
     
     def load_permissions(self) -> Dict:
-        """Load permissions data from file or create default data structure."""
-        if os.path.exists(self.permissions_file):
-            try:
-                with open(self.permissions_file, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"Error loading permissions file: {e}")
-                return self.get_default_permissions()
-        else:
+        """Load permissions data (including journaled changes) or create default data structure."""
+        data = self.permissions_store.load()
+        if data is None:
             return self.get_default_permissions()
+        
+        # A corrupt file leaves only the journaled keys, so fill in whatever is missing
+        for key, value in self.get_default_permissions().items():
+            data.setdefault(key, value)
+        return data
     
     def get_default_permissions(self) -> Dict:
         """Return default permissions data structure."""
@@ -39,18 +118,615 @@ class AdvancedPermissions(commands.Cog):
             }
         }
     
-    def _save_permissions_data(self):
-        """Save permissions data to file."""
-        try:
-            with open(self.permissions_file, 'w') as f:
-                json.dump(self.permissions_data, f, indent=4)
-        except Exception as e:
-            print(f"Error saving permissions file: {e}")
+    def _save_permissions_data(self, *keys: str):
+        """Save permissions data; writes are journaled and coalesced by JsonStore.
+        
+        Pass the top-level keys that were changed so only those are journaled.
+        """
+        self.index.set_groups(self.permissions_data["channel_groups"])
+        self.drift.invalidate()
+        self.permissions_store.save(self.permissions_data, list(keys) or None)
+    
+    async def cog_unload(self):
+        """Write any pending changes before the cog goes away."""
+        await self.permissions_store.flush()
+        await self.snapshots.store.flush()
+        await self.jobs_store.flush()
     
     async def cog_check(self, ctx):
         """Check if user has administrator permission."""
         return ctx.author.guild_permissions.administrator
     
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel):
+        """Index the overwrites and name of a new channel."""
+        self.index.update_channel(channel.id, channel.overwrites)
+        self.classifier.update_channel(channel)
+    
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before, after):
+        """Re-index a channel whose overwrites or name changed, and check it for drift."""
+        if before.overwrites != after.overwrites:
+            self.index.update_channel(after.id, after.overwrites)
+            own_write = self._own_writes.pop(after.id, None)
+            source = "bot" if own_write == self._normalize_overwrites(after.overwrites) else "manual"
+            entry = self._check_drift(after, source)
+            if entry and source == "manual" and self.permissions_data.get("drift_auto_heal"):
+                self._schedule_drift_heal(after.guild)
+        if before.name != after.name:
+            self.classifier.update_channel(after)
+    
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        """Drop a deleted channel from the index, classifier and drift report."""
+        self.index.remove_channel(channel.id)
+        self.classifier.remove_channel(channel)
+        self.drift.remove_channel(channel)
+    
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role):
+        """Drop a deleted role's overwrites from the index."""
+        self.index.remove_target(role.id)
+        self.resolver.invalidate_roles()
+        self.drift.invalidate()
+    
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before, after):
+        """Forget cached effective permissions when a role's permissions change."""
+        if before.permissions != after.permissions:
+            self.resolver.invalidate_roles()
+    
+    def _permission_flag(self, permission: str) -> Optional[int]:
+        """Return the bit value of a permission name (aliases included), or None if it is unknown."""
+        return discord.Permissions.VALID_FLAGS.get(permission.lower())
+    
+    def _target_name(self, guild, target_id: int) -> str:
+        """Return a display name for an overwrite target ID."""
+        if target_id == guild.default_role.id:
+            return "@everyone"
+        target = guild.get_role(target_id) or guild.get_member(target_id)
+        return getattr(target, "name", None) or f"ID: {target_id}"
+    
+    def _overwrite_map(self, channel) -> Dict:
+        """Return an editable copy of a channel's current overwrites."""
+        return {
+            target: discord.PermissionOverwrite.from_pair(*overwrite.pair())
+            for target, overwrite in channel.overwrites.items()
+        }
+    
+    def _stage_permissions(self, overwrite_maps: Dict, channel, target, merge: bool = False, **permissions):
+        """Stage a permission change for one target in a channel's overwrite map.
+        
+        By default this replaces the target's overwrite, exactly like
+        channel.set_permissions(target, **permissions). With merge=True the
+        given permissions are applied on top of the already staged overwrite.
+        Overwrites that end up empty are removed from the map, and targets that
+        could not be resolved (None) are ignored.
+        """
+        if target is None:
+            return
+        
+        if channel not in overwrite_maps:
+            overwrite_maps[channel] = self._overwrite_map(channel)
+        
+        if merge and target in overwrite_maps[channel]:
+            overwrite_maps[channel][target].update(**permissions)
+        else:
+            overwrite_maps[channel][target] = discord.PermissionOverwrite(**permissions)
+        
+        if overwrite_maps[channel][target].is_empty():
+            del overwrite_maps[channel][target]
+    
+    def _normalize_overwrites(self, overwrites: Dict) -> Dict[int, Tuple[int, int]]:
+        """Reduce an overwrite map to {target_id: (allow, deny)}, ignoring empty overwrites."""
+        normalized = {}
+        for target, overwrite in overwrites.items():
+            allow, deny = overwrite.pair()
+            if allow.value or deny.value:
+                normalized[target.id] = (allow.value, deny.value)
+        return normalized
+    
+    def _snapshot_overwrites(self, channel) -> Dict[str, dict]:
+        """Capture a channel's overwrites as raw allow/deny bits keyed by target ID."""
+        snapshot = {}
+        for target, overwrite in channel.overwrites.items():
+            allow, deny = overwrite.pair()
+            is_role = isinstance(target, discord.Role) or getattr(target, "type", None) is discord.Role
+            snapshot[str(target.id)] = {
+                "type": "role" if is_role else "member",
+                "allow": allow.value,
+                "deny": deny.value
+            }
+        return snapshot
+    
+    def _restore_overwrites(self, guild, snapshot: Dict[str, dict]) -> Dict:
+        """Rebuild an overwrite map from a snapshot taken with _snapshot_overwrites.
+        
+        Snapshots written by older versions ({role_id or "everyone": {perm: value}})
+        are still accepted. Targets that are no longer cached are restored by ID.
+        """
+        overwrites = {}
+        for target_id, entry in snapshot.items():
+            if "allow" in entry and "deny" in entry:
+                target_type = discord.Role if entry.get("type") == "role" else discord.Member
+                if target_type is discord.Role:
+                    target = guild.get_role(int(target_id))
+                else:
+                    target = guild.get_member(int(target_id))
+                overwrite = discord.PermissionOverwrite.from_pair(
+                    discord.Permissions(entry["allow"]),
+                    discord.Permissions(entry["deny"])
+                )
+            else:
+                if target_id == "everyone":
+                    target = guild.default_role
+                else:
+                    target = guild.get_role(int(target_id)) or guild.get_member(int(target_id))
+                target_type = discord.Role
+                overwrite = discord.PermissionOverwrite(**entry)
+            
+            if target is None:
+                target = discord.Object(id=int(target_id), type=target_type)
+            if not overwrite.is_empty():
+                overwrites[target] = overwrite
+        return overwrites
+    
+    def _plan_overwrite_changes(self, overwrite_maps: Dict) -> Tuple[Dict, List]:
+        """Split staged overwrite maps into channels that need an edit and channels already in that state.
+        
+        The comparison is done against channel.overwrites from the local cache,
+        so planning never touches the Discord API.
+        """
+        changed = {}
+        unchanged = []
+        for channel, overwrites in overwrite_maps.items():
+            if self._normalize_overwrites(overwrites) == self._normalize_overwrites(channel.overwrites):
+                unchanged.append(channel)
+            else:
+                changed[channel] = overwrites
+        return changed, unchanged
+    
+    def _collapse_synced_children(self, overwrite_maps: Dict, changed: Dict) -> Tuple[Dict, Dict]:
+        """Replace edits to a category's synced children with a single edit to the category.
+        
+        This only happens when every synced child of the category is being
+        changed to the same overwrites, and the category itself isn't staged with
+        something else, so no channel ends up with permissions it wasn't meant to
+        get. Children that are out of sync keep their individual edits. Returns
+        the edits to make and {category: [children that inherit its edit]}.
+        """
+        by_category = {}
+        for channel in changed:
+            category = getattr(channel, "category", None)
+            if category is not None and channel.permissions_synced:
+                by_category.setdefault(category, []).append(channel)
+        
+        edits = dict(changed)
+        inherited = {}
+        for category, children in by_category.items():
+            if len(children) < 2:
+                continue  # Nothing to save
+            
+            synced_children = [channel for channel in category.channels if channel.permissions_synced]
+            if len(synced_children) != len(children):
+                continue  # Some synced children must keep their current permissions
+            
+            desired = self._normalize_overwrites(changed[children[0]])
+            if any(self._normalize_overwrites(changed[channel]) != desired for channel in children[1:]):
+                continue
+            if category in overwrite_maps and self._normalize_overwrites(overwrite_maps[category]) != desired:
+                continue
+            
+            edits[category] = changed[children[0]]
+            for channel in children:
+                del edits[channel]
+            inherited[category] = children
+        
+        return edits, inherited
+    
+    async def _apply_overwrite_maps(self, overwrite_maps: Dict, reason: Optional[str] = None,
+                                    scheduler: Optional[PermissionScheduler] = None,
+                                    on_result=None,
+                                    progress: Optional[ProgressReporter] = None,
+                                    timings: Optional[Dict] = None) -> Tuple[List, List, List[str]]:
+        """Write every staged overwrite map with a single channel.edit() call per channel.
+        
+        Channels that already have the staged overwrites are skipped, synced
+        children of a category are changed through one category edit where
+        possible, and the remaining edits run concurrently through the shared
+        scheduler. Returns
+        the modified channels, the channels that were already up to date and a
+        list of error messages. on_result(channel, error), if given, is called
+        for every changed channel as soon as its edit finishes, and progress,
+        if given, is advanced for it. timings, if given, is filled with
+        {channel: (seconds, edited channel)} for every changed channel; the
+        edited channel is its category when it changed through category sync.
+        """
+        changed, unchanged = self._plan_overwrite_changes(overwrite_maps)
+        edits, inherited = self._collapse_synced_children(overwrite_maps, changed)
+        if progress is not None:
+            progress.start(len(changed))
+        
+        async def edit_channel(channel):
+            for target_channel in [channel] + inherited.get(channel, []):
+                self._own_writes[target_channel.id] = self._normalize_overwrites(edits[channel])
+            await channel.edit(overwrites=edits[channel], reason=reason)
+        
+        def report(channel, error, elapsed):
+            for target_channel in [channel] + inherited.get(channel, []):
+                if target_channel in changed:
+                    if on_result is not None:
+                        on_result(target_channel, error)
+                    if progress is not None:
+                        progress.advance(error)
+        
+        results = await (scheduler or self.scheduler).run(list(edits), edit_channel, on_result=report)
+        if progress is not None:
+            await progress.close()
+        
+        modified_channels = []
+        errors = []
+        for channel, error, elapsed in results:
+            if timings is not None:
+                for target_channel in [channel] + inherited.get(channel, []):
+                    if target_channel in changed:
+                        timings[target_channel] = (elapsed, channel)
+            if error is None:
+                # Synced children pick up their category's new overwrites without an edit of their own
+                for target_channel in [channel] + inherited.get(channel, []):
+                    if target_channel in changed:
+                        modified_channels.append(target_channel)
+                    # Keep the index and drift report current without waiting for the gateway event
+                    self.index.update_channel(target_channel.id, edits[channel])
+                    if self.drift.has_guild(target_channel.guild):
+                        self.drift.check_channel(target_channel, "bot", edits[channel])
+            elif isinstance(error, discord.Forbidden):
+                errors.append(f"I don't have permission to modify channel {channel.name}.")
+            else:
+                errors.append(f"Error setting permissions for {channel.name}: {str(error)}")
+        
+        return modified_channels, unchanged, errors
+    
+    def _split_plan_flag(self, args) -> Tuple[bool, tuple]:
+        """Remove --plan from command arguments and report whether it was given."""
+        return "--plan" in args, tuple(arg for arg in args if arg != "--plan")
+    
+    def _working_data(self, plan: bool) -> Dict:
+        """Return the permissions data a command should change; a private copy when it is only planning."""
+        return copy.deepcopy(self.permissions_data) if plan else self.permissions_data
+    
+    def _describe_overwrite_changes(self, channel, overwrites: Dict, current: Optional[Dict] = None) -> List[str]:
+        """Describe how a staged overwrite map differs from the channel's cached overwrites (or from current)."""
+        if current is None:
+            current = channel.overwrites
+        targets = {target.id: target for target in current}
+        targets.update({target.id: target for target in overwrites})
+        before = self._normalize_overwrites(current)
+        after = self._normalize_overwrites(overwrites)
+        
+        def state(allow, deny, flag):
+            if allow & flag:
+                return "✅"
+            if deny & flag:
+                return "❌"
+            return "⬜"
+        
+        lines = []
+        for target_id, target in targets.items():
+            old_allow, old_deny = before.get(target_id, (0, 0))
+            new_allow, new_deny = after.get(target_id, (0, 0))
+            if (old_allow, old_deny) == (new_allow, new_deny):
+                continue
+            
+            changes = []
+            for perm_name, flag in PERMISSION_FLAGS.items():
+                old_state = state(old_allow, old_deny, flag)
+                new_state = state(new_allow, new_deny, flag)
+                if old_state != new_state:
+                    changes.append(f"{perm_name} {old_state}→{new_state}")
+            
+            target_name = getattr(target, "name", None) or f"ID: {target.id}"
+            lines.append(f"{target_name}: {', '.join(changes)}")
+        
+        return lines
+    
+    async def _send_plan(self, ctx, overwrite_maps: Dict, title: str, scheduler: Optional[PermissionScheduler] = None):
+        """Show what applying the staged overwrite maps would change, without touching Discord."""
+        scheduler = scheduler or self.scheduler
+        changed, unchanged = self._plan_overwrite_changes(overwrite_maps)
+        edits, inherited = self._collapse_synced_children(overwrite_maps, changed)
+        estimate = scheduler.estimate_seconds(channel.id for channel in edits)
+        
+        embed = discord.Embed(
+            title=f"📝 Plan: {title}",
+            description="Nothing has been changed. Run the command again without `--plan` to apply it.",
+            color=discord.Color.blue()
+        )
+        embed.add_field(name="Channels to change", value=str(len(changed)), inline=True)
+        embed.add_field(name="Already up to date", value=str(len(unchanged)), inline=True)
+        embed.add_field(name="REST calls", value=str(len(edits)), inline=True)
+        embed.add_field(
+            name="Estimated time",
+            value=f"~{estimate:.1f}s at {scheduler.concurrency} concurrent edits",
+            inline=True
+        )
+        if inherited:
+            embed.add_field(
+                name="Inherited via category sync",
+                value=f"{sum(len(children) for children in inherited.values())} channels through {len(inherited)} category edits",
+                inline=True
+            )
+        
+        lines = []
+        for category, children in inherited.items():
+            lines.append(f"📁 {category.name}: one category edit for {len(children)} synced channels")
+        for channel, overwrites in changed.items():
+            lines.append(f"#{channel.name} [ID: {channel.id}]")
+            lines.extend(f"  {line}" for line in self._describe_overwrite_changes(channel, overwrites))
+        await self._send_with_details(ctx, embed, "\n".join(lines), "permission_plan.txt")
+    
+    async def _send_with_details(self, ctx, embed: discord.Embed, details: str, filename: str, field_name: str = "Changes"):
+        """Send an embed with a details field, attaching the details as a file when they don't fit."""
+        if len(details) <= 1024:
+            embed.add_field(name=field_name, value=details or "None", inline=False)
+            await ctx.send(embed=embed)
+        else:
+            embed.add_field(name=field_name, value="See the attached file.", inline=False)
+            details_file = discord.File(io.BytesIO(details.encode("utf-8")), filename=filename)
+            await ctx.send(embed=embed, file=details_file)
+    
+    def _save_jobs(self):
+        """Save bulk permission jobs; writes are coalesced by JsonStore."""
+        self.jobs_store.save(self.jobs_data)
+    
+    async def cog_load(self):
+        """Resume bulk permission jobs that were interrupted by a restart and check for drift."""
+        asyncio.ensure_future(self._resume_jobs())
+        asyncio.ensure_future(self._scan_drift())
+    
+    async def _resume_jobs(self):
+        """Pick up every job that was still running when the bot stopped."""
+        await self.bot.wait_until_ready()
+        for job in self.jobs_data["jobs"]:
+            if job["status"] != "running":
+                continue
+            
+            guild = self.bot.get_guild(job["guild_id"])
+            if not guild:
+                job["status"] = "failed"
+                job["errors"].append("The server is no longer available.")
+                continue
+            
+            completed = set(job["completed"])
+            overwrite_maps = {}
+            for channel_id, state in job["channels"].items():
+                channel = guild.get_channel(int(channel_id))
+                if channel and channel.id not in completed:
+                    overwrite_maps[channel] = self._restore_overwrites(guild, PermissionSnapshotStore.overwrite_entries(state))
+            
+            notify_channel = guild.get_channel(job.get("notify_channel_id") or 0)
+            progress = None
+            if notify_channel:
+                try:
+                    status_msg = await notify_channel.send(f"♻️ Resuming job #{job['id']} ({job['name']}): {len(overwrite_maps)} channels left.")
+                    progress = ProgressReporter(status_msg, f"Resuming job #{job['id']}")
+                except discord.HTTPException:
+                    notify_channel = None
+            
+            modified_channels, unchanged_channels, errors = await self._execute_job(guild, job, overwrite_maps, progress)
+            if notify_channel:
+                await notify_channel.send(f"✅ Job #{job['id']} ({job['name']}) finished after restart. Modified permissions for {len(modified_channels)} channels ({len(unchanged_channels)} already up to date, {len(errors)} errors).")
+        
+        self._save_jobs()
+    
+    async def _run_job(self, ctx, name: str, overwrite_maps: Dict, reason: Optional[str] = None,
+                       progress: Optional[ProgressReporter] = None, snapshot_name: Optional[str] = None,
+                       lockdown: Optional[str] = None) -> Tuple[List, List, List[str]]:
+        """Apply staged overwrite maps as a persisted job that checkpoints every channel.
+        
+        The target state of every channel is saved before the first edit, so a
+        job interrupted by a restart is resumed from the channels it hadn't
+        finished yet. If snapshot_name is given, a "before" snapshot is taken
+        by _execute_job. lockdown is the lockdown mode of a lockdown job.
+        Returns the same values as _apply_overwrite_maps.
+        """
+        job = {
+            "id": self.jobs_data["next_id"],
+            "guild_id": ctx.guild.id,
+            "name": name,
+            "reason": reason,
+            "notify_channel_id": ctx.channel.id,
+            "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "status": "running",
+            "channels": {
+                str(channel.id): PermissionSnapshotStore.channel_state(overwrites)
+                for channel, overwrites in overwrite_maps.items()
+            },
+            "completed": [],
+            "errors": [],
+            "snapshot_name": snapshot_name,
+            "snapshot_id": None,
+            "lockdown": lockdown
+        }
+        self.jobs_data["next_id"] += 1
+        self.jobs_data["jobs"].append(job)
+        
+        # Keep the 20 most recent finished jobs
+        finished = [other for other in self.jobs_data["jobs"] if other["status"] != "running"]
+        for other in finished[:-20]:
+            self.jobs_data["jobs"].remove(other)
+        
+        self._save_jobs()
+        return await self._execute_job(ctx.guild, job, overwrite_maps, progress)
+    
+    async def _execute_job(self, guild, job: Dict, overwrite_maps: Dict,
+                           progress: Optional[ProgressReporter] = None) -> Tuple[List, List, List[str]]:
+        """Apply a job's remaining channels, checkpointing each one as it finishes."""
+        _, unchanged = self._plan_overwrite_changes(overwrite_maps)
+        job["completed"].extend(channel.id for channel in unchanged)
+        
+        # Take the "before" snapshot right before the first edit and keep its ID
+        # with the job, so a resumed job doesn't snapshot its own half-applied state
+        if job.get("snapshot_name") and job.get("snapshot_id") is None:
+            job["snapshot_id"] = self.snapshots.take(guild, job["snapshot_name"])["id"]
+            if job.get("lockdown"):
+                self._record_lockdown(guild, job)
+        self._save_jobs()
+        
+        def checkpoint(channel, error):
+            if error is None:
+                job["completed"].append(channel.id)
+            self._save_jobs()
+        
+        scheduler = self.lockdown_scheduler if job.get("lockdown") else None
+        modified_channels, unchanged_channels, errors = await self._apply_overwrite_maps(overwrite_maps, reason=job["reason"], scheduler=scheduler,
+                                                                                         on_result=checkpoint, progress=progress)
+        
+        if job["status"] == "running":
+            job["status"] = "completed_with_errors" if errors else "completed"
+        job["errors"].extend(errors[:50])
+        job["finished_at"] = datetime.datetime.now().isoformat(timespec="seconds")
+        self._save_jobs()
+        return modified_channels, unchanged_channels, errors
+    
+    def _record_lockdown(self, guild, job: Dict):
+        """Save the pre-lockdown overwrites of a lockdown job's channels so unlock can restore them.
+        
+        Channels that are already locked keep their pre-lockdown snapshot.
+        """
+        snapshot = self.permissions_data.setdefault("original_permissions", {})
+        locked_channels = self.permissions_data.setdefault("locked_channels", [])
+        for channel_id in job["channels"]:
+            channel = guild.get_channel(int(channel_id))
+            if not channel:
+                continue
+            if channel.id not in locked_channels or channel_id not in snapshot:
+                snapshot[channel_id] = self._snapshot_overwrites(channel)
+            if channel.id not in locked_channels:
+                locked_channels.append(channel.id)
+        self._save_permissions_data("original_permissions", "locked_channels")
+    
+    def _expected_permissions(self, guild) -> Dict[int, Dict[int, Tuple[int, int, int]]]:
+        """Compile the stored settings into {channel_id: {target_id: (allow, deny, mask)}}.
+        
+        Only the permissions the settings mention are in the mask. Channels
+        under a lockdown are left out, since they are meant to differ.
+        """
+        expected = {}
+        locked = set(self.permissions_data.get("locked_channels", []))
+        
+        def expect(channel_id, target_id, permissions):
+            if channel_id in locked or guild.get_channel(channel_id) is None:
+                return
+            allow, deny, mask = expected.setdefault(channel_id, {}).get(target_id, (0, 0, 0))
+            for perm_name, value in permissions.items():
+                flag = self._permission_flag(perm_name)
+                if flag is None:
+                    continue
+                mask |= flag
+                allow &= ~flag
+                deny &= ~flag
+                if value is True:
+                    allow |= flag
+                elif value is False:
+                    deny |= flag
+            expected[channel_id][target_id] = (allow, deny, mask)
+        
+        for channel_id in self.permissions_data["public_channels"]:
+            expect(channel_id, guild.default_role.id, {"read_messages": True})
+        
+        # Group settings are applied after channel settings, like apply_permissions does
+        for role_id, role_data in self.permissions_data["role_permissions"].items():
+            if not role_id.isdigit() or guild.get_role(int(role_id)) is None:
+                continue
+            for channel_id, permissions in role_data.get("channels", {}).items():
+                expect(int(channel_id), int(role_id), permissions)
+            for group_name, permissions in role_data.get("groups", {}).items():
+                for channel_id in self.permissions_data["channel_groups"].get(group_name, []):
+                    expect(channel_id, int(role_id), permissions)
+        
+        return expected
+    
+    def _check_drift(self, channel, source: str = "manual") -> Optional[Dict]:
+        """Check a channel for drift, compiling the guild's expected state first if needed."""
+        if not self.drift.has_guild(channel.guild):
+            self.drift.set_expected(channel.guild, self._expected_permissions(channel.guild))
+        return self.drift.check_channel(channel, source)
+    
+    def _refresh_drift(self, guild) -> Dict[int, Dict]:
+        """Return the current drift entries of a guild, recompiling the expected state if needed."""
+        if not self.drift.has_guild(guild):
+            self.drift.set_expected(guild, self._expected_permissions(guild))
+        return self.drift.for_guild(guild)
+    
+    async def _scan_drift(self):
+        """Compile the expected state of every guild once the cache is ready; events keep it current."""
+        await self.bot.wait_until_ready()
+        for guild in self.bot.guilds:
+            self._refresh_drift(guild)
+    
+    def _stage_drift_heal(self, guild, sources: Optional[Tuple[str, ...]] = None) -> Dict:
+        """Stage overwrite maps that put drifted channels back to the stored settings."""
+        overwrite_maps = {}
+        for channel_id, entry in self._refresh_drift(guild).items():
+            channel = guild.get_channel(channel_id)
+            if channel is None or (sources and entry["source"] not in sources):
+                continue
+            
+            for target_id, (_, _, allow, deny, mask) in entry["targets"].items():
+                permissions = {
+                    perm_name: True if allow & flag else False if deny & flag else None
+                    for perm_name, flag in PERMISSION_FLAGS.items() if mask & flag
+                }
+                self._stage_permissions(overwrite_maps, channel, guild.get_role(target_id), merge=True, **permissions)
+        return overwrite_maps
+    
+    def _schedule_drift_heal(self, guild):
+        """Heal manual drift shortly, so a burst of manual edits in a guild is fixed in one batch."""
+        task = self._heal_tasks.get(guild.id)
+        if task is None or task.done():
+            self._heal_tasks[guild.id] = asyncio.ensure_future(self._auto_heal_drift(guild))
+    
+    async def _auto_heal_drift(self, guild):
+        """Put manually changed channels back to the stored settings, reporting failures to mod-logs."""
+        await asyncio.sleep(5)
+        overwrite_maps = self._stage_drift_heal(guild, sources=("manual",))
+        _, _, errors = await self._apply_overwrite_maps(overwrite_maps, reason="Healed permission drift")
+        if not errors:
+            return
+        
+        for error in errors:
+            print(f"Error healing permission drift in {guild.name}: {error}")
+        
+        log_channel = discord.utils.get(guild.text_channels, name='mod-logs')
+        if log_channel:
+            embed = discord.Embed(
+                title="Permission Drift Auto-Heal Failed",
+                description=f"{len(errors)} channels could not be put back to the stored permission settings.",
+                color=discord.Color.red()
+            )
+            error_text = "\n".join(f"❌ {error}" for error in errors[:10])
+            if len(errors) > 10:
+                error_text += f"\n*...and {len(errors) - 10} more errors*"
+            embed.add_field(name="Errors", value=error_text[:1024], inline=False)
+            embed.set_footer(text=f"Use {config.PREFIX}channels drift to see which channels still differ.")
+            try:
+                await log_channel.send(embed=embed)
+            except discord.HTTPException as e:
+                print(f"Error reporting permission drift heal failures: {e}")
+    
+    async def _send_errors(self, ctx, errors: List[str]):
+        """Send collected per-channel errors as a single message, attaching the full list when it is long."""
+        if not errors:
+            return
+        
+        error_text = "\n".join(f"❌ {error}" for error in errors[:15])
+        if len(errors) > 15:
+            error_text = error_text[:1900] + f"\n*...and {len(errors) - 15} more errors, see the attached file*"
+            error_file = discord.File(io.BytesIO("\n".join(errors).encode("utf-8")), filename="errors.txt")
+            return await ctx.send(error_text, file=error_file)
+        await ctx.send(error_text[:2000])
+    
     @commands.group(name="channels", invoke_without_command=True)
     async def channels(self, ctx):
         """Channel and permission management commands."""
@@ -81,12 +757,35 @@ class AdvancedPermissions(commands.Cog):
                 f"`{config.PREFIX}channels set_verified_only <#channel> [#channel2 ...]` - Make channels visible only to verified users\n"
                 f"`{config.PREFIX}channels all_verified_only <#channel> [#channel2 ...]` - Make all channels verified-only except the specified channels\n"
                 f"`{config.PREFIX}channels lockdown <mode>` - Lock down the server to prevent spam or raids\n"
-                f"`{config.PREFIX}channels restrict_send --channels #channel1 #channel2 --roles \"Role1\" \"Role2\" \"Mod\"` - Restrict sending messages in channels to specific roles\n"
+                f"`{config.PREFIX}channels restrict_send --channels #channel1 --groups group --categories \"Category\" --roles \"Role1\" \"Mod\"` - Restrict sending messages in channels to specific roles\n"
                 f"`{config.PREFIX}channels list_restrictions` - List all channel restrictions currently set up\n"
             ),
             inline=False
         )
         
+        embed.add_field(
+            name="Snapshots & Queries",
+            value=(
+                f"`{config.PREFIX}channels snapshot` - Take, compare and restore permission snapshots\n"
+                f"`{config.PREFIX}channels who <#channel> <permission>` - Show who is allowed or denied a permission in a channel\n"
+                f"`{config.PREFIX}channels where <role> <permission>` - Show where a role is allowed or denied a permission\n"
+                f"`{config.PREFIX}channels effective <member> [#channel]` - Show a member's effective permissions\n"
+                f"`{config.PREFIX}channels access [permission]` - Count members with a permission in every channel\n"
+                f"`{config.PREFIX}channels classify <scheme>` - Show how a preset sorts channels by name\n"
+                f"`{config.PREFIX}channels export [--gzip]` - Export every channel overwrite as a CSV file\n"
+                f"`{config.PREFIX}channels jobs` - Show progress of bulk permission jobs\n"
+                f"`{config.PREFIX}channels drift` - Show and heal manual changes to stored permissions\n"
+                f"`{config.PREFIX}channels policy` - Plan and apply declarative permission policies\n"
+            ),
+            inline=False
+        )
+        
+        embed.add_field(
+            name="Dry Run",
+            value="Add `--plan` to any permission-changing command to preview the changes, REST calls and estimated time without applying anything.",
+            inline=False
+        )
+        
         await ctx.send(embed=embed)
     
     @channels.command(name="list")
@@ -151,7 +850,7 @@ class AdvancedPermissions(commands.Cog):
         
         # Create the new group
         self.permissions_data["channel_groups"][group_name] = []
-        self._save_permissions_data()
+        self._save_permissions_data("channel_groups")
         
         await ctx.send(f"✅ Created new channel group: **{group_name}**")
     
@@ -172,7 +871,7 @@ class AdvancedPermissions(commands.Cog):
                 self.permissions_data["channel_groups"][group_name].append(channel.id)
                 added_channels.append(f"#{channel.name}")
         
-        self._save_permissions_data()
+        self._save_permissions_data("channel_groups")
         
         if added_channels:
             added_text = ", ".join(added_channels)
@@ -197,7 +896,7 @@ class AdvancedPermissions(commands.Cog):
                 self.permissions_data["channel_groups"][group_name].remove(channel.id)
                 removed_channels.append(f"#{channel.name}")
         
-        self._save_permissions_data()
+        self._save_permissions_data("channel_groups")
         
         if removed_channels:
             removed_text = ", ".join(removed_channels)
@@ -240,7 +939,7 @@ class AdvancedPermissions(commands.Cog):
             self.permissions_data["role_permissions"][str(role.id)]["groups"][group_name] = {}
         
         self.permissions_data["role_permissions"][str(role.id)]["groups"][group_name][permission] = value
-        self._save_permissions_data()
+        self._save_permissions_data("role_permissions")
         
         permission_status = "allowed" if value else "denied"
         await ctx.send(f"✅ Set permission '{permission}' to {permission_status} for role '{role_name}' in group '{group_name}'")
@@ -252,7 +951,12 @@ class AdvancedPermissions(commands.Cog):
         Usage: 
         - Standard: !channels set_permission #channel @role permission true/false
         - Multiple: !channels set_permission channels #channel1 #channel2 roles @role1 @role2 permission true/false
+        
+        Add --plan to preview the changes without applying them.
         """
+        plan, args = self._split_plan_flag(args)
+        data = self._working_data(plan)
+        
         # Check for minimum arguments
         if len(args) < 3:
             return await ctx.send("❌ Not enough arguments. Usage: `!channels set_permission #channel @role permission true/false` or `!channels set_permission channels #channel1 #channel2 roles @role1 @role2 permission true/false`")
@@ -298,8 +1002,6 @@ class AdvancedPermissions(commands.Cog):
             return await ctx.send(f"❌ Invalid permission: {permission}")
         
         guild = ctx.guild
-        processed_channels = []
-        processed_roles = []
         
         # Resolve all channels
         channels = []
@@ -308,7 +1010,7 @@ class AdvancedPermissions(commands.Cog):
             if channel:
                 channels.append(channel)
             else:
-                await ctx.send(f"⚠️ Channel not found: {channel_input}")
+                await ctx.send(f"⚠️ Channel not found: {channel_input}{did_you_mean(self.bot, guild, 'channels', channel_input)}")
         
         if not channels:
             return await ctx.send("❌ No valid channels specified.")
@@ -320,61 +1022,53 @@ class AdvancedPermissions(commands.Cog):
             if role:
                 roles.append(role)
             else:
-                await ctx.send(f"⚠️ Role not found: {role_input}")
+                await ctx.send(f"⚠️ Role not found: {role_input}{did_you_mean(self.bot, guild, 'roles', role_input)}")
         
         if not roles:
             return await ctx.send("❌ No valid roles specified.")
         
         # Update permissions for each combination of channel and role
-        status_msg = await ctx.send(f"Setting permissions... This may take a moment.")
+        if not plan:
+            status_msg = await ctx.send(f"Setting permissions... This may take a moment.")
         permission_status = "allowed" if value else "denied"
-        total_changes = 0
+        overwrite_maps = {}
         
         for channel in channels:
             for role in roles:
                 # Update the permissions data structure
-                if "role_permissions" not in self.permissions_data:
-                    self.permissions_data["role_permissions"] = {}
+                if "role_permissions" not in data:
+                    data["role_permissions"] = {}
                 
-                if str(role.id) not in self.permissions_data["role_permissions"]:
-                    self.permissions_data["role_permissions"][str(role.id)] = {"channels": {}}
+                if str(role.id) not in data["role_permissions"]:
+                    data["role_permissions"][str(role.id)] = {"channels": {}}
                 
-                if "channels" not in self.permissions_data["role_permissions"][str(role.id)]:
-                    self.permissions_data["role_permissions"][str(role.id)]["channels"] = {}
+                if "channels" not in data["role_permissions"][str(role.id)]:
+                    data["role_permissions"][str(role.id)]["channels"] = {}
                 
-                if str(channel.id) not in self.permissions_data["role_permissions"][str(role.id)]["channels"]:
-                    self.permissions_data["role_permissions"][str(role.id)]["channels"][str(channel.id)] = {}
+                if str(channel.id) not in data["role_permissions"][str(role.id)]["channels"]:
+                    data["role_permissions"][str(role.id)]["channels"][str(channel.id)] = {}
                 
                 # Set the permission in our data structure
-                self.permissions_data["role_permissions"][str(role.id)]["channels"][str(channel.id)][permission] = value
+                data["role_permissions"][str(role.id)]["channels"][str(channel.id)][permission] = value
                 
-                # Now actually apply the permission to Discord
-                try:
-                    # Get current overwrites or create new ones
-                    overwrite = channel.overwrites_for(role)
-                    
-                    # Set the specific permission
-                    setattr(overwrite, permission, value)
-                    
-                    # Apply the updated overwrites
-                    await channel.set_permissions(role, overwrite=overwrite)
-                    
-                    # Keep track of successful changes
-                    if channel not in processed_channels:
-                        processed_channels.append(channel)
-                    if role not in processed_roles:
-                        processed_roles.append(role)
-                    total_changes += 1
-                    
-                    # Short delay to avoid rate limits
-                    await asyncio.sleep(0.3)
-                except discord.Forbidden:
-                    await ctx.send(f"❌ Error: I don't have permission to modify channel {channel.name} for role {role.name}.")
-                except Exception as e:
-                    await ctx.send(f"❌ Error setting permissions for {channel.name}/{role.name}: {str(e)}")
+                # Stage the permission on top of the current overwrite
+                self._stage_permissions(overwrite_maps, channel, role, merge=True, **{permission: value})
+        
+        if plan:
+            return await self._send_plan(ctx, overwrite_maps, f"set {permission} to {value}")
+        
+        # Apply all staged changes with one edit per channel
+        modified_channels, unchanged_channels, errors = await self._apply_overwrite_maps(overwrite_maps, reason=f"Set {permission} to {value}",
+                                                                                         progress=ProgressReporter(status_msg, "Setting permissions"))
+        await self._send_errors(ctx, errors)
+        
+        # Keep track of successful changes
+        processed_channels = modified_channels + unchanged_channels
+        processed_roles = list(dict.fromkeys(roles)) if processed_channels else []
+        total_changes = len(processed_channels) * len(processed_roles)
         
         # Save the updated permissions to file
-        self._save_permissions_data()
+        self._save_permissions_data("role_permissions")
         
         if total_changes > 0:
             channels_text = ", ".join([f"{ch.name} [ID: {ch.id}]" for ch in processed_channels])
@@ -396,16 +1090,24 @@ class AdvancedPermissions(commands.Cog):
     
     @channels.command(name="set_verified_only")
     async def set_verified_only(self, ctx, *channels_input):
-        """Make channels visible only to verified users. Accept channel mentions, names, or IDs."""
+        """Make channels visible only to verified users. Accept channel mentions, names, or IDs.
+        
+        Add --plan to preview the changes without applying them.
+        """
+        plan, channels_input = self._split_plan_flag(channels_input)
+        data = self._working_data(plan)
+        
         if not channels_input:
             return await ctx.send("❌ Please specify at least one channel.")
         
         # Initialize the verified_only group if it doesn't exist
-        if "verified_only" not in self.permissions_data["channel_groups"]:
-            self.permissions_data["channel_groups"]["verified_only"] = []
+        if "verified_only" not in data["channel_groups"]:
+            data["channel_groups"]["verified_only"] = []
         
         # Process each channel input (could be a mention, name, or ID)
         added_channels = []
+        target_channels = []
+        overwrite_maps = {}
         guild = ctx.guild
         verified_role = guild.get_role(config.VERIFIED_ROLE_ID)
         everyone_role = guild.default_role
@@ -422,68 +1124,48 @@ class AdvancedPermissions(commands.Cog):
                 continue
             
             # Add to verified_only group if not already in it
-            if channel.id not in self.permissions_data["channel_groups"]["verified_only"]:
-                self.permissions_data["channel_groups"]["verified_only"].append(channel.id)
+            if channel.id not in data["channel_groups"]["verified_only"]:
+                data["channel_groups"]["verified_only"].append(channel.id)
             
-            try:
-                # Set permissions for verified role - can see and interact
-                verified_overwrite = discord.PermissionOverwrite()
-                verified_overwrite.view_channel = True
-                
-                if isinstance(channel, discord.VoiceChannel):
-                    verified_overwrite.connect = True
-                    verified_overwrite.speak = True
-                    verified_overwrite.stream = True
-                    verified_overwrite.use_voice_activation = True
-                else:
-                    verified_overwrite.read_messages = True
-                    verified_overwrite.send_messages = True
-                    verified_overwrite.add_reactions = True
-                
-                await channel.set_permissions(verified_role, overwrite=verified_overwrite)
-                
-                # Set permissions for everyone role - completely hidden
-                if isinstance(channel, discord.VoiceChannel):
-                    # Voice channels need special handling to be fully hidden
-                    overwrite = discord.PermissionOverwrite()
-                    overwrite.view_channel = False  # This should hide the channel
-                    overwrite.connect = False
-                    overwrite.speak = False
-                    await channel.set_permissions(everyone_role, overwrite=overwrite)
-                    
-                    # A special additional step for voice channels
-                    # Check if the category permissions need to be adjusted
-                    if channel.category:
-                        # Try to hide at the category level too for this channel
-                        try:
-                            # Get existing permission overwrites for this channel in the category
-                            category_overwrite = channel.category.overwrites_for(everyone_role)
-                            category_overwrite.update(view_channel=False)
-                            await channel.category.set_permissions(everyone_role, overwrite=category_overwrite)
-                            
-                            # IMPORTANT: Also ensure verified role can see the category
-                            verified_category_overwrite = channel.category.overwrites_for(verified_role)
-                            verified_category_overwrite.update(view_channel=True)
-                            await channel.category.set_permissions(verified_role, overwrite=verified_category_overwrite)
-                        except Exception as e:
-                            # If we can't modify category permissions, that's fine
-                            await ctx.send(f"Note: Could not update category permissions: {str(e)}")
-                else:
-                    # Text channel permissions
-                    overwrite = discord.PermissionOverwrite()
-                    overwrite.view_channel = False
-                    overwrite.read_messages = False
-                    overwrite.send_messages = False
-                    overwrite.add_reactions = False
-                    await channel.set_permissions(everyone_role, overwrite=overwrite)
+            # Set permissions for verified role - can see and interact
+            if isinstance(channel, discord.VoiceChannel):
+                self._stage_permissions(overwrite_maps, channel, verified_role, view_channel=True, connect=True,
+                                        speak=True, stream=True, use_voice_activation=True)
+            else:
+                self._stage_permissions(overwrite_maps, channel, verified_role, view_channel=True, read_messages=True,
+                                        send_messages=True, add_reactions=True)
+            
+            # Set permissions for everyone role - completely hidden
+            if isinstance(channel, discord.VoiceChannel):
+                # Voice channels need special handling to be fully hidden
+                self._stage_permissions(overwrite_maps, channel, everyone_role, view_channel=False, connect=False, speak=False)
                 
-                added_channels.append(f"{channel.name} ({channel.type}) [ID: {channel.id}]")
-            except discord.Forbidden:
-                await ctx.send(f"❌ Error: I don't have permission to modify channel {channel.name}.")
-            except Exception as e:
-                await ctx.send(f"❌ Error setting permissions for {channel.name}: {str(e)}")
+                # A special additional step for voice channels
+                # Hide the category from everyone too, but keep it visible to verified users.
+                # The category is staged once no matter how many of its channels are listed.
+                if channel.category:
+                    self._stage_permissions(overwrite_maps, channel.category, everyone_role, merge=True, view_channel=False)
+                    self._stage_permissions(overwrite_maps, channel.category, verified_role, merge=True, view_channel=True)
+            else:
+                # Text channel permissions
+                self._stage_permissions(overwrite_maps, channel, everyone_role, view_channel=False, read_messages=False,
+                                        send_messages=False, add_reactions=False)
+            
+            target_channels.append(channel)
+        
+        if plan:
+            return await self._send_plan(ctx, overwrite_maps, "make channels verified-only")
+        
+        self._save_permissions_data("channel_groups")
         
-        self._save_permissions_data()
+        # Apply all staged changes, skipping channels that are already verified-only
+        modified_channels, unchanged_channels, errors = await self._apply_overwrite_maps(overwrite_maps, reason="Made channels verified-only")
+        await self._send_errors(ctx, errors)
+        
+        applied_channels = modified_channels + unchanged_channels
+        for channel in target_channels:
+            if channel in applied_channels:
+                added_channels.append(f"{channel.name} ({channel.type}) [ID: {channel.id}]")
         
         if added_channels:
             added_text = ", ".join(added_channels)
@@ -493,16 +1175,24 @@ class AdvancedPermissions(commands.Cog):
     
     @channels.command(name="set_public")
     async def set_public(self, ctx, *channels_input):
-        """Make channels visible to everyone. Accept channel mentions, names, or IDs."""
+        """Make channels visible to everyone. Accept channel mentions, names, or IDs.
+        
+        Add --plan to preview the changes without applying them.
+        """
+        plan, channels_input = self._split_plan_flag(channels_input)
+        data = self._working_data(plan)
+        
         if not channels_input:
             return await ctx.send("❌ Please specify at least one channel.")
         
         # Initialize the public_channels list if it doesn't exist
-        if "public_channels" not in self.permissions_data:
-            self.permissions_data["public_channels"] = []
+        if "public_channels" not in data:
+            data["public_channels"] = []
         
         # Process each channel input (could be a mention, name, or ID)
         added_channels = []
+        target_channels = []
+        overwrite_maps = {}
         guild = ctx.guild
         everyone_role = guild.default_role
         
@@ -515,24 +1205,31 @@ class AdvancedPermissions(commands.Cog):
                 continue
             
             # Add to public_channels if not already in it
-            if channel.id not in self.permissions_data["public_channels"]:
-                self.permissions_data["public_channels"].append(channel.id)
-            
-            try:
-                # Set permissions for everyone role - can see and interact
-                overwrite = discord.PermissionOverwrite()
-                overwrite.view_channel = True
-                overwrite.connect = True if isinstance(channel, discord.VoiceChannel) else None
-                overwrite.read_messages = True if isinstance(channel, discord.TextChannel) else None
-                await channel.set_permissions(everyone_role, overwrite=overwrite)
-                
-                added_channels.append(f"{channel.name} ({channel.type}) [ID: {channel.id}]")
-            except discord.Forbidden:
-                await ctx.send(f"❌ Error: I don't have permission to modify channel {channel.name}.")
-            except Exception as e:
-                await ctx.send(f"❌ Error setting permissions for {channel.name}: {str(e)}")
+            if channel.id not in data["public_channels"]:
+                data["public_channels"].append(channel.id)
+            
+            # Set permissions for everyone role - can see and interact
+            self._stage_permissions(
+                overwrite_maps, channel, everyone_role,
+                view_channel=True,
+                connect=True if isinstance(channel, discord.VoiceChannel) else None,
+                read_messages=True if isinstance(channel, discord.TextChannel) else None
+            )
+            target_channels.append(channel)
+        
+        if plan:
+            return await self._send_plan(ctx, overwrite_maps, "make channels public")
+        
+        self._save_permissions_data("public_channels")
+        
+        # Apply all staged changes, skipping channels that are already public
+        modified_channels, unchanged_channels, errors = await self._apply_overwrite_maps(overwrite_maps, reason="Made channels public")
+        await self._send_errors(ctx, errors)
         
-        self._save_permissions_data()
+        applied_channels = modified_channels + unchanged_channels
+        for channel in target_channels:
+            if channel in applied_channels:
+                added_channels.append(f"{channel.name} ({channel.type}) [ID: {channel.id}]")
         
         if added_channels:
             added_text = ", ".join(added_channels)
@@ -545,9 +1242,17 @@ class AdvancedPermissions(commands.Cog):
         """Make all channels verified-only except for the specified channels (which remain public).
         
         You can specify channels by mention (#channel), name (channel-name), or ID (1234567890).
+        Add --plan to preview the changes without applying them.
         """
+        plan, channel_args = self._split_plan_flag(channel_args)
+        data = self._working_data(plan)
         guild = ctx.guild
         
+        # Get the verified role
+        verified_role = guild.get_role(config.VERIFIED_ROLE_ID)
+        if not verified_role:
+            return await ctx.send("❌ Error: Verified role not found. Please check your configuration.")
+        
         # Resolve channel arguments (could be mentions, names, or IDs)
         exception_channels = []
         
@@ -577,35 +1282,36 @@ class AdvancedPermissions(commands.Cog):
                 if channel:
                     exception_channels.append(channel)
         
-        # Confirm action
-        confirm_msg = "⚠️ This will make ALL channels verified-only (hidden from unverified users) except for:"
-        for channel in exception_channels:
-            confirm_msg += f"\n- {channel.name} ({channel.type}) [ID: {channel.id}]"
-        
-        confirm_msg += "\n\nDo you want to continue? (yes/no)"
-        await ctx.send(confirm_msg)
-        
-        # Wait for confirmation
-        def check(m):
-            return m.author == ctx.author and m.channel == ctx.channel and m.content.lower() in ['yes', 'no', 'y', 'n']
-        
-        try:
-            response = await self.bot.wait_for('message', check=check, timeout=30.0)
-        except asyncio.TimeoutError:
-            return await ctx.send("❌ Action cancelled due to timeout.")
-        
-        if response.content.lower() not in ['yes', 'y']:
-            return await ctx.send("❌ Action cancelled.")
-        
-        # Process all channels
-        status_msg = await ctx.send("Configuring channel permissions... This may take a moment.")
+        # Confirm action (a plan changes nothing, so it needs no confirmation)
+        if not plan:
+            confirm_msg = "⚠️ This will make ALL channels verified-only (hidden from unverified users) except for:"
+            for channel in exception_channels:
+                confirm_msg += f"\n- {channel.name} ({channel.type}) [ID: {channel.id}]"
+            
+            confirm_msg += "\n\nDo you want to continue? (yes/no)"
+            await ctx.send(confirm_msg)
+            
+            # Wait for confirmation
+            def check(m):
+                return m.author == ctx.author and m.channel == ctx.channel and m.content.lower() in ['yes', 'no', 'y', 'n']
+            
+            try:
+                response = await self.bot.wait_for('message', check=check, timeout=30.0)
+            except asyncio.TimeoutError:
+                return await ctx.send("❌ Action cancelled due to timeout.")
+            
+            if response.content.lower() not in ['yes', 'y']:
+                return await ctx.send("❌ Action cancelled.")
+            
+            # Process all channels
+            status_msg = await ctx.send("Configuring channel permissions... This may take a moment.")
         
         # Clear existing public channels
-        self.permissions_data["public_channels"] = [channel.id for channel in exception_channels]
+        data["public_channels"] = [channel.id for channel in exception_channels]
         
         # Initialize or update the verified_only group
-        if "verified_only" not in self.permissions_data["channel_groups"]:
-            self.permissions_data["channel_groups"]["verified_only"] = []
+        if "verified_only" not in data["channel_groups"]:
+            data["channel_groups"]["verified_only"] = []
         
         # Add all other channels to verified_only
         verified_only_channels = []
@@ -619,66 +1325,47 @@ class AdvancedPermissions(commands.Cog):
                 continue
                 
             # Add to verified_only group
-            if channel.id not in self.permissions_data["channel_groups"]["verified_only"]:
-                self.permissions_data["channel_groups"]["verified_only"].append(channel.id)
+            if channel.id not in data["channel_groups"]["verified_only"]:
+                data["channel_groups"]["verified_only"].append(channel.id)
             
             verified_only_channels.append(channel)
         
-        self._save_permissions_data()
-        
-        # Apply permissions
-        modified_count = 0
-        
-        # Get the verified role
-        verified_role = guild.get_role(config.VERIFIED_ROLE_ID)
-        if not verified_role:
-            await ctx.send("❌ Error: Verified role not found. Please check your configuration.")
-            return
+        if not plan:
+            self._save_permissions_data("public_channels", "channel_groups")
         
         # Get everyone role (unverified users)
         everyone_role = guild.default_role
         
-        # Apply permissions for verified-only channels
-        for channel in verified_only_channels:
-            try:
-                # Set permissions for verified role - can see
-                if isinstance(channel, discord.VoiceChannel):
-                    await channel.set_permissions(verified_role, view_channel=True, connect=True)
-                    await channel.set_permissions(everyone_role, view_channel=False, connect=False)
-                else:  # Text channel
-                    await channel.set_permissions(verified_role, read_messages=True, send_messages=True)
-                    await channel.set_permissions(everyone_role, read_messages=False)
-                
-                modified_count += 1
-                
-                # Add a short delay to avoid rate limiting
-                await asyncio.sleep(0.5)
-                
-            except discord.Forbidden:
-                await ctx.send(f"❌ Error: I don't have permission to modify channel {channel.name}.")
-            except Exception as e:
-                await ctx.send(f"❌ Error setting permissions for {channel.name}: {str(e)}")
+        overwrite_maps = {}
         
-        # Apply permissions for public channels
+        # Stage permissions for verified-only channels
+        for channel in verified_only_channels:
+            # Set permissions for verified role - can see
+            if isinstance(channel, discord.VoiceChannel):
+                self._stage_permissions(overwrite_maps, channel, verified_role, view_channel=True, connect=True)
+                self._stage_permissions(overwrite_maps, channel, everyone_role, view_channel=False, connect=False)
+            else:  # Text channel
+                self._stage_permissions(overwrite_maps, channel, verified_role, read_messages=True, send_messages=True)
+                self._stage_permissions(overwrite_maps, channel, everyone_role, read_messages=False)
+        
+        # Stage permissions for public channels
         for channel in exception_channels:
-            try:
-                # Set permissions for everyone role - can see
-                if isinstance(channel, discord.VoiceChannel):
-                    await channel.set_permissions(everyone_role, view_channel=True, connect=True)
-                else:  # Text channel
-                    await channel.set_permissions(everyone_role, read_messages=True, read_message_history=True)
-                
-                modified_count += 1
-                
-                # Add a short delay to avoid rate limiting
-                await asyncio.sleep(0.5)
-                
-            except discord.Forbidden:
-                await ctx.send(f"❌ Error: I don't have permission to modify channel {channel.name}.")
-            except Exception as e:
-                await ctx.send(f"❌ Error setting permissions for {channel.name}: {str(e)}")
+            # Set permissions for everyone role - can see
+            if isinstance(channel, discord.VoiceChannel):
+                self._stage_permissions(overwrite_maps, channel, everyone_role, view_channel=True, connect=True)
+            else:  # Text channel
+                self._stage_permissions(overwrite_maps, channel, everyone_role, read_messages=True, read_message_history=True)
+        
+        if plan:
+            return await self._send_plan(ctx, overwrite_maps, "make all channels verified-only")
+        
+        # Apply permissions
+        modified_channels, unchanged_channels, errors = await self._apply_overwrite_maps(overwrite_maps, reason="Made all channels verified-only",
+                                                                                         progress=ProgressReporter(status_msg, "Configuring channel permissions"))
+        modified_count = len(modified_channels)
+        await self._send_errors(ctx, errors)
         
-        await status_msg.edit(content=f"✅ Operation complete! Made all channels verified-only except for the specified ones. Modified permissions for {modified_count} channels.")
+        await status_msg.edit(content=f"✅ Operation complete! Made all channels verified-only except for the specified ones. Modified permissions for {modified_count} channels ({len(unchanged_channels)} already up to date).")
     
     @channels.command(name="info")
     async def channel_info(self, ctx, channel: discord.TextChannel = None):
@@ -694,15 +1381,17 @@ class AdvancedPermissions(commands.Cog):
         )
         
         # Get roles with overwrites
-        overwrites = channel.overwrites
+        self.index.ensure_guild(ctx.guild)
+        overwrites = self.index.overwrites_for(channel.id)
         
         # Add field for each role with permissions
-        for role, overwrite in overwrites.items():
-            if isinstance(role, discord.Role):
+        for target_id, (allow, deny) in overwrites.items():
+            role = ctx.guild.get_role(target_id)
+            if role:
                 perm_list = []
-                for perm, value in overwrite:
-                    if value is not None:  # Skip neutral permissions
-                        perm_status = "✅" if value else "❌"
+                for perm, flag in PERMISSION_FLAGS.items():
+                    if (allow | deny) & flag:  # Skip neutral permissions
+                        perm_status = "✅" if allow & flag else "❌"
                         perm_list.append(f"{perm_status} {perm}")
                 
                 if perm_list:
@@ -713,10 +1402,7 @@ class AdvancedPermissions(commands.Cog):
                     )
         
         # Check if channel is in any groups
-        in_groups = []
-        for group_name, channels in self.permissions_data["channel_groups"].items():
-            if channel.id in channels:
-                in_groups.append(group_name)
+        in_groups = self.index.groups_for(channel.id)
         
         if in_groups:
             embed.add_field(
@@ -735,6 +1421,210 @@ class AdvancedPermissions(commands.Cog):
         
         await ctx.send(embed=embed)
     
+    def _format_overwrite_bits(self, allow: int, deny: int) -> str:
+        """Format allow/deny bits as a list of ✅/❌ permission names."""
+        parts = []
+        for perm, flag in PERMISSION_FLAGS.items():
+            if allow & flag:
+                parts.append(f"✅ {perm}")
+            elif deny & flag:
+                parts.append(f"❌ {perm}")
+        return ", ".join(parts)
+    
+    @channels.command(name="who")
+    async def who_can(self, ctx, channel_input, permission: str):
+        """Show which roles and members are explicitly allowed or denied a permission in a channel."""
+        guild = ctx.guild
+        channel = self._resolve_channel(guild, channel_input)
+        if not channel:
+            return await ctx.send(f"❌ Channel not found. Please specify a valid channel mention, name, or ID.{did_you_mean(self.bot, guild, 'channels', channel_input)}")
+        
+        flag = self._permission_flag(permission)
+        if flag is None:
+            return await ctx.send(f"❌ Invalid permission: {permission}")
+        
+        self.index.ensure_guild(guild)
+        allowed, denied = self.index.targets_for(channel.id, flag)
+        
+        embed = discord.Embed(
+            title=f"Who has {permission.lower()} in #{channel.name}",
+            description="Explicit channel overwrites only. Targets not listed fall back to their server-wide role permissions.",
+            color=discord.Color.blue()
+        )
+        embed.add_field(name="✅ Allowed", value="\n".join(self._target_name(guild, target_id) for target_id in allowed)[:1024] or "None", inline=True)
+        embed.add_field(name="❌ Denied", value="\n".join(self._target_name(guild, target_id) for target_id in denied)[:1024] or "None", inline=True)
+        
+        await ctx.send(embed=embed)
+    
+    @channels.command(name="where")
+    async def where_can(self, ctx, role_input, permission: str):
+        """Show the channels where a role is explicitly allowed or denied a permission."""
+        guild = ctx.guild
+        role = self._resolve_role(guild, role_input)
+        if not role:
+            return await ctx.send(f"❌ Role not found. Please specify a valid role mention, name, or ID.{did_you_mean(self.bot, guild, 'roles', role_input)}")
+        
+        flag = self._permission_flag(permission)
+        if flag is None:
+            return await ctx.send(f"❌ Invalid permission: {permission}")
+        
+        self.index.ensure_guild(guild)
+        allowed, denied = self.index.channels_for(role.id, flag)
+        
+        def channel_list(channel_ids):
+            names = sorted(f"#{channel.name}" for channel in map(guild.get_channel, channel_ids) if channel)
+            text = "\n".join(names)
+            if len(text) > 1024:
+                text = text[:1000].rsplit("\n", 1)[0] + f"\n*...{len(names)} channels in total*"
+            return text or "None"
+        
+        embed = discord.Embed(
+            title=f"Where {role.name} has {permission.lower()}",
+            description="Explicit channel overwrites only. Other channels fall back to the role's server-wide permissions.",
+            color=role.color
+        )
+        embed.add_field(name="✅ Allowed", value=channel_list(allowed), inline=True)
+        embed.add_field(name="❌ Denied", value=channel_list(denied), inline=True)
+        
+        await ctx.send(embed=embed)
+    
+    @channels.command(name="classify")
+    async def classify_channels(self, ctx, scheme: str = None):
+        """Show how a preset, xgc or quicksetup would sort channels by name."""
+        schemes = [f"preset:{name}" for name in CHANNEL_PRESETS] + ["xgc", "quicksetup"]
+        if scheme is None:
+            return await ctx.send(f"❌ Please specify a scheme: {', '.join(name.split(':')[-1] for name in schemes)}")
+        
+        scheme = scheme.lower()
+        if scheme in CHANNEL_PRESETS:
+            scheme = f"preset:{scheme}"
+        if scheme not in schemes:
+            return await ctx.send(f"❌ Unknown scheme. Available schemes: {', '.join(name.split(':')[-1] for name in schemes)}")
+        
+        guild = ctx.guild
+        by_label = {label: [] for label in self.classifier.keywords[scheme]}
+        unmatched = 0
+        for channel in guild.channels:
+            if isinstance(channel, discord.CategoryChannel):
+                continue
+            labels = self.classifier.labels(channel, scheme)
+            if not labels:
+                unmatched += 1
+            for label in labels:
+                by_label[label].append(f"#{channel.name}")
+        
+        embed = discord.Embed(
+            title=f"Channel classification: {scheme.split(':')[-1]}",
+            description=f"Channels are listed under every label their name matches. {unmatched} channels match no label.",
+            color=discord.Color.blue()
+        )
+        for label, names in by_label.items():
+            text = ", ".join(sorted(names))
+            if len(text) > 1024:
+                text = text[:1000].rsplit(", ", 1)[0] + f", ...{len(names)} in total"
+            embed.add_field(name=label, value=text or "None", inline=False)
+        
+        await ctx.send(embed=embed)
+    
+    @channels.command(name="effective")
+    async def effective_permissions(self, ctx, member_input, channel_input=None):
+        """Show what a member can actually do in a channel once roles and overwrites are combined."""
+        guild = ctx.guild
+        member = self._resolve_user(guild, member_input)
+        if not member:
+            return await ctx.send("❌ Member not found. Please specify a valid member mention, name, or ID.")
+        
+        if channel_input is None:
+            # Summarize which text channels the member can see and post in
+            visible, postable = [], []
+            for channel in guild.text_channels:
+                permissions = self.resolver.for_member(member, channel)
+                if permissions.view_channel:
+                    visible.append(f"#{channel.name}")
+                    if permissions.send_messages:
+                        postable.append(f"#{channel.name}")
+            
+            embed = discord.Embed(
+                title=f"Effective access for {member.display_name}",
+                description=f"Can see {len(visible)} of {len(guild.text_channels)} text channels and send messages in {len(postable)}.",
+                color=member.color
+            )
+            read_only = [name for name in visible if name not in postable]
+            embed.add_field(name="👁️ Read only", value=", ".join(read_only)[:1024] or "None", inline=False)
+            embed.add_field(name="💬 Can send", value=", ".join(postable)[:1024] or "None", inline=False)
+            return await ctx.send(embed=embed)
+        
+        channel = self._resolve_channel(guild, channel_input)
+        if not channel:
+            return await ctx.send(f"❌ Channel not found. Please specify a valid channel mention, name, or ID.{did_you_mean(self.bot, guild, 'channels', channel_input)}")
+        
+        permissions = self.resolver.for_member(member, channel)
+        allowed = [perm for perm, flag in PERMISSION_FLAGS.items() if permissions.value & flag]
+        
+        embed = discord.Embed(
+            title=f"Effective permissions for {member.display_name} in #{channel.name}",
+            description="Combines @everyone, the member's roles, and the channel's role and member overwrites.",
+            color=member.color
+        )
+        if member.id == guild.owner_id:
+            embed.description += "\nThis member owns the server and has every permission."
+        elif permissions.administrator:
+            embed.description += "\nThis member has Administrator and bypasses all overwrites."
+        
+        embed.add_field(name="✅ Allowed", value=", ".join(allowed)[:1024] or "None (cannot see this channel)", inline=False)
+        await ctx.send(embed=embed)
+    
+    @channels.command(name="access")
+    async def access_matrix(self, ctx, permission: str = "view_channel"):
+        """
+        Audit how many members have a permission in every channel of the server.
+        
+        Members are grouped by their set of roles, so each distinct combination of
+        roles is computed once per channel instead of once per member.
+        """
+        guild = ctx.guild
+        flag = self._permission_flag(permission)
+        if flag is None:
+            return await ctx.send(f"❌ Invalid permission: {permission}")
+        
+        self.index.ensure_guild(guild)
+        
+        # Count members per role set; the owner always has every permission
+        role_sets = {}
+        for member in guild.members:
+            if member.id != guild.owner_id:
+                signature = self.resolver.signature(member)
+                role_sets[signature] = role_sets.get(signature, 0) + 1
+        owner_count = 1 if guild.get_member(guild.owner_id) else 0
+        total = sum(role_sets.values()) + owner_count
+        
+        lines = []
+        channels = [channel for channel in guild.channels if not isinstance(channel, discord.CategoryChannel)]
+        for channel in sorted(channels, key=lambda c: (c.category.position if c.category else -1, c.position)):
+            count = owner_count
+            for signature, members in role_sets.items():
+                if self.resolver.channel_permissions(guild, channel.id, signature) & flag:
+                    count += members
+            
+            # Members with their own overwrite in this channel are corrected individually
+            for target_id in self.index.overwrites_for(channel.id):
+                member = guild.get_member(target_id)
+                if member and member.id != guild.owner_id:
+                    signature = self.resolver.signature(member)
+                    if self.resolver.channel_permissions(guild, channel.id, signature) & flag:
+                        count -= 1
+                    if self.resolver.channel_permissions(guild, channel.id, signature, member.id) & flag:
+                        count += 1
+            
+            lines.append(f"#{channel.name} [ID: {channel.id}]: {count}/{total} members")
+        
+        embed = discord.Embed(
+            title=f"Access matrix: {permission.lower()}",
+            description=f"{total} members in {len(role_sets)} distinct role sets across {len(channels)} channels.",
+            color=discord.Color.blue()
+        )
+        await self._send_with_details(ctx, embed, "\n".join(lines), "access_matrix.txt", field_name="Members with access")
+    
     @channels.group(name="role", invoke_without_command=True)
     async def channel_role(self, ctx):
         """Commands for managing role permissions across channels."""
@@ -752,6 +1642,7 @@ class AdvancedPermissions(commands.Cog):
                 f"`{config.PREFIX}channels role deny <role> <permission> <#channel1> [#channel2 ...]` - Deny permission for role\n"
                 f"`{config.PREFIX}channels role reset <role> <permission> <#channel1> [#channel2 ...]` - Reset permission for role\n"
                 f"`{config.PREFIX}channels role copy <from_role> <to_role> [#channel]` - Copy permissions from one role to another\n"
+                f"`{config.PREFIX}channels role clone <from_role> <to_role> [--replace]` - Clone a role's live overwrites onto another role\n"
             ),
             inline=False
         )
@@ -793,10 +1684,27 @@ class AdvancedPermissions(commands.Cog):
         else:
             # Try to find by name (both text and voice channels)
             channel_name = channel_input.lstrip('#')  # Remove # if present
-            channel = discord.utils.get(guild.channels, name=channel_name)
+            name_index = self.bot.get_cog("NameIndex")
+            if name_index:
+                channel = name_index.find_channel(guild, channel_name)
+            else:
+                channel = discord.utils.get(guild.channels, name=channel_name)
         
         return channel
     
+    def _resolve_category(self, guild, category_input):
+        """Resolve a category from mention, name, or ID. Channels named like a category are never picked."""
+        if category_input.startswith('<#') and category_input.endswith('>'):
+            category_input = category_input[2:-1]
+        if category_input.isdigit():
+            category = guild.get_channel(int(category_input))
+            return category if isinstance(category, discord.CategoryChannel) else None
+        
+        category = discord.utils.get(guild.categories, name=category_input)
+        if category is None:
+            category = discord.utils.find(lambda other: other.name.lower() == category_input.lower(), guild.categories)
+        return category
+    
     def _resolve_role(self, guild, role_input):
         """Resolve a role from mention, name, or ID."""
         role = None
@@ -816,8 +1724,12 @@ class AdvancedPermissions(commands.Cog):
             except (ValueError, TypeError):
                 pass
         else:
-            # Try to find by name
-            role = discord.utils.get(guild.roles, name=role_input)
+            # Try to find by name, through the shared name index when it is loaded
+            name_index = self.bot.get_cog("NameIndex")
+            if name_index:
+                role = name_index.find_role(guild, role_input)
+            else:
+                role = discord.utils.get(guild.roles, name=role_input)
         
         return role
     
@@ -842,9 +1754,13 @@ class AdvancedPermissions(commands.Cog):
             except (ValueError, TypeError):
                 pass
         else:
-            # Try to find by name
-            user = discord.utils.find(lambda m: m.name.lower() == user_input.lower() or 
-                                   (m.nick and m.nick.lower() == user_input.lower()), guild.members)
+            # Try to find by name, through the shared name index when it is loaded
+            name_index = self.bot.get_cog("NameIndex")
+            if name_index:
+                user = name_index.find_member(guild, user_input)
+            else:
+                user = discord.utils.find(lambda m: m.name.lower() == user_input.lower() or 
+                                       (m.nick and m.nick.lower() == user_input.lower()), guild.members)
         
         return user
     
@@ -857,14 +1773,15 @@ class AdvancedPermissions(commands.Cog):
         role = self._resolve_role(guild, role_input)
         
         if not role:
-            return await ctx.send("❌ Role not found. Please specify a valid role mention, name, or ID.")
+            return await ctx.send(f"❌ Role not found. Please specify a valid role mention, name, or ID.{did_you_mean(self.bot, guild, 'roles', role_input)}")
         
         # Check if this role has any permissions set
-        if "role_permissions" not in self.permissions_data or str(role.id) not in self.permissions_data["role_permissions"]:
+        self.index.ensure_guild(guild)
+        overwrite_channels = self.index.channels_with_target(role.id)
+        role_data = self.permissions_data.get("role_permissions", {}).get(str(role.id), {})
+        if not role_data and not overwrite_channels:
             return await ctx.send(f"No custom permissions found for role '{role.name}' [ID: {role.id}].")
         
-        role_data = self.permissions_data["role_permissions"][str(role.id)]
-        
         # Create an embed to display the permissions
         embed = discord.Embed(
             title=f"Permissions for role: {role.name}",
@@ -903,11 +1820,29 @@ class AdvancedPermissions(commands.Cog):
                     inline=False
                 )
         
+        # Add the overwrites that are currently set on channels
+        if overwrite_channels:
+            overwrite_lines = []
+            for channel_id in overwrite_channels:
+                channel = guild.get_channel(channel_id)
+                if channel:
+                    allow, deny = self.index.overwrites_for(channel_id)[role.id]
+                    overwrite_lines.append(f"#{channel.name}: {self._format_overwrite_bits(allow, deny)}")
+            
+            overwrite_text = "\n".join(sorted(overwrite_lines))
+            if len(overwrite_text) > 1024:
+                overwrite_text = overwrite_text[:1000].rsplit("\n", 1)[0] + "\n*...and more*"
+            embed.add_field(name="Current Channel Overwrites", value=overwrite_text or "None", inline=False)
+        
         await ctx.send(embed=embed)
 
-    @channel_role.command(name="allow")
-    async def role_allow(self, ctx, role_input, permission: str, *channel_inputs):
-        """Allow a permission for a role in specific channels."""
+    async def _set_role_channel_permission(self, ctx, mode: str, role_input, permission: str, channel_inputs):
+        """Allow, deny or reset (mode) a permission for a role in specific channels."""
+        plan, channel_inputs = self._split_plan_flag(channel_inputs)
+        data = self._working_data(plan)
+        value = {"allow": True, "deny": False, "reset": None}[mode]
+        past_tense = {"allow": "Allowed", "deny": "Denied", "reset": "Reset"}[mode]
+        
         if not channel_inputs:
             return await ctx.send("❌ Please specify at least one channel.")
         
@@ -917,7 +1852,7 @@ class AdvancedPermissions(commands.Cog):
         role = self._resolve_role(guild, role_input)
         
         if not role:
-            return await ctx.send("❌ Role not found. Please specify a valid role mention, name, or ID.")
+            return await ctx.send(f"❌ Role not found. Please specify a valid role mention, name, or ID.{did_you_mean(self.bot, guild, 'roles', role_input)}")
         
         # Validate the permission
         if not hasattr(discord.Permissions, permission):
@@ -925,212 +1860,103 @@ class AdvancedPermissions(commands.Cog):
         
         # Process each channel
         processed_channels = []
+        target_channels = []
+        overwrite_maps = {}
         for channel_input in channel_inputs:
             channel = self._resolve_channel(guild, channel_input)
             
             if not channel:
-                await ctx.send(f"⚠️ Channel not found: {channel_input}")
+                await ctx.send(f"⚠️ Channel not found: {channel_input}{did_you_mean(self.bot, guild, 'channels', channel_input)}")
                 continue
             
             # Update the permissions data
-            if "role_permissions" not in self.permissions_data:
-                self.permissions_data["role_permissions"] = {}
-            
-            if str(role.id) not in self.permissions_data["role_permissions"]:
-                self.permissions_data["role_permissions"][str(role.id)] = {"channels": {}}
-            
-            if "channels" not in self.permissions_data["role_permissions"][str(role.id)]:
-                self.permissions_data["role_permissions"][str(role.id)]["channels"] = {}
-            
-            if str(channel.id) not in self.permissions_data["role_permissions"][str(role.id)]["channels"]:
-                self.permissions_data["role_permissions"][str(role.id)]["channels"][str(channel.id)] = {}
-            
-            # Set the permission
-            self.permissions_data["role_permissions"][str(role.id)]["channels"][str(channel.id)][permission] = True
-            
-            # Store the updated channel
-            processed_channels.append(f"{channel.name} [ID: {channel.id}]")
+            role_data = data.setdefault("role_permissions", {}).setdefault(str(role.id), {})
+            channel_perms = role_data.setdefault("channels", {}).setdefault(str(channel.id), {})
+            if value is None:
+                # Remove the permission and clean up empty dictionaries
+                channel_perms.pop(permission, None)
+                if not channel_perms:
+                    del role_data["channels"][str(channel.id)]
+                if not role_data["channels"]:
+                    del role_data["channels"]
+                if not role_data:
+                    del data["role_permissions"][str(role.id)]
+            else:
+                channel_perms[permission] = value
             
-            try:
-                # Apply the permission immediately
-                overwrite = channel.overwrites_for(role)
-                setattr(overwrite, permission, True)
-                await channel.set_permissions(role, overwrite=overwrite)
-            except discord.Forbidden:
-                await ctx.send(f"❌ Error: I don't have permission to modify channel {channel.name}.")
-            except Exception as e:
-                await ctx.send(f"❌ Error setting permissions for {channel.name}: {str(e)}")
+            # Stage the permission on top of the current overwrite; a reset removes the
+            # overwrite entirely once all of its permissions are neutral
+            self._stage_permissions(overwrite_maps, channel, role, merge=True, **{permission: value})
+            target_channels.append(channel)
         
-        # Save the updated permissions
-        self._save_permissions_data()
+        if plan:
+            return await self._send_plan(ctx, overwrite_maps, f"{mode} {permission} for {role.name}")
         
-        if processed_channels:
-            channels_text = ", ".join(processed_channels)
-            await ctx.send(f"✅ Allowed '{permission}' for role '{role.name}' [ID: {role.id}] in channels: {channels_text}")
-        else:
-            await ctx.send("❌ No channels were updated.")
-
-    @channel_role.command(name="deny")
-    async def role_deny(self, ctx, role_input, permission: str, *channel_inputs):
-        """Deny a permission for a role in specific channels."""
-        if not channel_inputs:
-            return await ctx.send("❌ Please specify at least one channel.")
-        
-        guild = ctx.guild
-        
-        # Resolve the role
-        role = self._resolve_role(guild, role_input)
-        
-        if not role:
-            return await ctx.send("❌ Role not found. Please specify a valid role mention, name, or ID.")
+        # Apply the staged permissions, skipping channels that already match
+        modified_channels, unchanged_channels, errors = await self._apply_overwrite_maps(overwrite_maps, reason=f"{past_tense} {permission} for {role.name}")
+        await self._send_errors(ctx, errors)
         
-        # Validate the permission
-        if not hasattr(discord.Permissions, permission):
-            return await ctx.send(f"❌ Invalid permission: {permission}")
-        
-        # Process each channel
-        processed_channels = []
-        for channel_input in channel_inputs:
-            channel = self._resolve_channel(guild, channel_input)
-            
-            if not channel:
-                await ctx.send(f"⚠️ Channel not found: {channel_input}")
-                continue
-            
-            # Update the permissions data
-            if "role_permissions" not in self.permissions_data:
-                self.permissions_data["role_permissions"] = {}
-            
-            if str(role.id) not in self.permissions_data["role_permissions"]:
-                self.permissions_data["role_permissions"][str(role.id)] = {"channels": {}}
-            
-            if "channels" not in self.permissions_data["role_permissions"][str(role.id)]:
-                self.permissions_data["role_permissions"][str(role.id)]["channels"] = {}
-            
-            if str(channel.id) not in self.permissions_data["role_permissions"][str(role.id)]["channels"]:
-                self.permissions_data["role_permissions"][str(role.id)]["channels"][str(channel.id)] = {}
-            
-            # Set the permission
-            self.permissions_data["role_permissions"][str(role.id)]["channels"][str(channel.id)][permission] = False
-            
-            # Store the updated channel
-            processed_channels.append(f"{channel.name} [ID: {channel.id}]")
-            
-            try:
-                # Apply the permission immediately
-                overwrite = channel.overwrites_for(role)
-                setattr(overwrite, permission, False)
-                await channel.set_permissions(role, overwrite=overwrite)
-            except discord.Forbidden:
-                await ctx.send(f"❌ Error: I don't have permission to modify channel {channel.name}.")
-            except Exception as e:
-                await ctx.send(f"❌ Error setting permissions for {channel.name}: {str(e)}")
+        # Store the updated channels
+        applied_channels = modified_channels + unchanged_channels
+        for channel in target_channels:
+            if channel in applied_channels:
+                processed_channels.append(f"{channel.name} [ID: {channel.id}]")
         
         # Save the updated permissions
-        self._save_permissions_data()
+        self._save_permissions_data("role_permissions")
         
         if processed_channels:
             channels_text = ", ".join(processed_channels)
-            await ctx.send(f"✅ Denied '{permission}' for role '{role.name}' [ID: {role.id}] in channels: {channels_text}")
+            await ctx.send(f"✅ {past_tense} '{permission}' for role '{role.name}' [ID: {role.id}] in channels: {channels_text}")
         else:
             await ctx.send("❌ No channels were updated.")
-
-    @channel_role.command(name="reset")
-    async def role_reset(self, ctx, role_input, permission: str, *channel_inputs):
-        """Reset a permission for a role in specific channels."""
-        if not channel_inputs:
-            return await ctx.send("❌ Please specify at least one channel.")
-        
-        guild = ctx.guild
-        
-        # Resolve the role
-        role = self._resolve_role(guild, role_input)
-        
-        if not role:
-            return await ctx.send("❌ Role not found. Please specify a valid role mention, name, or ID.")
-        
-        # Validate the permission
-        if not hasattr(discord.Permissions, permission):
-            return await ctx.send(f"❌ Invalid permission: {permission}")
+    
+    @channel_role.command(name="allow")
+    async def role_allow(self, ctx, role_input, permission: str, *channel_inputs):
+        """Allow a permission for a role in specific channels.
         
-        # Process each channel
-        processed_channels = []
-        for channel_input in channel_inputs:
-            channel = self._resolve_channel(guild, channel_input)
-            
-            if not channel:
-                await ctx.send(f"⚠️ Channel not found: {channel_input}")
-                continue
-            
-            # Update the permissions data
-            if ("role_permissions" in self.permissions_data and 
-                str(role.id) in self.permissions_data["role_permissions"] and 
-                "channels" in self.permissions_data["role_permissions"][str(role.id)] and 
-                str(channel.id) in self.permissions_data["role_permissions"][str(role.id)]["channels"] and 
-                permission in self.permissions_data["role_permissions"][str(role.id)]["channels"][str(channel.id)]):
-                
-                # Remove the permission
-                del self.permissions_data["role_permissions"][str(role.id)]["channels"][str(channel.id)][permission]
-                
-                # Clean up empty dictionaries
-                if not self.permissions_data["role_permissions"][str(role.id)]["channels"][str(channel.id)]:
-                    del self.permissions_data["role_permissions"][str(role.id)]["channels"][str(channel.id)]
-                
-                if not self.permissions_data["role_permissions"][str(role.id)]["channels"]:
-                    del self.permissions_data["role_permissions"][str(role.id)]["channels"]
-                
-                if not self.permissions_data["role_permissions"][str(role.id)]:
-                    del self.permissions_data["role_permissions"][str(role.id)]
-            
-            # Store the updated channel
-            processed_channels.append(f"{channel.name} [ID: {channel.id}]")
-            
-            try:
-                # Apply the permission reset immediately
-                overwrite = channel.overwrites_for(role)
-                setattr(overwrite, permission, None)
-                
-                # Check if all permissions are None, if so, remove the overwrite
-                all_none = True
-                for perm, value in overwrite:
-                    if value is not None:
-                        all_none = False
-                        break
-                
-                if all_none:
-                    await channel.set_permissions(role, overwrite=None)
-                else:
-                    await channel.set_permissions(role, overwrite=overwrite)
-            except discord.Forbidden:
-                await ctx.send(f"❌ Error: I don't have permission to modify channel {channel.name}.")
-            except Exception as e:
-                await ctx.send(f"❌ Error setting permissions for {channel.name}: {str(e)}")
+        Add --plan to preview the changes without applying them.
+        """
+        await self._set_role_channel_permission(ctx, "allow", role_input, permission, channel_inputs)
+
+    @channel_role.command(name="deny")
+    async def role_deny(self, ctx, role_input, permission: str, *channel_inputs):
+        """Deny a permission for a role in specific channels.
         
-        # Save the updated permissions
-        self._save_permissions_data()
+        Add --plan to preview the changes without applying them.
+        """
+        await self._set_role_channel_permission(ctx, "deny", role_input, permission, channel_inputs)
+
+    @channel_role.command(name="reset")
+    async def role_reset(self, ctx, role_input, permission: str, *channel_inputs):
+        """Reset a permission for a role in specific channels.
         
-        if processed_channels:
-            channels_text = ", ".join(processed_channels)
-            await ctx.send(f"✅ Reset '{permission}' for role '{role.name}' [ID: {role.id}] in channels: {channels_text}")
-        else:
-            await ctx.send("❌ No channels were updated.")
+        Add --plan to preview the changes without applying them.
+        """
+        await self._set_role_channel_permission(ctx, "reset", role_input, permission, channel_inputs)
 
     @channel_role.command(name="copy")
-    async def role_copy_permissions(self, ctx, from_role_input, to_role_input, channel_input=None):
-        """Copy permissions from one role to another for all or a specific channel."""
+    async def role_copy_permissions(self, ctx, from_role_input, to_role_input, *args):
+        """Copy permissions from one role to another for all or a specific channel.
+        
+        Add --plan to preview the changes without applying them.
+        """
+        plan, args = self._split_plan_flag(args)
+        channel_input = args[0] if args else None
+        data = self._working_data(plan)
         guild = ctx.guild
         
         # Resolve the source role
         from_role = self._resolve_role(guild, from_role_input)
         
         if not from_role:
-            return await ctx.send("❌ Source role not found. Please specify a valid role mention, name, or ID.")
+            return await ctx.send(f"❌ Source role not found. Please specify a valid role mention, name, or ID.{did_you_mean(self.bot, guild, 'roles', from_role_input)}")
         
         # Resolve the target role
         to_role = self._resolve_role(guild, to_role_input)
         
         if not to_role:
-            return await ctx.send("❌ Target role not found. Please specify a valid role mention, name, or ID.")
+            return await ctx.send(f"❌ Target role not found. Please specify a valid role mention, name, or ID.{did_you_mean(self.bot, guild, 'roles', to_role_input)}")
         
         # Check if we're copying for a specific channel or all channels
         specific_channel = None
@@ -1138,27 +1964,28 @@ class AdvancedPermissions(commands.Cog):
             specific_channel = self._resolve_channel(guild, channel_input)
             
             if not specific_channel:
-                return await ctx.send("❌ Channel not found. Please specify a valid channel mention, name, or ID.")
+                return await ctx.send(f"❌ Channel not found. Please specify a valid channel mention, name, or ID.{did_you_mean(self.bot, guild, 'channels', channel_input)}")
         
         # Check if the source role has any permissions
-        if ("role_permissions" not in self.permissions_data or 
-            str(from_role.id) not in self.permissions_data["role_permissions"]):
+        if ("role_permissions" not in data or 
+            str(from_role.id) not in data["role_permissions"]):
             return await ctx.send(f"❌ No permissions found for role '{from_role.name}' [ID: {from_role.id}].")
         
-        from_role_data = self.permissions_data["role_permissions"][str(from_role.id)]
+        from_role_data = data["role_permissions"][str(from_role.id)]
         
         # Initialize target role data if it doesn't exist
-        if "role_permissions" not in self.permissions_data:
-            self.permissions_data["role_permissions"] = {}
+        if "role_permissions" not in data:
+            data["role_permissions"] = {}
         
-        if str(to_role.id) not in self.permissions_data["role_permissions"]:
-            self.permissions_data["role_permissions"][str(to_role.id)] = {}
+        if str(to_role.id) not in data["role_permissions"]:
+            data["role_permissions"][str(to_role.id)] = {}
         
         # Copy channel permissions
         copied_channels = []
+        overwrite_maps = {}
         if "channels" in from_role_data and from_role_data["channels"]:
-            if "channels" not in self.permissions_data["role_permissions"][str(to_role.id)]:
-                self.permissions_data["role_permissions"][str(to_role.id)]["channels"] = {}
+            if "channels" not in data["role_permissions"][str(to_role.id)]:
+                data["role_permissions"][str(to_role.id)]["channels"] = {}
             
             for channel_id, perms in from_role_data["channels"].items():
                 # Skip if we're only copying for a specific channel
@@ -1170,34 +1997,32 @@ class AdvancedPermissions(commands.Cog):
                     continue
                 
                 # Copy the permissions
-                self.permissions_data["role_permissions"][str(to_role.id)]["channels"][channel_id] = perms.copy()
+                data["role_permissions"][str(to_role.id)]["channels"][channel_id] = perms.copy()
                 copied_channels.append(channel)
                 
-                # Apply the permissions immediately
-                try:
-                    overwrite = discord.PermissionOverwrite()
-                    for perm_name, perm_value in perms.items():
-                        setattr(overwrite, perm_name, perm_value)
-                    
-                    await channel.set_permissions(to_role, overwrite=overwrite)
-                except discord.Forbidden:
-                    await ctx.send(f"❌ Error: I don't have permission to modify channel {channel.name}.")
-                except Exception as e:
-                    await ctx.send(f"❌ Error setting permissions for {channel.name}: {str(e)}")
+                # Stage the copied overwrite for the target role
+                self._stage_permissions(overwrite_maps, channel, to_role, **perms)
+        
+        if plan:
+            return await self._send_plan(ctx, overwrite_maps, f"copy permissions from {from_role.name} to {to_role.name}")
+        
+        # Apply the copied permissions with one edit per channel
+        _, _, errors = await self._apply_overwrite_maps(overwrite_maps, reason=f"Copied permissions from {from_role.name}")
+        await self._send_errors(ctx, errors)
         
         # Copy group permissions if we're copying all
         copied_groups = []
         if not specific_channel and "groups" in from_role_data and from_role_data["groups"]:
-            if "groups" not in self.permissions_data["role_permissions"][str(to_role.id)]:
-                self.permissions_data["role_permissions"][str(to_role.id)]["groups"] = {}
+            if "groups" not in data["role_permissions"][str(to_role.id)]:
+                data["role_permissions"][str(to_role.id)]["groups"] = {}
             
             for group_name, perms in from_role_data["groups"].items():
                 # Copy the permissions
-                self.permissions_data["role_permissions"][str(to_role.id)]["groups"][group_name] = perms.copy()
+                data["role_permissions"][str(to_role.id)]["groups"][group_name] = perms.copy()
                 copied_groups.append(group_name)
         
         # Save the updated permissions
-        self._save_permissions_data()
+        self._save_permissions_data("role_permissions")
         
         # Generate response message
         response = f"✅ Copied permissions from role '{from_role.name}' [ID: {from_role.id}] to '{to_role.name}' [ID: {to_role.id}]"
@@ -1213,45 +2038,92 @@ class AdvancedPermissions(commands.Cog):
         
         await ctx.send(response)
     
+    @channel_role.command(name="clone")
+    async def role_clone(self, ctx, from_role_input, to_role_input, *flags):
+        """Clone a role's live overwrites in every channel and category onto another role.
+        
+        Add --replace to also remove the target role's overwrites where the
+        source role has none, and --plan to preview the changes.
+        """
+        plan, flags = self._split_plan_flag(flags)
+        replace = "--replace" in flags
+        guild = ctx.guild
+        
+        from_role = self._resolve_role(guild, from_role_input)
+        if not from_role:
+            return await ctx.send(f"❌ Source role not found. Please specify a valid role mention, name, or ID.{did_you_mean(self.bot, guild, 'roles', from_role_input)}")
+        
+        to_role = self._resolve_role(guild, to_role_input)
+        if not to_role:
+            return await ctx.send(f"❌ Target role not found. Please specify a valid role mention, name, or ID.{did_you_mean(self.bot, guild, 'roles', to_role_input)}")
+        
+        if from_role == to_role:
+            return await ctx.send("❌ The source and target roles must be different.")
+        
+        # The index knows which channels have an overwrite for each role, so no channel scan is needed
+        self.index.ensure_guild(guild)
+        channel_ids = set(self.index.channels_with_target(from_role.id))
+        if replace:
+            channel_ids |= self.index.channels_with_target(to_role.id)
+        
+        overwrite_maps = {}
+        for channel_id in channel_ids:
+            channel = guild.get_channel(channel_id)
+            if not channel:
+                continue
+            
+            overwrite_maps[channel] = self._overwrite_map(channel)
+            allow, deny = self.index.overwrites_for(channel_id).get(from_role.id, (0, 0))
+            if allow or deny:
+                overwrite_maps[channel][to_role] = discord.PermissionOverwrite.from_pair(discord.Permissions(allow), discord.Permissions(deny))
+            else:
+                overwrite_maps[channel].pop(to_role, None)
+        
+        # Keep the stored settings in line with the cloned overwrites
+        data = self._working_data(plan)
+        from_role_data = data["role_permissions"].get(str(from_role.id), {})
+        if replace:
+            data["role_permissions"][str(to_role.id)] = copy.deepcopy(from_role_data)
+        elif from_role_data:
+            to_role_data = data["role_permissions"].setdefault(str(to_role.id), {})
+            for key in ("channels", "groups"):
+                to_role_data.setdefault(key, {}).update(copy.deepcopy(from_role_data.get(key, {})))
+        
+        if plan:
+            return await self._send_plan(ctx, overwrite_maps, f"clone {from_role.name} onto {to_role.name}")
+        
+        self._save_permissions_data("role_permissions")
+        
+        status_msg = await ctx.send(f"Cloning '{from_role.name}' onto '{to_role.name}' in {len(overwrite_maps)} channels... This may take a moment.")
+        modified_channels, unchanged_channels, errors = await self._run_job(ctx, f"role clone {from_role.name} -> {to_role.name}", overwrite_maps,
+                                                                            reason=f"Cloned overwrites from {from_role.name}",
+                                                                            progress=ProgressReporter(status_msg, f"Cloning '{from_role.name}' onto '{to_role.name}'"))
+        await self._send_errors(ctx, errors)
+        
+        await status_msg.edit(content=f"✅ Cloned '{from_role.name}' onto '{to_role.name}'! Modified permissions for {len(modified_channels)} channels ({len(unchanged_channels)} already up to date).")
+    
     @channels.command(name="preset")
-    async def apply_preset(self, ctx, preset_name: str):
-        """Apply a preset permission configuration to your server."""
-        preset_name = preset_name.lower()
+    async def apply_preset(self, ctx, preset_name: str, *flags):
+        """Apply a preset permission configuration to your server.
         
-        # Define presets
-        presets = {
-            "crypto": {
-                "public": ["welcome", "rules", "verification", "faq", "announcements"],
-                "info_only": ["announcements", "news", "updates"],
-                "verified_only": ["general", "chat", "discussion", "price", "trading", "market", "analysis", "signals"],
-                "trader_only": ["signals", "vip", "premium"],
-                "admin_only": ["admin", "mod", "staff"]
-            },
-            "community": {
-                "public": ["welcome", "rules", "verification", "announcements"],
-                "info_only": ["announcements", "news", "updates", "rules"],
-                "verified_only": ["general", "chat", "discussion", "media", "memes", "showcase", "support"],
-                "admin_only": ["admin", "mod", "staff"]
-            },
-            "minimal": {
-                "public": ["welcome", "rules", "verification"],
-                "verified_only": ["general", "chat"],
-                "admin_only": ["admin"]
-            }
-        }
+        Add --plan to preview the changes without applying them.
+        """
+        preset_name = preset_name.lower()
+        plan, flags = self._split_plan_flag(flags)
+        data = self._working_data(plan)
         
-        if preset_name not in presets:
-            preset_list = ", ".join(presets.keys())
+        if preset_name not in CHANNEL_PRESETS:
+            preset_list = ", ".join(CHANNEL_PRESETS.keys())
             return await ctx.send(f"❌ Invalid preset. Available presets: {preset_list}")
         
-        # Get preset configuration
-        preset = presets[preset_name]
-        
         # Get role information
         guild = ctx.guild
         verified_role = guild.get_role(config.VERIFIED_ROLE_ID)
         everyone_role = guild.default_role
         
+        if not verified_role:
+            return await ctx.send("❌ Error: Verified role not found. Please check your configuration.")
+        
         # Find admin role
         admin_role = None
         for role in guild.roles:
@@ -1266,7 +2138,8 @@ class AdvancedPermissions(commands.Cog):
                 trader_role = role
                 break
         
-        status_msg = await ctx.send(f"Applying '{preset_name}' preset... This may take a moment.")
+        if not plan:
+            status_msg = await ctx.send(f"Applying '{preset_name}' preset... This may take a moment.")
         
         # Process channels
         public_channels = []
@@ -1275,115 +2148,81 @@ class AdvancedPermissions(commands.Cog):
         trader_only_channels = []
         admin_only_channels = []
         
+        # Each channel gets the first label it matches; trader_only only counts when there is a trader role
+        label_order = ["public", "info_only", "verified_only", "trader_only", "admin_only"]
+        if not trader_role:
+            label_order.remove("trader_only")
+        preset_channels = {
+            "public": public_channels,
+            "info_only": info_only_channels,
+            "verified_only": verified_only_channels,
+            "trader_only": trader_only_channels,
+            "admin_only": admin_only_channels
+        }
+        
         for channel in guild.text_channels:
-            channel_name = channel.name.lower()
-            
-            # Check channel against each category in the preset
-            category_match = False
-            
-            # Public channels
-            for keyword in preset.get("public", []):
-                if keyword in channel_name:
-                    public_channels.append(channel)
-                    category_match = True
-                    break
-            
-            if not category_match:
-                # Info-only channels
-                for keyword in preset.get("info_only", []):
-                    if keyword in channel_name:
-                        info_only_channels.append(channel)
-                        category_match = True
-                        break
-            
-            if not category_match:
-                # Verified-only channels
-                for keyword in preset.get("verified_only", []):
-                    if keyword in channel_name:
-                        verified_only_channels.append(channel)
-                        category_match = True
-                        break
-            
-            if not category_match and trader_role:
-                # Trader-only channels
-                for keyword in preset.get("trader_only", []):
-                    if keyword in channel_name:
-                        trader_only_channels.append(channel)
-                        category_match = True
-                        break
-            
-            if not category_match:
-                # Admin-only channels
-                for keyword in preset.get("admin_only", []):
-                    if keyword in channel_name:
-                        admin_only_channels.append(channel)
-                        category_match = True
-                        break
-            
-            # If no match was found, default to verified-only
-            if not category_match:
-                verified_only_channels.append(channel)
+            label = self.classifier.first(channel, f"preset:{preset_name}", label_order, default="verified_only")
+            preset_channels[label].append(channel)
         
         try:
             # Update permissions data structure
-            self.permissions_data["public_channels"] = [channel.id for channel in public_channels]
+            data["public_channels"] = [channel.id for channel in public_channels]
             
             # Make sure groups exist
             groups_to_create = ["public", "info_only", "verified_only", "trader_only", "admin_only"]
             for group in groups_to_create:
-                if group not in self.permissions_data["channel_groups"]:
-                    self.permissions_data["channel_groups"][group] = []
+                if group not in data["channel_groups"]:
+                    data["channel_groups"][group] = []
             
             # Update channel groups
-            self.permissions_data["channel_groups"]["public"] = [channel.id for channel in public_channels]
-            self.permissions_data["channel_groups"]["info_only"] = [channel.id for channel in info_only_channels]
-            self.permissions_data["channel_groups"]["verified_only"] = [channel.id for channel in verified_only_channels]
-            self.permissions_data["channel_groups"]["trader_only"] = [channel.id for channel in trader_only_channels]
-            self.permissions_data["channel_groups"]["admin_only"] = [channel.id for channel in admin_only_channels]
+            data["channel_groups"]["public"] = [channel.id for channel in public_channels]
+            data["channel_groups"]["info_only"] = [channel.id for channel in info_only_channels]
+            data["channel_groups"]["verified_only"] = [channel.id for channel in verified_only_channels]
+            data["channel_groups"]["trader_only"] = [channel.id for channel in trader_only_channels]
+            data["channel_groups"]["admin_only"] = [channel.id for channel in admin_only_channels]
             
-            self._save_permissions_data()
+            if not plan:
+                self._save_permissions_data("public_channels", "channel_groups")
             
-            # Apply permissions
-            modified_count = 0
+            # Build the full overwrite map for every channel first
+            overwrite_maps = {}
             
             # First make the public channels public
             for channel in public_channels:
-                await channel.set_permissions(verified_role, read_messages=True, send_messages=True)
-                await channel.set_permissions(everyone_role, read_messages=True, read_message_history=True)
-                modified_count += 1
-                await asyncio.sleep(0.3)
+                self._stage_permissions(overwrite_maps, channel, verified_role, read_messages=True, send_messages=True)
+                self._stage_permissions(overwrite_maps, channel, everyone_role, read_messages=True, read_message_history=True)
             
             # Then make the info-only channels info-only
             for channel in info_only_channels:
-                await channel.set_permissions(verified_role, read_messages=True, send_messages=False)
-                await channel.set_permissions(everyone_role, read_messages=True, send_messages=False, read_message_history=True)
-                modified_count += 1
-                await asyncio.sleep(0.3)
+                self._stage_permissions(overwrite_maps, channel, verified_role, read_messages=True, send_messages=False)
+                self._stage_permissions(overwrite_maps, channel, everyone_role, read_messages=True, send_messages=False, read_message_history=True)
             
             # Then make the verified-only channels verified-only
             for channel in verified_only_channels:
-                await channel.set_permissions(verified_role, read_messages=True, send_messages=True)
-                await channel.set_permissions(everyone_role, read_messages=False)
-                modified_count += 1
-                await asyncio.sleep(0.3)
+                self._stage_permissions(overwrite_maps, channel, verified_role, read_messages=True, send_messages=True)
+                self._stage_permissions(overwrite_maps, channel, everyone_role, read_messages=False)
             
             # Then make the trader-only channels trader-only
             if trader_role:
                 for channel in trader_only_channels:
-                    await channel.set_permissions(trader_role, read_messages=True, send_messages=True)
-                    await channel.set_permissions(verified_role, read_messages=False)
-                    await channel.set_permissions(everyone_role, read_messages=False)
-                    modified_count += 1
-                    await asyncio.sleep(0.3)
+                    self._stage_permissions(overwrite_maps, channel, trader_role, read_messages=True, send_messages=True)
+                    self._stage_permissions(overwrite_maps, channel, verified_role, read_messages=False)
+                    self._stage_permissions(overwrite_maps, channel, everyone_role, read_messages=False)
             
             # Then make the admin-only channels admin-only
             if admin_role:
                 for channel in admin_only_channels:
-                    await channel.set_permissions(admin_role, read_messages=True, send_messages=True)
-                    await channel.set_permissions(verified_role, read_messages=False)
-                    await channel.set_permissions(everyone_role, read_messages=False)
-                    modified_count += 1
-                    await asyncio.sleep(0.3)
+                    self._stage_permissions(overwrite_maps, channel, admin_role, read_messages=True, send_messages=True)
+                    self._stage_permissions(overwrite_maps, channel, verified_role, read_messages=False)
+                    self._stage_permissions(overwrite_maps, channel, everyone_role, read_messages=False)
+            
+            if plan:
+                return await self._send_plan(ctx, overwrite_maps, f"apply '{preset_name}' preset")
+            
+            # Apply everything with one edit per channel
+            modified_channels, unchanged_channels, errors = await self._run_job(ctx, f"preset {preset_name}", overwrite_maps, reason=f"Applied '{preset_name}' preset",
+                                                                                progress=ProgressReporter(status_msg, f"Applying '{preset_name}' preset"))
+            await self._send_errors(ctx, errors)
             
             # Create summary embed
             embed = discord.Embed(
@@ -1427,7 +2266,7 @@ class AdvancedPermissions(commands.Cog):
                     inline=False
                 )
             
-            await status_msg.edit(content="Preset applied successfully!")
+            await status_msg.edit(content=f"Preset applied successfully! Modified permissions for {len(modified_channels)} channels ({len(unchanged_channels)} already up to date).")
             await ctx.send(embed=embed)
             
         except discord.Forbidden:
@@ -1436,8 +2275,12 @@ class AdvancedPermissions(commands.Cog):
             await ctx.send(f"❌ Error applying preset: {str(e)}")
     
     @channels.command(name="apply_permissions")
-    async def apply_permissions(self, ctx):
-        """Apply all permission settings to channels."""
+    async def apply_permissions(self, ctx, *flags):
+        """Apply all permission settings to channels.
+        
+        Add --plan to preview the changes without applying them.
+        """
+        plan, flags = self._split_plan_flag(flags)
         guild = ctx.guild
         
         # Get the verified role
@@ -1448,87 +2291,84 @@ class AdvancedPermissions(commands.Cog):
         # Get everyone role (unverified users)
         everyone_role = guild.default_role
         
-        status_msg = await ctx.send("Applying permissions... This may take a moment.")
+        if not plan:
+            status_msg = await ctx.send("Applying permissions... This may take a moment.")
         
-        # Counter for modified channels
-        modified_count = 0
+        overwrite_maps = {}
         
-        # Process all text channels in the server
+        # Build the overwrites for all text channels in the server
         for channel in guild.text_channels:
-            try:
-                # Default permissions
-                overwrites = {}
-                
-                # Set permissions for public channels
-                if channel.id in self.permissions_data["public_channels"]:
-                    # Public channels - everyone can see
-                    overwrites[everyone_role] = discord.PermissionOverwrite(
-                        read_messages=True,
-                        read_message_history=True
-                    )
-                else:
-                    # Private channels - only verified users can see
-                    overwrites[everyone_role] = discord.PermissionOverwrite(
-                        read_messages=False
-                    )
-                
-                # Set permissions for verified role
-                overwrites[verified_role] = discord.PermissionOverwrite(
+            # Default permissions
+            overwrites = {}
+            
+            # Set permissions for public channels
+            if channel.id in self.permissions_data["public_channels"]:
+                # Public channels - everyone can see
+                overwrites[everyone_role] = discord.PermissionOverwrite(
                     read_messages=True,
-                    send_messages=True,
-                    embed_links=True,
-                    attach_files=True,
                     read_message_history=True
                 )
+            else:
+                # Private channels - only verified users can see
+                overwrites[everyone_role] = discord.PermissionOverwrite(
+                    read_messages=False
+                )
+            
+            # Set permissions for verified role
+            overwrites[verified_role] = discord.PermissionOverwrite(
+                read_messages=True,
+                send_messages=True,
+                embed_links=True,
+                attach_files=True,
+                read_message_history=True
+            )
+            
+            # Apply role-specific permissions
+            for role_id, role_data in self.permissions_data["role_permissions"].items():
+                role = guild.get_role(int(role_id))
+                if not role:
+                    continue
                 
-                # Apply role-specific permissions
-                for role_id, role_data in self.permissions_data["role_permissions"].items():
-                    role = guild.get_role(int(role_id))
-                    if not role:
-                        continue
+                # Check if this role has channel-specific permissions
+                if "channels" in role_data and str(channel.id) in role_data["channels"]:
+                    channel_perms = role_data["channels"][str(channel.id)]
                     
-                    # Check if this role has channel-specific permissions
-                    if "channels" in role_data and str(channel.id) in role_data["channels"]:
-                        channel_perms = role_data["channels"][str(channel.id)]
-                        
-                        # Initialize permission overwrite for this role if needed
-                        if role not in overwrites:
-                            overwrites[role] = discord.PermissionOverwrite()
-                        
-                        # Apply each permission
-                        for perm_name, perm_value in channel_perms.items():
-                            setattr(overwrites[role], perm_name, perm_value)
+                    # Initialize permission overwrite for this role if needed
+                    if role not in overwrites:
+                        overwrites[role] = discord.PermissionOverwrite()
                     
-                    # Check if this channel is in any groups that the role has permissions for
-                    if "groups" in role_data:
-                        for group_name, group_perms in role_data["groups"].items():
-                            if group_name in self.permissions_data["channel_groups"] and \
-                               channel.id in self.permissions_data["channel_groups"][group_name]:
-                                
-                                # Initialize permission overwrite for this role if needed
-                                if role not in overwrites:
-                                    overwrites[role] = discord.PermissionOverwrite()
-                                
-                                # Apply each permission
-                                for perm_name, perm_value in group_perms.items():
-                                    setattr(overwrites[role], perm_name, perm_value)
-                
-                # Apply the permissions to the channel
-                await channel.edit(overwrites=overwrites)
-                modified_count += 1
+                    # Apply each permission
+                    for perm_name, perm_value in channel_perms.items():
+                        setattr(overwrites[role], perm_name, perm_value)
                 
-                # Add a short delay to avoid rate limiting
-                await asyncio.sleep(0.5)
-                
-            except discord.Forbidden:
-                await ctx.send(f"❌ Error: I don't have permission to modify channel #{channel.name}.")
-            except Exception as e:
-                await ctx.send(f"❌ Error setting permissions for #{channel.name}: {str(e)}")
+                # Check if this channel is in any groups that the role has permissions for
+                if "groups" in role_data:
+                    for group_name, group_perms in role_data["groups"].items():
+                        if group_name in self.permissions_data["channel_groups"] and \
+                           channel.id in self.permissions_data["channel_groups"][group_name]:
+                            
+                            # Initialize permission overwrite for this role if needed
+                            if role not in overwrites:
+                                overwrites[role] = discord.PermissionOverwrite()
+                            
+                            # Apply each permission
+                            for perm_name, perm_value in group_perms.items():
+                                setattr(overwrites[role], perm_name, perm_value)
+            
+            overwrite_maps[channel] = overwrites
+        
+        if plan:
+            return await self._send_plan(ctx, overwrite_maps, "apply stored permission settings")
+        
+        # Apply the permissions to all channels
+        modified_channels, unchanged_channels, errors = await self._run_job(ctx, "apply_permissions", overwrite_maps, reason="Applied stored permission settings",
+                                                                            progress=ProgressReporter(status_msg, "Applying permissions"))
+        await self._send_errors(ctx, errors)
         
-        await status_msg.edit(content=f"✅ Permission setup complete! Modified permissions for {modified_count} channels.")
+        await status_msg.edit(content=f"✅ Permission setup complete! Modified permissions for {len(modified_channels)} channels ({len(unchanged_channels)} already up to date).")
     
     @channels.command(name="lockdown")
-    async def server_lockdown(self, ctx, mode: str = "all"):
+    async def server_lockdown(self, ctx, *args):
         """
         Quickly lock down the server to prevent spam or raids.
         
@@ -1537,7 +2377,12 @@ class AdvancedPermissions(commands.Cog):
         - public: Lock down only public channels
         - verified: Lock down channels for verified users
         - unlock: Remove the lockdown
+        
+        Add --plan to preview the changes without applying them.
         """
+        plan, args = self._split_plan_flag(args)
+        mode = args[0] if args else "all"
+        data = self._working_data(plan)
         guild = ctx.guild
         everyone_role = guild.default_role
         verified_role = guild.get_role(config.VERIFIED_ROLE_ID)
@@ -1545,77 +2390,62 @@ class AdvancedPermissions(commands.Cog):
         if not verified_role:
             return await ctx.send("❌ Error: Verified role not found. Please check your configuration.")
         
-        status_msg = await ctx.send(f"🔒 Starting server lockdown ({mode} mode)... This may take a moment.")
+        if not plan:
+            status_msg = await ctx.send(f"🔒 Starting server lockdown ({mode} mode)... This may take a moment.")
         
-        # Counter for modified channels
-        modified_count = 0
+        overwrite_maps = {}
+        snapshot = data.setdefault("original_permissions", {})
+        locked_channels = data.setdefault("locked_channels", [])
         
-        # Process channels based on mode
-        for channel in guild.text_channels:
-            try:
-                if mode == "unlock":
-                    # Remove lockdown - restore previous permissions
-                    if channel.id in self.permissions_data.get("locked_channels", []):
-                        if "original_permissions" in self.permissions_data and str(channel.id) in self.permissions_data["original_permissions"]:
-                            # Get saved original permissions
-                            saved_overwrites = {}
-                            for role_id, perms in self.permissions_data["original_permissions"][str(channel.id)].items():
-                                role = guild.get_role(int(role_id)) if role_id != "everyone" else everyone_role
-                                if role:
-                                    overwrite = discord.PermissionOverwrite()
-                                    for perm_name, perm_value in perms.items():
-                                        setattr(overwrite, perm_name, perm_value)
-                                    saved_overwrites[role] = overwrite
-                            
-                            await channel.edit(overwrites=saved_overwrites)
-                        else:
-                            # No saved permissions, just enable sending for verified
-                            await channel.set_permissions(verified_role, send_messages=True)
-                            await channel.set_permissions(everyone_role, send_messages=False)
-                        
-                        modified_count += 1
-                
-                elif (mode == "all" or 
-                     (mode == "public" and channel.id in self.permissions_data.get("public_channels", [])) or
-                     (mode == "verified" and channel.id not in self.permissions_data.get("public_channels", []))):
-                    
-                    # Save current permissions before lockdown if not already saved
-                    if "original_permissions" not in self.permissions_data:
-                        self.permissions_data["original_permissions"] = {}
-                    
-                    if str(channel.id) not in self.permissions_data["original_permissions"]:
-                        channel_perms = {}
-                        for target, overwrite in channel.overwrites.items():
-                            target_id = "everyone" if isinstance(target, discord.Role) and target.id == guild.default_role.id else target.id
-                            channel_perms[str(target_id)] = {
-                                perm: value for perm, value in overwrite.items() if value is not None
-                            }
-                        self.permissions_data["original_permissions"][str(channel.id)] = channel_perms
-                    
-                    # Apply lockdown
-                    await channel.set_permissions(verified_role, send_messages=False)
-                    await channel.set_permissions(everyone_role, send_messages=False)
-                    
-                    # Track locked channels
-                    if "locked_channels" not in self.permissions_data:
-                        self.permissions_data["locked_channels"] = []
-                    if channel.id not in self.permissions_data["locked_channels"]:
-                        self.permissions_data["locked_channels"].append(channel.id)
-                    
-                    modified_count += 1
-                
-                # Add a short delay to avoid rate limiting
-                await asyncio.sleep(0.5)
+        if mode == "unlock":
+            # Restore every locked channel from the snapshot in one batch
+            for channel_id in locked_channels:
+                channel = guild.get_channel(channel_id)
+                if not channel:
+                    continue
                 
-            except discord.Forbidden:
-                await ctx.send(f"❌ Error: I don't have permission to modify channel {channel.name}.")
-            except Exception as e:
-                await ctx.send(f"❌ Error setting permissions for {channel.name}: {str(e)}")
-        
-        # Save the permissions data
-        self._save_permissions_data()
+                if str(channel_id) in snapshot:
+                    overwrite_maps[channel] = self._restore_overwrites(guild, snapshot[str(channel_id)])
+                else:
+                    # No saved permissions, just enable sending for verified
+                    self._stage_permissions(overwrite_maps, channel, verified_role, send_messages=True)
+                    self._stage_permissions(overwrite_maps, channel, everyone_role, send_messages=False)
+        else:
+            target_channels = [
+                channel for channel in guild.text_channels
+                if mode == "all" or
+                (mode == "public" and channel.id in data.get("public_channels", [])) or
+                (mode == "verified" and channel.id not in data.get("public_channels", []))
+            ]
+            
+            # Stage lockdown
+            for channel in target_channels:
+                self._stage_permissions(overwrite_maps, channel, verified_role, send_messages=False)
+                self._stage_permissions(overwrite_maps, channel, everyone_role, send_messages=False)
+        
+        if plan:
+            return await self._send_plan(ctx, overwrite_maps, f"lockdown ({mode})", scheduler=self.lockdown_scheduler)
+        
+        progress = ProgressReporter(status_msg, "Removing lockdown" if mode == "unlock" else f"Locking down ({mode} mode)")
+        if mode == "unlock":
+            # Apply all channel edits concurrently
+            modified_channels, unchanged_channels, errors = await self._apply_overwrite_maps(overwrite_maps, reason=f"Server lockdown ({mode})",
+                                                                                             scheduler=self.lockdown_scheduler, progress=progress)
+        else:
+            # The job captures the pre-lockdown overwrites right before the first write
+            modified_channels, unchanged_channels, errors = await self._run_job(ctx, f"lockdown {mode}", overwrite_maps, reason=f"Server lockdown ({mode})",
+                                                                                progress=progress, snapshot_name=f"pre-lockdown {mode}", lockdown=mode)
+        modified_count = len(modified_channels)
+        await self._send_errors(ctx, errors)
         
         if mode == "unlock":
+            # Forget the snapshot for every channel that was restored
+            for channel in modified_channels + unchanged_channels:
+                snapshot.pop(str(channel.id), None)
+                if channel.id in locked_channels:
+                    locked_channels.remove(channel.id)
+            self._save_permissions_data("original_permissions", "locked_channels")
+            
             await status_msg.edit(content=f"🔓 Lockdown removed! Restored permissions for {modified_count} channels.")
         else:
             await status_msg.edit(content=f"🔒 Lockdown complete! Modified permissions for {modified_count} channels. Use `{config.PREFIX}channels lockdown unlock` to remove the lockdown.")
@@ -1627,29 +2457,56 @@ class AdvancedPermissions(commands.Cog):
         
         Usage:
         {prefix}channels restrict_send --channels #channel1 #channel2 --roles "Role1" "Role2" "Mod"
+        {prefix}channels restrict_send --groups group1 --categories "Category" --roles "Mod"
         
         This allows only members with the specified roles to send messages in the specified channels,
-        while still allowing everyone to read the channels.
+        while still allowing everyone to read the channels. --groups adds every channel of a channel
+        group, and --categories adds a category together with its channels.
+        
+        Add --plan to preview the changes without applying them.
         """
+        plan, args = self._split_plan_flag(args)
+        data = self._working_data(plan)
         if not args:
-            return await ctx.send(f"❌ Usage: `{config.PREFIX}channels restrict_send --channels #channel1 #channel2 --roles \"Role1\" \"Role2\" \"Mod\"`")
+            return await ctx.send(f"❌ Usage: `{config.PREFIX}channels restrict_send --channels #channel1 #channel2 --groups group1 --categories \"Category\" --roles \"Role1\" \"Role2\" \"Mod\"`")
             
         # Parse arguments
         channels = []
         roles = []
         current_arg = None
         
+        def add_channel(channel):
+            if channel not in channels:
+                channels.append(channel)
+        
         for arg in args:
-            if arg in ["--channels", "--roles"]:
+            if arg in ["--channels", "--groups", "--categories", "--roles"]:
                 current_arg = arg
                 continue
                 
             if current_arg == "--channels":
                 channel = self._resolve_channel(ctx.guild, arg)
                 if channel:
-                    channels.append(channel)
+                    add_channel(channel)
                 else:
                     await ctx.send(f"⚠️ Could not find channel: {arg}")
+            elif current_arg == "--groups":
+                if arg not in data["channel_groups"]:
+                    await ctx.send(f"⚠️ Could not find channel group: {arg}")
+                    continue
+                for channel_id in data["channel_groups"][arg]:
+                    channel = ctx.guild.get_channel(channel_id)
+                    if channel:
+                        add_channel(channel)
+            elif current_arg == "--categories":
+                category = self._resolve_category(ctx.guild, arg)
+                if not category:
+                    await ctx.send(f"⚠️ Could not find category: {arg}")
+                    continue
+                # Synced channels inherit the category's new overwrites through one category edit
+                add_channel(category)
+                for channel in category.channels:
+                    add_channel(channel)
             elif current_arg == "--roles":
                 role = self._resolve_role(ctx.guild, arg)
                 if role:
@@ -1665,36 +2522,49 @@ class AdvancedPermissions(commands.Cog):
             
         # Create a new channel group for this restriction if it doesn't exist
         restriction_name = f"restricted_send_{int(datetime.datetime.now().timestamp())}"
-        if restriction_name not in self.permissions_data["channel_groups"]:
-            self.permissions_data["channel_groups"][restriction_name] = []
+        if restriction_name not in data["channel_groups"]:
+            data["channel_groups"][restriction_name] = []
             
         # Add channels to the restriction group
         for channel in channels:
-            if channel.id not in self.permissions_data["channel_groups"][restriction_name]:
-                self.permissions_data["channel_groups"][restriction_name].append(channel.id)
+            if channel.id not in data["channel_groups"][restriction_name]:
+                data["channel_groups"][restriction_name].append(channel.id)
+        
+        # Stage permissions
+        overwrite_maps = {}
+        for channel in channels:
+            # Allow roles to send messages
+            for role in roles:
+                self._stage_permissions(overwrite_maps, channel, role, send_messages=True)
+            
+            # Deny @everyone send permissions
+            # We do not change view_channel permission so people can still read
+            self._stage_permissions(overwrite_maps, channel, ctx.guild.default_role, send_messages=False)
         
-        self._save_permissions_data()
+        if plan:
+            return await self._send_plan(ctx, overwrite_maps, "restrict sending")
         
-        # Apply permissions
+        self._save_permissions_data("channel_groups")
+        
+        # Apply permissions in one batched run, timing every channel
+        status_msg = await ctx.send(f"Restricting sending in {len(channels)} channels... This may take a moment.")
+        timings = {}
+        modified_channels, unchanged_channels, errors = await self._apply_overwrite_maps(overwrite_maps, reason="Restricted sending to specific roles",
+                                                                                         progress=ProgressReporter(status_msg, "Restricting sending"),
+                                                                                         timings=timings)
+        failed = {channel for channel in channels if channel not in modified_channels and channel not in unchanged_channels}
         messages = []
         for channel in channels:
-            try:
-                # Allow roles to send messages
-                for role in roles:
-                    # Set specific permissions for allowed roles
-                    role_overwrite = discord.PermissionOverwrite()
-                    role_overwrite.send_messages = True
-                    await channel.set_permissions(role, overwrite=role_overwrite)
-                    
-                # Deny @everyone send permissions
-                everyone_overwrite = discord.PermissionOverwrite()
-                everyone_overwrite.send_messages = False
-                # We do not change view_channel permission so people can still read
-                await channel.set_permissions(ctx.guild.default_role, overwrite=everyone_overwrite)
-                
-                messages.append(f"✓ {channel.mention}")
-            except Exception as e:
-                messages.append(f"❌ {channel.mention}: {str(e)}")
+            if channel in failed:
+                messages.append(f"❌ {channel.mention} ({timings[channel][0]:.2f}s)")
+            elif channel in unchanged_channels:
+                messages.append(f"✓ {channel.mention} (already restricted)")
+            elif timings[channel][1] != channel:
+                messages.append(f"✓ {channel.mention} (synced with {timings[channel][1].name})")
+            else:
+                messages.append(f"✓ {channel.mention} ({timings[channel][0]:.2f}s)")
+        await self._send_errors(ctx, errors)
+        await status_msg.edit(content=f"✅ Restricted sending in {len(channels)} channels. Modified permissions for {len(modified_channels)} channels ({len(unchanged_channels)} already up to date).")
         
         # Create summary embed
         embed = discord.Embed(
@@ -1709,14 +2579,316 @@ class AdvancedPermissions(commands.Cog):
             inline=False
         )
         
+        if timings:
+            edit_times = sorted({edited: seconds for seconds, edited in timings.values()}.items(), key=lambda item: item[1], reverse=True)
+            embed.add_field(
+                name="Slowest Edits",
+                value="\n".join(f"• {edited.name}: {seconds:.2f}s" for edited, seconds in edit_times[:5]),
+                inline=False
+            )
+        
+        await self._send_with_details(ctx, embed, "\n".join(messages), "restrict_send.txt", field_name="Channels Modified")
+
+    @channels.group(name="jobs", invoke_without_command=True)
+    async def permission_jobs(self, ctx):
+        """Show the progress of bulk permission jobs (presets, apply_permissions, setup_xgc_permissions)."""
+        jobs = [job for job in self.jobs_data["jobs"] if job["guild_id"] == ctx.guild.id]
+        if not jobs:
+            return await ctx.send("No bulk permission jobs have been run yet.")
+        
+        status_icons = {
+            "running": "⏳",
+            "completed": "✅",
+            "completed_with_errors": "⚠️",
+            "failed": "❌",
+            "cancelled": "🚫"
+        }
+        
+        embed = discord.Embed(
+            title="Bulk Permission Jobs",
+            description="Running jobs are resumed automatically after a restart.",
+            color=discord.Color.blue()
+        )
+        
+        for job in reversed(jobs[-10:]):
+            total = len(job["channels"])
+            done = len(set(job["completed"]))
+            percent = done * 100 // total if total else 100
+            value = f"{status_icons.get(job['status'], '❔')} {job['status'].replace('_', ' ')} - {done}/{total} channels ({percent}%)\nStarted {job['created_at'].replace('T', ' ')}"
+            if job["errors"]:
+                value += f"\n{len(job['errors'])} errors, last: {job['errors'][-1][:150]}"
+            embed.add_field(name=f"#{job['id']} {job['name']}", value=value, inline=False)
+        
+        embed.set_footer(text=f"Use {config.PREFIX}channels jobs cancel <id> to stop a job from being resumed.")
+        await ctx.send(embed=embed)
+    
+    @permission_jobs.command(name="cancel")
+    async def cancel_job(self, ctx, job_id: int):
+        """Stop a running job from being resumed after a restart."""
+        job = next((job for job in self.jobs_data["jobs"] if job["id"] == job_id and job["guild_id"] == ctx.guild.id), None)
+        if not job:
+            return await ctx.send(f"❌ Job #{job_id} not found.")
+        
+        if job["status"] != "running":
+            return await ctx.send(f"❌ Job #{job_id} is not running (status: {job['status'].replace('_', ' ')}).")
+        
+        job["status"] = "cancelled"
+        self._save_jobs()
+        await ctx.send(f"🚫 Job #{job_id} cancelled. Edits already in flight will still finish, but it won't be resumed.")
+    
+    @channels.group(name="drift", invoke_without_command=True)
+    async def permission_drift(self, ctx):
+        """Show channels whose overwrites disagree with the stored permission settings."""
+        guild = ctx.guild
+        drift = self._refresh_drift(guild)
+        
+        embed = discord.Embed(
+            title="Permission Drift",
+            description=(
+                f"{len(drift)} channels disagree with the stored permission settings."
+                if drift else "✅ All channels match the stored permission settings."
+            ),
+            color=discord.Color.orange() if drift else discord.Color.green()
+        )
+        
+        source_counts = {}
+        for entry in drift.values():
+            source_counts[entry["source"]] = source_counts.get(entry["source"], 0) + 1
+        if source_counts:
+            embed.add_field(
+                name="Changed by",
+                value=", ".join(f"{source}: {count}" for source, count in sorted(source_counts.items())),
+                inline=True
+            )
+        embed.add_field(name="Auto-heal", value="On" if self.permissions_data.get("drift_auto_heal") else "Off", inline=True)
+        embed.set_footer(text=f"Use {config.PREFIX}channels drift heal to restore the stored settings.")
+        
+        def state(allow, deny, flag):
+            if allow & flag:
+                return "✅"
+            if deny & flag:
+                return "❌"
+            return "⬜"
+        
+        lines = []
+        for channel_id, entry in sorted(drift.items(), key=lambda item: item[1]["since"]):
+            channel = guild.get_channel(channel_id)
+            since = datetime.datetime.fromtimestamp(entry["since"]).strftime("%Y-%m-%d %H:%M")
+            lines.append(f"#{getattr(channel, 'name', channel_id)} ({entry['source']}, since {since})")
+            for target_id, (live_allow, live_deny, allow, deny, mask) in entry["targets"].items():
+                changes = [
+                    f"{perm_name} {state(live_allow, live_deny, flag)} (expected {state(allow, deny, flag)})"
+                    for perm_name, flag in PERMISSION_FLAGS.items()
+                    if mask & flag and state(live_allow, live_deny, flag) != state(allow, deny, flag)
+                ]
+                lines.append(f"  {self._target_name(guild, target_id)}: {', '.join(changes)}")
+        
+        await self._send_with_details(ctx, embed, "\n".join(lines), "permission_drift.txt", field_name="Drifted Channels")
+    
+    @permission_drift.command(name="heal")
+    async def heal_drift(self, ctx, *flags):
+        """Put drifted channels back to the stored permission settings.
+        
+        Add --plan to preview the changes without applying them.
+        """
+        plan, flags = self._split_plan_flag(flags)
+        overwrite_maps = self._stage_drift_heal(ctx.guild)
+        if plan:
+            return await self._send_plan(ctx, overwrite_maps, "heal permission drift")
+        if not overwrite_maps:
+            return await ctx.send("✅ All channels already match the stored permission settings.")
+        
+        status_msg = await ctx.send("Healing permission drift... This may take a moment.")
+        modified_channels, unchanged_channels, errors = await self._apply_overwrite_maps(overwrite_maps, reason="Healed permission drift",
+                                                                                         progress=ProgressReporter(status_msg, "Healing permission drift"))
+        await self._send_errors(ctx, errors)
+        
+        await status_msg.edit(content=f"✅ Permission drift healed! Modified permissions for {len(modified_channels)} channels.")
+    
+    @permission_drift.command(name="autoheal")
+    async def drift_autoheal(self, ctx, setting: str):
+        """Turn automatic healing of manual overwrite changes on or off."""
+        setting = setting.lower()
+        if setting not in ("on", "off"):
+            return await ctx.send("❌ Please use `on` or `off`.")
+        
+        self.permissions_data["drift_auto_heal"] = setting == "on"
+        self._save_permissions_data("drift_auto_heal")
+        if setting == "on":
+            await ctx.send("✅ Auto-heal is on. Manual overwrite changes that disagree with the stored settings will be reverted after a few seconds.")
+        else:
+            await ctx.send("✅ Auto-heal is off. Drift will only be reported.")
+    
+    @channels.group(name="policy", invoke_without_command=True)
+    async def permission_policy(self, ctx):
+        """Commands for applying declarative permission policies."""
+        policy_names = []
+        if os.path.isdir(self.policy_dir):
+            policy_names = sorted(
+                os.path.splitext(filename)[0] for filename in os.listdir(self.policy_dir)
+                if filename.endswith((".json", ".yaml", ".yml"))
+            )
+        
+        embed = discord.Embed(
+            title="Permission Policy Commands",
+            description="Describe the permissions your server should have in a JSON (or YAML) file and apply only what differs",
+            color=discord.Color.blue()
+        )
+        
+        embed.add_field(
+            name="Available Commands",
+            value=(
+                f"`{config.PREFIX}channels policy plan <name>` - Preview what a policy would change\n"
+                f"`{config.PREFIX}channels policy apply <name>` - Apply a policy\n"
+                "Attach a policy file to the message instead of giving a name to use your own."
+            ),
+            inline=False
+        )
+        
         embed.add_field(
-            name="Channels Modified",
-            value="\n".join(messages) or "None",
+            name=f"Policies in {self.policy_dir}/",
+            value=", ".join(policy_names) or "None",
             inline=False
         )
         
         await ctx.send(embed=embed)
-
+    
+    async def _load_policy(self, ctx, name: Optional[str]) -> PermissionPolicy:
+        """Load a policy from the message attachment or from the policies directory."""
+        if ctx.message.attachments:
+            attachment = ctx.message.attachments[0]
+            text = (await attachment.read()).decode("utf-8")
+            return PermissionPolicy.parse(text, attachment.filename)
+        
+        if not name:
+            raise ValueError("Attach a policy file or give the name of one in the policies directory.")
+        
+        base_name = os.path.basename(name)
+        for extension in ("", ".json", ".yaml", ".yml"):
+            path = os.path.join(self.policy_dir, base_name + extension)
+            if os.path.isfile(path):
+                with open(path, 'r', encoding="utf-8") as f:
+                    return PermissionPolicy.parse(f.read(), path)
+        
+        raise ValueError(f"Policy '{name}' not found in {self.policy_dir}/.")
+    
+    def _compile_policy(self, guild, policy: PermissionPolicy) -> Tuple[Dict, List[str]]:
+        """Stage a policy's operations into overwrite maps."""
+        operations, warnings = policy.compile(guild, self.permissions_data["channel_groups"], self.classifier)
+        
+        overwrite_maps = {}
+        staged = set()
+        for channel, role, permissions in operations:
+            # The first rule for a channel and role sets the overwrite, later rules add to it
+            key = (channel.id, role.id)
+            self._stage_permissions(overwrite_maps, channel, role, merge=key in staged or not policy.replace, **permissions)
+            staged.add(key)
+        
+        return overwrite_maps, warnings
+    
+    async def _prepare_policy(self, ctx, name: Optional[str]) -> Tuple[Optional[PermissionPolicy], Dict]:
+        """Load and compile a policy, reporting problems to the user."""
+        try:
+            policy = await self._load_policy(ctx, name)
+            overwrite_maps, warnings = self._compile_policy(ctx.guild, policy)
+        except (ValueError, KeyError, TypeError) as e:
+            await ctx.send(f"❌ Invalid policy: {str(e)}")
+            return None, {}
+        
+        if warnings:
+            warning_text = "\n".join(f"⚠️ {warning}" for warning in warnings[:15])
+            if len(warnings) > 15:
+                warning_text += f"\n*...and {len(warnings) - 15} more warnings*"
+            await ctx.send(warning_text[:2000])
+        
+        return policy, overwrite_maps
+    
+    @permission_policy.command(name="plan")
+    async def policy_plan(self, ctx, name: str = None):
+        """Preview the changes a policy would make without applying them."""
+        policy, overwrite_maps = await self._prepare_policy(ctx, name)
+        if policy:
+            await self._send_plan(ctx, overwrite_maps, f"policy '{policy.name}'")
+    
+    @permission_policy.command(name="apply")
+    async def policy_apply(self, ctx, name: str = None):
+        """Apply a policy, editing only the channels whose permissions differ from it."""
+        policy, overwrite_maps = await self._prepare_policy(ctx, name)
+        if not policy:
+            return
+        
+        status_msg = await ctx.send(f"Applying policy '{policy.name}'... This may take a moment.")
+        modified_channels, unchanged_channels, errors = await self._run_job(ctx, f"policy {policy.name}", overwrite_maps, reason=f"Applied policy '{policy.name}'",
+                                                                            progress=ProgressReporter(status_msg, f"Applying policy '{policy.name}'"))
+        await self._send_errors(ctx, errors)
+        
+        await status_msg.edit(content=f"✅ Policy '{policy.name}' applied! Modified permissions for {len(modified_channels)} channels ({len(unchanged_channels)} already up to date).")
+    
+    @channels.command(name="export")
+    async def export_permissions(self, ctx, flag: str = None):
+        """Export every channel overwrite in the server as a CSV file (add --gzip to compress it).
+        
+        There is one row per channel and overwrite target, with one column per
+        permission holding allow, deny or nothing. Rows are written to a
+        temporary file in batches, so memory use doesn't grow with the server.
+        """
+        compress = flag == "--gzip"
+        guild = ctx.guild
+        self.index.ensure_guild(guild)
+        loop = asyncio.get_running_loop()
+        
+        filename = f"permissions_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.csv" + (".gz" if compress else "")
+        fd, path = tempfile.mkstemp(suffix=".csv.gz" if compress else ".csv")
+        os.close(fd)
+        
+        rows = 0
+        try:
+            if compress:
+                handle = await loop.run_in_executor(None, lambda: gzip.open(path, "wt", newline="", encoding="utf-8"))
+            else:
+                handle = await loop.run_in_executor(None, lambda: open(path, "w", newline="", encoding="utf-8"))
+            
+            try:
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerow(["channel_id", "channel", "category", "target_type", "target_id", "target", *PERMISSION_FLAGS])
+                
+                for channel in guild.channels:
+                    category = getattr(channel, "category", None)
+                    for target_id, (allow, deny) in sorted(self.index.overwrites_for(channel.id).items()):
+                        writer.writerow([
+                            channel.id,
+                            channel.name,
+                            category.name if category else "",
+                            "role" if guild.get_role(target_id) or target_id == guild.id else "member",
+                            target_id,
+                            self._target_name(guild, target_id),
+                            *("allow" if allow & flag_value else "deny" if deny & flag_value else "" for flag_value in PERMISSION_FLAGS.values())
+                        ])
+                        rows += 1
+                    
+                    # Hand full batches to a worker thread so the event loop never blocks on disk
+                    if buffer.tell() > 65536:
+                        await loop.run_in_executor(None, handle.write, buffer.getvalue())
+                        buffer.seek(0)
+                        buffer.truncate()
+                
+                await loop.run_in_executor(None, handle.write, buffer.getvalue())
+            finally:
+                await loop.run_in_executor(None, handle.close)
+            
+            size = os.path.getsize(path)
+            if size > guild.filesize_limit:
+                hint = "" if compress else f" Try `{config.PREFIX}channels export --gzip`."
+                return await ctx.send(f"❌ The export is {size / 1048576:.1f} MB, which is over this server's upload limit.{hint}")
+            
+            await ctx.send(
+                f"📄 Exported {rows} overwrites across {len(guild.channels)} channels.",
+                file=discord.File(path, filename=filename)
+            )
+        finally:
+            os.remove(path)
+    
     @channels.command(name="list_restrictions")
     async def list_restrictions(self, ctx):
         """List all channel restrictions currently set up."""
@@ -1756,8 +2928,173 @@ class AdvancedPermissions(commands.Cog):
         
         await ctx.send(embed=embed)
     
+    @channels.group(name="snapshot", invoke_without_command=True)
+    async def channel_snapshot(self, ctx):
+        """Commands for taking and restoring permission snapshots."""
+        embed = discord.Embed(
+            title="Permission Snapshot Commands",
+            description="Save the server's channel overwrites and role permissions and roll back to them later",
+            color=discord.Color.blue()
+        )
+        
+        embed.add_field(
+            name="Available Commands",
+            value=(
+                f"`{config.PREFIX}channels snapshot take [name]` - Take a snapshot of the current permissions\n"
+                f"`{config.PREFIX}channels snapshot list` - List saved snapshots\n"
+                f"`{config.PREFIX}channels snapshot diff <snapshot> [snapshot]` - Compare a snapshot with another one or with the live server\n"
+                f"`{config.PREFIX}channels snapshot restore <snapshot> [--plan]` - Restore a snapshot, touching only what changed\n"
+            ),
+            inline=False
+        )
+        
+        embed.set_footer(text="Snapshots can be referenced by ID or by name. A snapshot is taken automatically before every lockdown and restore.")
+        await ctx.send(embed=embed)
+    
+    @channel_snapshot.command(name="take")
+    async def snapshot_take(self, ctx, *, name: str = "manual"):
+        """Take a snapshot of all channel overwrites and role permissions."""
+        snapshot = self.snapshots.take(ctx.guild, name)
+        unique_states = len(set(snapshot["channels"].values()))
+        await ctx.send(f"📸 Snapshot #{snapshot['id']} ({name}) saved: {len(snapshot['channels'])} channels ({unique_states} distinct permission sets) and {len(snapshot['roles'])} roles.")
+    
+    @channel_snapshot.command(name="list")
+    async def snapshot_list(self, ctx):
+        """List the saved permission snapshots for this server."""
+        snapshots = self.snapshots.list(ctx.guild.id)
+        if not snapshots:
+            return await ctx.send(f"No snapshots saved yet. Use `{config.PREFIX}channels snapshot take [name]` to create one.")
+        
+        embed = discord.Embed(
+            title="Permission Snapshots",
+            description=f"{len(snapshots)} snapshots saved (newest first)",
+            color=discord.Color.blue()
+        )
+        
+        lines = [
+            f"`#{snapshot['id']}` **{snapshot['name']}** - {snapshot['taken_at'].replace('T', ' ')} ({len(snapshot['channels'])} channels)"
+            for snapshot in reversed(snapshots)
+        ]
+        embed.add_field(name="Snapshots", value="\n".join(lines[:20]), inline=False)
+        if len(lines) > 20:
+            embed.set_footer(text=f"...and {len(lines) - 20} older snapshots")
+        
+        await ctx.send(embed=embed)
+    
+    @channel_snapshot.command(name="diff")
+    async def snapshot_diff(self, ctx, from_reference: str, to_reference: str = None):
+        """Compare a snapshot with another snapshot, or with the live server if only one is given."""
+        guild = ctx.guild
+        from_snapshot = self.snapshots.get(guild.id, from_reference)
+        if not from_snapshot:
+            return await ctx.send(f"❌ Snapshot '{from_reference}' not found. Use `{config.PREFIX}channels snapshot list` to see available snapshots.")
+        
+        if to_reference:
+            to_snapshot = self.snapshots.get(guild.id, to_reference)
+            if not to_snapshot:
+                return await ctx.send(f"❌ Snapshot '{to_reference}' not found. Use `{config.PREFIX}channels snapshot list` to see available snapshots.")
+            after = self.snapshots.resolve(to_snapshot)
+            to_label = f"#{to_snapshot['id']} ({to_snapshot['name']})"
+        else:
+            after = self.snapshots.live_state(guild)
+            to_label = "live server"
+        
+        before = self.snapshots.resolve(from_snapshot)
+        diff = self.snapshots.diff(before, after)
+        
+        embed = discord.Embed(
+            title=f"🔍 Snapshot #{from_snapshot['id']} ({from_snapshot['name']}) → {to_label}",
+            color=discord.Color.blue()
+        )
+        embed.add_field(name="Channels changed", value=str(len(diff["channels_changed"])), inline=True)
+        embed.add_field(name="Channels added", value=str(len(diff["channels_added"])), inline=True)
+        embed.add_field(name="Channels removed", value=str(len(diff["channels_removed"])), inline=True)
+        embed.add_field(name="Roles changed", value=str(len(diff["roles_changed"])), inline=True)
+        
+        lines = []
+        for channel_id in diff["channels_changed"]:
+            channel = guild.get_channel(int(channel_id))
+            channel_name = f"#{channel.name}" if channel else "#deleted-channel"
+            old_overwrites = self._restore_overwrites(guild, self.snapshots.overwrite_entries(before["channels"][channel_id]))
+            new_overwrites = self._restore_overwrites(guild, self.snapshots.overwrite_entries(after["channels"][channel_id]))
+            lines.append(f"{channel_name} [ID: {channel_id}]")
+            lines.extend(f"  {line}" for line in self._describe_overwrite_changes(channel, new_overwrites, current=old_overwrites))
+        
+        for role_id in diff["roles_changed"]:
+            role = guild.get_role(int(role_id))
+            role_name = role.name if role else f"ID: {role_id}"
+            old_value, new_value = before["roles"][role_id], after["roles"][role_id]
+            changes = [
+                f"{perm_name} {'✅' if old_value & flag else '⬜'}→{'✅' if new_value & flag else '⬜'}"
+                for perm_name, flag in PERMISSION_FLAGS.items()
+                if (old_value & flag) != (new_value & flag)
+            ]
+            lines.append(f"Role {role_name}: {', '.join(changes)}")
+        
+        await self._send_with_details(ctx, embed, "\n".join(lines), "snapshot_diff.txt")
+    
+    @channel_snapshot.command(name="restore")
+    async def snapshot_restore(self, ctx, reference: str, *flags):
+        """
+        Restore channel overwrites and role permissions from a snapshot.
+        
+        Only channels and roles that differ from the snapshot are edited. Channels
+        created after the snapshot are left alone.
+        
+        Add --plan to preview the changes without applying them.
+        """
+        plan, flags = self._split_plan_flag(flags)
+        guild = ctx.guild
+        snapshot = self.snapshots.get(guild.id, reference)
+        if not snapshot:
+            return await ctx.send(f"❌ Snapshot '{reference}' not found. Use `{config.PREFIX}channels snapshot list` to see available snapshots.")
+        
+        state = self.snapshots.resolve(snapshot)
+        
+        overwrite_maps = {}
+        for channel_id, channel_state in state["channels"].items():
+            channel = guild.get_channel(int(channel_id))
+            if channel:
+                overwrite_maps[channel] = self._restore_overwrites(guild, self.snapshots.overwrite_entries(channel_state))
+        
+        role_changes = []
+        for role_id, permissions_value in state["roles"].items():
+            role = guild.get_role(int(role_id))
+            if role and role.permissions.value != permissions_value:
+                role_changes.append((role, permissions_value))
+        
+        if plan:
+            if role_changes:
+                await ctx.send(f"⚠️ Permissions of these roles would also be restored: {', '.join(role.name for role, _ in role_changes)}")
+            return await self._send_plan(ctx, overwrite_maps, f"restore snapshot #{snapshot['id']} ({snapshot['name']})")
+        
+        status_msg = await ctx.send(f"⏪ Restoring snapshot #{snapshot['id']} ({snapshot['name']})... This may take a moment.")
+        
+        # The job keeps the current state before its first edit, so the restore itself can be undone.
+        # Roles are restored afterwards so the backup still has their old permissions.
+        modified_channels, unchanged_channels, channel_errors = await self._run_job(ctx, f"restore snapshot {snapshot['id']}", overwrite_maps,
+                                                                                    reason=f"Restored snapshot #{snapshot['id']}",
+                                                                                    progress=ProgressReporter(status_msg, f"Restoring snapshot #{snapshot['id']}"),
+                                                                                    snapshot_name=f"pre-restore {snapshot['id']}")
+        backup = self.snapshots.get(guild.id, f"pre-restore {snapshot['id']}")
+        
+        errors = []
+        restored_roles = 0
+        for role, permissions_value in role_changes:
+            try:
+                await role.edit(permissions=discord.Permissions(permissions_value), reason=f"Restored snapshot #{snapshot['id']}")
+                restored_roles += 1
+            except discord.Forbidden:
+                errors.append(f"I don't have permission to modify role {role.name}.")
+            except Exception as e:
+                errors.append(f"Error restoring role {role.name}: {str(e)}")
+        
+        await self._send_errors(ctx, channel_errors + errors)
+        
+        await status_msg.edit(content=f"✅ Snapshot #{snapshot['id']} restored! Modified permissions for {len(modified_channels)} channels ({len(unchanged_channels)} already up to date) and {restored_roles} roles. Use `{config.PREFIX}channels snapshot restore {backup['id']}` to undo.")
+    
     @channels.command(name="setup_xgc_permissions")
-    async def setup_xgc_permissions(self, ctx):
+    async def setup_xgc_permissions(self, ctx, *flags):
         """
         Automatically set up XGC server permissions based on the following structure:
         
@@ -1781,7 +3118,12 @@ class AdvancedPermissions(commands.Cog):
           
         - Admins:
           Full access to everything
+        
+        Add --plan to preview the changes without creating roles or applying them.
         """
+        plan, flags = self._split_plan_flag(flags)
+        data = self._working_data(plan)
+        missing_roles = []
         guild = ctx.guild
         
         # Get roles or create them if they don't exist
@@ -1792,7 +3134,9 @@ class AdvancedPermissions(commands.Cog):
         
         # Look for other roles
         nft_holder_role = discord.utils.get(guild.roles, name="NFT Holder")
-        if not nft_holder_role:
+        if not nft_holder_role and plan:
+            missing_roles.append("NFT Holder")
+        elif not nft_holder_role:
             await ctx.send("⚠️ 'NFT Holder' role not found. Creating it...")
             try:
                 nft_holder_role = await guild.create_role(name="NFT Holder", color=discord.Color.purple())
@@ -1801,7 +3145,9 @@ class AdvancedPermissions(commands.Cog):
                 return
         
         bot_role = discord.utils.get(guild.roles, name="XGC")
-        if not bot_role:
+        if not bot_role and plan:
+            missing_roles.append("XGC")
+        elif not bot_role:
             await ctx.send("⚠️ 'XGC' bot role not found. Creating it...")
             try:
                 bot_role = await guild.create_role(name="XGC", color=discord.Color.blue())
@@ -1810,7 +3156,9 @@ class AdvancedPermissions(commands.Cog):
                 return
         
         mod_role = discord.utils.get(guild.roles, name="Moderator")
-        if not mod_role:
+        if not mod_role and plan:
+            missing_roles.append("Moderator")
+        elif not mod_role:
             await ctx.send("⚠️ 'Moderator' role not found. Creating it...")
             try:
                 mod_role = await guild.create_role(name="Moderator", color=discord.Color.red())
@@ -1819,7 +3167,9 @@ class AdvancedPermissions(commands.Cog):
                 return
         
         admin_role = discord.utils.get(guild.roles, name="Admin")
-        if not admin_role:
+        if not admin_role and plan:
+            missing_roles.append("Admin")
+        elif not admin_role:
             await ctx.send("⚠️ 'Admin' role not found. Creating it...")
             try:
                 admin_role = await guild.create_role(name="Admin", color=discord.Color.gold())
@@ -1828,7 +3178,8 @@ class AdvancedPermissions(commands.Cog):
                 return
         
         # Create channel groups
-        status_msg = await ctx.send("Setting up channel groups...")
+        if not plan:
+            status_msg = await ctx.send("Setting up channel groups...")
         
         # Define our channel groups
         channel_groups = {
@@ -1842,158 +3193,134 @@ class AdvancedPermissions(commands.Cog):
         
         # Create the groups in our permissions data
         for group_name in channel_groups.keys():
-            if group_name not in self.permissions_data["channel_groups"]:
-                self.permissions_data["channel_groups"][group_name] = []
+            if group_name not in data["channel_groups"]:
+                data["channel_groups"][group_name] = []
         
         # Auto-categorize channels based on name
         for channel in guild.channels:
             if isinstance(channel, discord.CategoryChannel):
                 continue
                 
-            channel_name = channel.name.lower()
+            labels = self.classifier.labels(channel, "xgc")
+            group_name = next((label for label in ("public", "general", "alpha", "mod") if label in labels), None)
+            if group_name is None:
+                continue
             
-            # Public channels detection
-            if any(keyword in channel_name for keyword in ["verification", "welcome", "rules", "total-members", "xrp-price", "xrp_price"]):
-                if channel.id not in self.permissions_data["channel_groups"]["public"]:
-                    self.permissions_data["channel_groups"]["public"].append(channel.id)
-                if channel.id not in self.permissions_data["public_channels"]:
-                    self.permissions_data["public_channels"].append(channel.id)
-                
-                # If it's also an information channel
-                if any(keyword in channel_name for keyword in ["welcome", "rules", "announcement", "news", "roles"]):
-                    if channel.id not in self.permissions_data["channel_groups"]["info_only"]:
-                        self.permissions_data["channel_groups"]["info_only"].append(channel.id)
-            
-            # General channels detection
-            elif any(keyword in channel_name for keyword in ["general", "chat", "voice", "raid", "giveaway", "game", "project"]):
-                if channel.id not in self.permissions_data["channel_groups"]["general"]:
-                    self.permissions_data["channel_groups"]["general"].append(channel.id)
-            
-            # Alpha channels detection
-            elif "alpha" in channel_name:
-                if channel.id not in self.permissions_data["channel_groups"]["alpha"]:
-                    self.permissions_data["channel_groups"]["alpha"].append(channel.id)
-            
-            # Mod channels detection
-            elif any(keyword in channel_name for keyword in ["mod", "admin", "log", "staff", "bot-log", "modlog", "testing"]):
-                if channel.id not in self.permissions_data["channel_groups"]["mod"]:
-                    self.permissions_data["channel_groups"]["mod"].append(channel.id)
-                
-                # If it's specifically a bot channel
-                if any(keyword in channel_name for keyword in ["bot-log", "bot_log"]):
-                    if channel.id not in self.permissions_data["channel_groups"]["bot"]:
-                        self.permissions_data["channel_groups"]["bot"].append(channel.id)
+            if channel.id not in data["channel_groups"][group_name]:
+                data["channel_groups"][group_name].append(channel.id)
+            if group_name == "public" and channel.id not in data["public_channels"]:
+                data["public_channels"].append(channel.id)
+            
+            # Information channels are public too, and bot channels are mod channels too
+            subgroup = {"public": "info_only", "mod": "bot"}.get(group_name)
+            if subgroup in labels and channel.id not in data["channel_groups"][subgroup]:
+                data["channel_groups"][subgroup].append(channel.id)
         
         # Save the groups
-        self._save_permissions_data()
-        
-        await status_msg.edit(content="✅ Channel groups set up. Now applying permissions...")
+        if not plan:
+            self._save_permissions_data("channel_groups", "public_channels")
+            await status_msg.edit(content="✅ Channel groups set up. Now applying permissions...")
         
         # Set up role permissions
         try:
+            # Stage every rule into one overwrite map per channel
+            overwrite_maps = {}
+            
             # RULE 1: Public channels - visible to everyone
-            for channel_id in self.permissions_data["channel_groups"]["public"]:
+            for channel_id in data["channel_groups"]["public"]:
                 channel = guild.get_channel(channel_id)
                 if not channel:
                     continue
                 
-                await channel.set_permissions(everyone_role, view_channel=True, read_messages=True, 
-                                            read_message_history=True, send_messages=False)
-                await channel.set_permissions(verified_role, view_channel=True, read_messages=True,
-                                           read_message_history=True, send_messages=False)
+                self._stage_permissions(overwrite_maps, channel, everyone_role, view_channel=True, read_messages=True,
+                                        read_message_history=True, send_messages=False)
+                self._stage_permissions(overwrite_maps, channel, verified_role, view_channel=True, read_messages=True,
+                                        read_message_history=True, send_messages=False)
                 
                 # Special case for verification channel - everyone can send messages there
                 if "verification" in channel.name.lower():
-                    await channel.set_permissions(everyone_role, send_messages=True)
-                
-                # Add delay to prevent rate limiting
-                await asyncio.sleep(0.5)
+                    self._stage_permissions(overwrite_maps, channel, everyone_role, merge=True, send_messages=True)
             
             # RULE 2: Information channels - no one can send messages except mods and admins
-            for channel_id in self.permissions_data["channel_groups"]["info_only"]:
+            for channel_id in data["channel_groups"]["info_only"]:
                 channel = guild.get_channel(channel_id)
                 if not channel:
                     continue
                 
-                await channel.set_permissions(everyone_role, send_messages=False)
-                await channel.set_permissions(verified_role, send_messages=False)
-                await channel.set_permissions(nft_holder_role, send_messages=False)
-                await channel.set_permissions(mod_role, send_messages=True)
-                await channel.set_permissions(admin_role, send_messages=True)
-                
-                # Add delay to prevent rate limiting
-                await asyncio.sleep(0.5)
+                self._stage_permissions(overwrite_maps, channel, everyone_role, send_messages=False)
+                self._stage_permissions(overwrite_maps, channel, verified_role, send_messages=False)
+                self._stage_permissions(overwrite_maps, channel, nft_holder_role, send_messages=False)
+                self._stage_permissions(overwrite_maps, channel, mod_role, send_messages=True)
+                self._stage_permissions(overwrite_maps, channel, admin_role, send_messages=True)
             
             # RULE 3: General channels - only verified users and above can see
-            for channel_id in self.permissions_data["channel_groups"]["general"]:
+            for channel_id in data["channel_groups"]["general"]:
                 channel = guild.get_channel(channel_id)
                 if not channel:
                     continue
                 
-                await channel.set_permissions(everyone_role, view_channel=False, read_messages=False)
-                await channel.set_permissions(verified_role, view_channel=True, read_messages=True,
-                                           send_messages=True, add_reactions=True)
-                
-                # Add delay to prevent rate limiting
-                await asyncio.sleep(0.5)
+                self._stage_permissions(overwrite_maps, channel, everyone_role, view_channel=False, read_messages=False)
+                self._stage_permissions(overwrite_maps, channel, verified_role, view_channel=True, read_messages=True,
+                                        send_messages=True, add_reactions=True)
             
             # RULE 4: Alpha channels - only NFT holders and above can see
-            for channel_id in self.permissions_data["channel_groups"]["alpha"]:
+            for channel_id in data["channel_groups"]["alpha"]:
                 channel = guild.get_channel(channel_id)
                 if not channel:
                     continue
                 
-                await channel.set_permissions(everyone_role, view_channel=False, read_messages=False)
-                await channel.set_permissions(verified_role, view_channel=False, read_messages=False)
-                await channel.set_permissions(nft_holder_role, view_channel=True, read_messages=True,
-                                          send_messages=True, add_reactions=True)
-                
-                # Add delay to prevent rate limiting
-                await asyncio.sleep(0.5)
+                self._stage_permissions(overwrite_maps, channel, everyone_role, view_channel=False, read_messages=False)
+                self._stage_permissions(overwrite_maps, channel, verified_role, view_channel=False, read_messages=False)
+                self._stage_permissions(overwrite_maps, channel, nft_holder_role, view_channel=True, read_messages=True,
+                                        send_messages=True, add_reactions=True)
             
             # RULE 5: Mod channels - only mods, admins, and bots can see
-            for channel_id in self.permissions_data["channel_groups"]["mod"]:
+            for channel_id in data["channel_groups"]["mod"]:
                 channel = guild.get_channel(channel_id)
                 if not channel:
                     continue
                 
-                await channel.set_permissions(everyone_role, view_channel=False, read_messages=False)
-                await channel.set_permissions(verified_role, view_channel=False, read_messages=False)
-                await channel.set_permissions(nft_holder_role, view_channel=False, read_messages=False)
-                await channel.set_permissions(bot_role, view_channel=True, read_messages=True, 
-                                           send_messages=True)
-                await channel.set_permissions(mod_role, view_channel=True, read_messages=True,
-                                           send_messages=True)
-                await channel.set_permissions(admin_role, view_channel=True, read_messages=True,
-                                           send_messages=True)
-                
-                # Add delay to prevent rate limiting
-                await asyncio.sleep(0.5)
+                self._stage_permissions(overwrite_maps, channel, everyone_role, view_channel=False, read_messages=False)
+                self._stage_permissions(overwrite_maps, channel, verified_role, view_channel=False, read_messages=False)
+                self._stage_permissions(overwrite_maps, channel, nft_holder_role, view_channel=False, read_messages=False)
+                self._stage_permissions(overwrite_maps, channel, bot_role, view_channel=True, read_messages=True,
+                                        send_messages=True)
+                self._stage_permissions(overwrite_maps, channel, mod_role, view_channel=True, read_messages=True,
+                                        send_messages=True)
+                self._stage_permissions(overwrite_maps, channel, admin_role, view_channel=True, read_messages=True,
+                                        send_messages=True)
             
             # RULE 6: Bot channels - only bots and admins can send messages
-            for channel_id in self.permissions_data["channel_groups"]["bot"]:
+            for channel_id in data["channel_groups"]["bot"]:
                 channel = guild.get_channel(channel_id)
                 if not channel:
                     continue
                 
-                await channel.set_permissions(mod_role, send_messages=False)
-                await channel.set_permissions(bot_role, send_messages=True)
-                
-                # Add delay to prevent rate limiting
-                await asyncio.sleep(0.5)
+                self._stage_permissions(overwrite_maps, channel, mod_role, send_messages=False)
+                self._stage_permissions(overwrite_maps, channel, bot_role, send_messages=True)
+            
+            if plan:
+                if missing_roles:
+                    await ctx.send(f"⚠️ These roles would be created: {', '.join(missing_roles)}. Their permissions are not included in the plan below.")
+                return await self._send_plan(ctx, overwrite_maps, "XGC permission setup")
+            
+            # Apply all rules with one edit per channel
+            modified_channels, unchanged_channels, errors = await self._run_job(ctx, "setup_xgc_permissions", overwrite_maps, reason="XGC permission setup",
+                                                                                progress=ProgressReporter(status_msg, "Applying XGC permissions"))
+            await self._send_errors(ctx, errors)
             
             # Send success message with summary
             embed = discord.Embed(
                 title="✅ XGC Server Permissions Setup Complete",
-                description="All channel permissions have been set up according to the XGC role hierarchy.",
+                description=f"All channel permissions have been set up according to the XGC role hierarchy. Modified permissions for {len(modified_channels)} channels ({len(unchanged_channels)} already up to date).",
                 color=discord.Color.green()
             )
             
             # Add info about each group to the embed
-            public_channels = [guild.get_channel(id).name for id in self.permissions_data["channel_groups"]["public"] if guild.get_channel(id)]
-            general_channels = [guild.get_channel(id).name for id in self.permissions_data["channel_groups"]["general"] if guild.get_channel(id)]
-            alpha_channels = [guild.get_channel(id).name for id in self.permissions_data["channel_groups"]["alpha"] if guild.get_channel(id)]
-            mod_channels = [guild.get_channel(id).name for id in self.permissions_data["channel_groups"]["mod"] if guild.get_channel(id)]
+            public_channels = [guild.get_channel(id).name for id in data["channel_groups"]["public"] if guild.get_channel(id)]
+            general_channels = [guild.get_channel(id).name for id in data["channel_groups"]["general"] if guild.get_channel(id)]
+            alpha_channels = [guild.get_channel(id).name for id in data["channel_groups"]["alpha"] if guild.get_channel(id)]
+            mod_channels = [guild.get_channel(id).name for id in data["channel_groups"]["mod"] if guild.get_channel(id)]
             
             if public_channels:
                 embed.add_field(name="Public Channels", value=", ".join(public_channels) if len(public_channels) < 10 else f"{len(public_channels)} channels", inline=False)
@@ -2046,7 +3373,7 @@ class AdvancedPermissions(commands.Cog):
                 }
         
         # Save the settings
-        self._save_permissions_data()
+        self._save_permissions_data("channel_groups", "role_permissions")
         
         # Auto-detect channel groups
         welcome_channels = []
@@ -2054,35 +3381,29 @@ class AdvancedPermissions(commands.Cog):
         trading_channels = []
         admin_channels = []
         
+        detected = {
+            "public": welcome_channels,
+            "trading": trading_channels,
+            "community": community_channels,
+            "admin": admin_channels
+        }
+        
         for channel in ctx.guild.text_channels:
-            channel_name = channel.name.lower()
-            
             # Auto-categorize by channel name
-            if "welcome" in channel_name or "verify" in channel_name or "rules" in channel_name:
-                welcome_channels.append(channel)
+            group_name = self.classifier.first(channel, "quicksetup", ["public", "trading", "community", "admin"])
+            if group_name is None:
+                continue
+            
+            detected[group_name].append(channel)
+            if group_name == "public":
                 if channel.id not in self.permissions_data["public_channels"]:
                     self.permissions_data["public_channels"].append(channel.id)
-            
-            elif "trading" in channel_name or "market" in channel_name or "price" in channel_name:
-                trading_channels.append(channel)
-                if "trading" in self.permissions_data["channel_groups"]:
-                    if channel.id not in self.permissions_data["channel_groups"]["trading"]:
-                        self.permissions_data["channel_groups"]["trading"].append(channel.id)
-            
-            elif "general" in channel_name or "chat" in channel_name or "discussion" in channel_name:
-                community_channels.append(channel)
-                if "community" in self.permissions_data["channel_groups"]:
-                    if channel.id not in self.permissions_data["channel_groups"]["community"]:
-                        self.permissions_data["channel_groups"]["community"].append(channel.id)
-            
-            elif "admin" in channel_name or "mod" in channel_name or "staff" in channel_name:
-                admin_channels.append(channel)
-                if "admin" in self.permissions_data["channel_groups"]:
-                    if channel.id not in self.permissions_data["channel_groups"]["admin"]:
-                        self.permissions_data["channel_groups"]["admin"].append(channel.id)
+            elif group_name in self.permissions_data["channel_groups"]:
+                if channel.id not in self.permissions_data["channel_groups"][group_name]:
+                    self.permissions_data["channel_groups"][group_name].append(channel.id)
         
         # Save after auto-categorization
-        self._save_permissions_data()
+        self._save_permissions_data("public_channels", "channel_groups")
         
         # Send summary
         embed = discord.Embed(
@@ -2127,18 +3448,24 @@ class AdvancedPermissions(commands.Cog):
         
         # Apply permissions to channels
         try:
+            overwrite_maps = {}
+            
             # Apply permissions to public channels
             for channel in welcome_channels:
-                await channel.set_permissions(verified_role, read_messages=True, send_messages=True)
-                await channel.set_permissions(everyone_role, read_messages=True, read_message_history=True)
-                await asyncio.sleep(0.5)  # Avoid rate limiting
+                if verified_role:
+                    self._stage_permissions(overwrite_maps, channel, verified_role, read_messages=True, send_messages=True)
+                self._stage_permissions(overwrite_maps, channel, everyone_role, read_messages=True, read_message_history=True)
             
             # Apply permissions to other channels - make them verified-only
             all_other_channels = [ch for ch in ctx.guild.text_channels if ch not in welcome_channels]
             for channel in all_other_channels:
-                await channel.set_permissions(verified_role, read_messages=True, send_messages=True)
-                await channel.set_permissions(everyone_role, read_messages=False)
-                await asyncio.sleep(0.5)  # Avoid rate limiting
+                if verified_role:
+                    self._stage_permissions(overwrite_maps, channel, verified_role, read_messages=True, send_messages=True)
+                self._stage_permissions(overwrite_maps, channel, everyone_role, read_messages=False)
+            
+            _, _, errors = await self._apply_overwrite_maps(overwrite_maps, reason="Quick setup",
+                                                            progress=ProgressReporter(status_msg, "Applying permission settings"))
+            await self._send_errors(ctx, errors)
                 
             await status_msg.edit(content="✅ Permission settings applied successfully!")
                 
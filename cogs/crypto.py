@@ -1,8 +1,8 @@
 import discord
 from discord.ext import commands
-import aiohttp
 import json
 import config
+import http_client
 from datetime import datetime
 import asyncio
 
@@ -11,6 +11,7 @@ class Crypto(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
+        self.http_service = http_client.acquire(bot)
         # XGC token info
         self.XGC_ISSUER = "rM4qkDcRyMDks5v1hYakKnLbTeppmgCpM1"
         self.XGC_CURRENCY = "XGC"
@@ -29,84 +30,84 @@ class Crypto(commands.Cog):
         
         try:
             # Query the XRP Ledger using JSON-RPC API
-            async with aiohttp.ClientSession() as session:
-                # Use public XRP Ledger node
-                url = "https://s1.ripple.com:51234/"
-                
-                # Query the XGC/XRP order book
-                payload = {
-                    "method": "book_offers",
-                    "params": [{
-                        "taker_gets": {
-                            "currency": "XRP"
-                        },
-                        "taker_pays": {
-                            "currency": self.XGC_CURRENCY,
-                            "issuer": self.XGC_ISSUER
-                        },
-                        "limit": 10
-                    }]
-                }
-                
-                async with session.post(url, json=payload) as response:
-                    if response.status == 200:
-                        data = await response.json()
+            session = self.http_service.session
+            # Use public XRP Ledger node
+            url = "https://s1.ripple.com:51234/"
+            
+            # Query the XGC/XRP order book
+            payload = {
+                "method": "book_offers",
+                "params": [{
+                    "taker_gets": {
+                        "currency": "XRP"
+                    },
+                    "taker_pays": {
+                        "currency": self.XGC_CURRENCY,
+                        "issuer": self.XGC_ISSUER
+                    },
+                    "limit": 10
+                }]
+            }
+            
+            async with session.post(url, json=payload) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    
+                    # Check if we have offers
+                    if "result" in data and "offers" in data["result"] and len(data["result"]["offers"]) > 0:
+                        # Get the best offer
+                        best_offer = data["result"]["offers"][0]
+                        
+                        # Extract values and calculate price
+                        xrp_amount = float(best_offer["TakerGets"]) / 1_000_000  # Convert drops to XRP
+                        xgc_amount = float(best_offer["TakerPays"]["value"])
+                        xgc_price_in_xrp = xrp_amount / xgc_amount
+                        
+                        # Create success embed
+                        embed = discord.Embed(
+                            title="XGC Price",
+                            description=f"Current price from the XRP Ledger DEX",
+                            color=discord.Color.green(),
+                            timestamp=datetime.utcnow()
+                        )
+                        
+                        embed.add_field(
+                            name="XGC/XRP",
+                            value=f"**{xgc_price_in_xrp:.6f} XRP**",
+                            inline=False
+                        )
+                        
+                        # Add some extra info about the data
+                        embed.add_field(
+                            name="Trade Details",
+                            value=f"Best offer: {xrp_amount:.2f} XRP for {xgc_amount:.2f} XGC",
+                            inline=True
+                        )
                         
-                        # Check if we have offers
-                        if "result" in data and "offers" in data["result"] and len(data["result"]["offers"]) > 0:
-                            # Get the best offer
-                            best_offer = data["result"]["offers"][0]
-                            
-                            # Extract values and calculate price
-                            xrp_amount = float(best_offer["TakerGets"]) / 1_000_000  # Convert drops to XRP
-                            xgc_amount = float(best_offer["TakerPays"]["value"])
-                            xgc_price_in_xrp = xrp_amount / xgc_amount
-                            
-                            # Create success embed
-                            embed = discord.Embed(
-                                title="XGC Price",
-                                description=f"Current price from the XRP Ledger DEX",
-                                color=discord.Color.green(),
-                                timestamp=datetime.utcnow()
-                            )
-                            
-                            embed.add_field(
-                                name="XGC/XRP",
-                                value=f"**{xgc_price_in_xrp:.6f} XRP**",
-                                inline=False
-                            )
-                            
-                            # Add some extra info about the data
-                            embed.add_field(
-                                name="Trade Details",
-                                value=f"Best offer: {xrp_amount:.2f} XRP for {xgc_amount:.2f} XGC",
-                                inline=True
-                            )
-                            
-                            embed.add_field(
-                                name="Data Source",
-                                value="XRP Ledger DEX",
-                                inline=True
-                            )
-                            
-                            embed.set_footer(text=f"Requested by {ctx.author.display_name}")
-                            
-                            await message.edit(embed=embed)
-                        else:
-                            await message.edit(embed=discord.Embed(
-                                title="XGC Price Not Available",
-                                description="No offers found for XGC/XRP on the XRP Ledger DEX.",
-                                color=discord.Color.red(),
-                                timestamp=datetime.utcnow()
-                            ))
+                        embed.add_field(
+                            name="Data Source",
+                            value="XRP Ledger DEX",
+                            inline=True
+                        )
+                        
+                        embed.set_footer(text=f"Requested by {ctx.author.display_name}")
+                        
+                        await message.edit(embed=embed)
                     else:
                         await message.edit(embed=discord.Embed(
-                            title="Error",
-                            description=f"Failed to fetch data from XRP Ledger: HTTP {response.status}",
+                            title="XGC Price Not Available",
+                            description="No offers found for XGC/XRP on the XRP Ledger DEX.",
                             color=discord.Color.red(),
                             timestamp=datetime.utcnow()
                         ))
-                        
+                else:
+                    await message.edit(embed=discord.Embed(
+                        title="Error",
+                        description=f"Failed to fetch data from XRP Ledger: HTTP {response.status}",
+                        color=discord.Color.red(),
+                        timestamp=datetime.utcnow()
+                    ))
+        
         except Exception as e:
             await message.edit(embed=discord.Embed(
                 title="Error",
@@ -129,87 +130,87 @@ class Crypto(commands.Cog):
         
         try:
             # Query the XRP Ledger using JSON-RPC API
-            async with aiohttp.ClientSession() as session:
-                # Use public XRP Ledger node
-                url = "https://s1.ripple.com:51234/"
-                
-                # Bitstamp's USD issuer address
-                USD_ISSUER = "rvYAfWj5gh67oV6fW32ZzP3Aw4Eubs59B"
-                
-                # Query the XRP/USD order book
-                payload = {
-                    "method": "book_offers",
-                    "params": [{
-                        "taker_gets": {
-                            "currency": "USD",
-                            "issuer": USD_ISSUER
-                        },
-                        "taker_pays": {
-                            "currency": "XRP"
-                        },
-                        "limit": 10
-                    }]
-                }
-                
-                async with session.post(url, json=payload) as response:
-                    if response.status == 200:
-                        data = await response.json()
+            session = self.http_service.session
+            # Use public XRP Ledger node
+            url = "https://s1.ripple.com:51234/"
+            
+            # Bitstamp's USD issuer address
+            USD_ISSUER = "rvYAfWj5gh67oV6fW32ZzP3Aw4Eubs59B"
+            
+            # Query the XRP/USD order book
+            payload = {
+                "method": "book_offers",
+                "params": [{
+                    "taker_gets": {
+                        "currency": "USD",
+                        "issuer": USD_ISSUER
+                    },
+                    "taker_pays": {
+                        "currency": "XRP"
+                    },
+                    "limit": 10
+                }]
+            }
+            
+            async with session.post(url, json=payload) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    
+                    # Check if we have offers
+                    if "result" in data and "offers" in data["result"] and len(data["result"]["offers"]) > 0:
+                        # Get the best offer
+                        best_offer = data["result"]["offers"][0]
+                        
+                        # Extract values and calculate price
+                        usd_amount = float(best_offer["TakerGets"]["value"])
+                        xrp_amount = float(best_offer["TakerPays"]) / 1_000_000  # Convert drops to XRP
+                        xrp_price_in_usd = usd_amount / xrp_amount
+                        
+                        # Create success embed
+                        embed = discord.Embed(
+                            title="XRP Price",
+                            description=f"Current price from the XRP Ledger DEX",
+                            color=discord.Color.green(),
+                            timestamp=datetime.utcnow()
+                        )
                         
-                        # Check if we have offers
-                        if "result" in data and "offers" in data["result"] and len(data["result"]["offers"]) > 0:
-                            # Get the best offer
-                            best_offer = data["result"]["offers"][0]
-                            
-                            # Extract values and calculate price
-                            usd_amount = float(best_offer["TakerGets"]["value"])
-                            xrp_amount = float(best_offer["TakerPays"]) / 1_000_000  # Convert drops to XRP
-                            xrp_price_in_usd = usd_amount / xrp_amount
-                            
-                            # Create success embed
-                            embed = discord.Embed(
-                                title="XRP Price",
-                                description=f"Current price from the XRP Ledger DEX",
-                                color=discord.Color.green(),
-                                timestamp=datetime.utcnow()
-                            )
-                            
-                            embed.add_field(
-                                name="XRP/USD",
-                                value=f"**${xrp_price_in_usd:.4f} USD**",
-                                inline=False
-                            )
-                            
-                            # Add some extra info about the data
-                            embed.add_field(
-                                name="Trade Details",
-                                value=f"Best offer: ${usd_amount:.2f} USD for {xrp_amount:.2f} XRP",
-                                inline=True
-                            )
-                            
-                            embed.add_field(
-                                name="Data Source",
-                                value="XRP Ledger DEX (Bitstamp)",
-                                inline=True
-                            )
-                            
-                            embed.set_footer(text=f"Requested by {ctx.author.display_name}")
-                            
-                            await message.edit(embed=embed)
-                        else:
-                            await message.edit(embed=discord.Embed(
-                                title="XRP Price Not Available",
-                                description="No offers found for XRP/USD on the XRP Ledger DEX.",
-                                color=discord.Color.red(),
-                                timestamp=datetime.utcnow()
-                            ))
+                        embed.add_field(
+                            name="XRP/USD",
+                            value=f"**${xrp_price_in_usd:.4f} USD**",
+                            inline=False
+                        )
+                        
+                        # Add some extra info about the data
+                        embed.add_field(
+                            name="Trade Details",
+                            value=f"Best offer: ${usd_amount:.2f} USD for {xrp_amount:.2f} XRP",
+                            inline=True
+                        )
+                        
+                        embed.add_field(
+                            name="Data Source",
+                            value="XRP Ledger DEX (Bitstamp)",
+                            inline=True
+                        )
+                        
+                        embed.set_footer(text=f"Requested by {ctx.author.display_name}")
+                        
+                        await message.edit(embed=embed)
                     else:
                         await message.edit(embed=discord.Embed(
-                            title="Error",
-                            description=f"Failed to fetch data from XRP Ledger: HTTP {response.status}",
+                            title="XRP Price Not Available",
+                            description="No offers found for XRP/USD on the XRP Ledger DEX.",
                             color=discord.Color.red(),
                             timestamp=datetime.utcnow()
                         ))
-                        
+                else:
+                    await message.edit(embed=discord.Embed(
+                        title="Error",
+                        description=f"Failed to fetch data from XRP Ledger: HTTP {response.status}",
+                        color=discord.Color.red(),
+                        timestamp=datetime.utcnow()
+                    ))
+        
         except Exception as e:
             await message.edit(embed=discord.Embed(
                 title="Error",
@@ -232,144 +233,144 @@ class Crypto(commands.Cog):
         
         try:
             # Query the XRP Ledger using JSON-RPC API
-            async with aiohttp.ClientSession() as session:
-                # Use public XRP Ledger node
-                url = "https://s1.ripple.com:51234/"
-                
-                # 1. Get XGC/XRP price
-                xgc_xrp_payload = {
-                    "method": "book_offers",
-                    "params": [{
-                        "taker_gets": {
-                            "currency": "XRP"
-                        },
-                        "taker_pays": {
-                            "currency": self.XGC_CURRENCY,
-                            "issuer": self.XGC_ISSUER
-                        },
-                        "limit": 10
-                    }]
-                }
-                
-                # 2. Get XRP/USD price
-                # Bitstamp's USD issuer address
-                USD_ISSUER = "rvYAfWj5gh67oV6fW32ZzP3Aw4Eubs59B"
-                
-                xrp_usd_payload = {
-                    "method": "book_offers",
-                    "params": [{
-                        "taker_gets": {
-                            "currency": "USD",
-                            "issuer": USD_ISSUER
-                        },
-                        "taker_pays": {
-                            "currency": "XRP"
-                        },
-                        "limit": 10
-                    }]
-                }
-                
-                # First request - XGC/XRP
-                async with session.post(url, json=xgc_xrp_payload) as xgc_xrp_response:
-                    if xgc_xrp_response.status != 200:
-                        await message.edit(embed=discord.Embed(
-                            title="Error",
-                            description=f"Failed to fetch XGC/XRP data: HTTP {xgc_xrp_response.status}",
-                            color=discord.Color.red(),
-                            timestamp=datetime.utcnow()
-                        ))
-                        return
-                    
-                    xgc_xrp_data = await xgc_xrp_response.json()
-                    
-                    # Check if we have offers
-                    if "result" not in xgc_xrp_data or "offers" not in xgc_xrp_data["result"] or len(xgc_xrp_data["result"]["offers"]) == 0:
-                        await message.edit(embed=discord.Embed(
-                            title="XGC Price Not Available",
-                            description="No offers found for XGC/XRP on the XRP Ledger DEX.",
-                            color=discord.Color.red(),
-                            timestamp=datetime.utcnow()
-                        ))
-                        return
-                    
-                    # Get the best offer
-                    best_xgc_xrp_offer = xgc_xrp_data["result"]["offers"][0]
-                    
-                    # Extract values and calculate price
-                    xrp_amount = float(best_xgc_xrp_offer["TakerGets"]) / 1_000_000  # Convert drops to XRP
-                    xgc_amount = float(best_xgc_xrp_offer["TakerPays"]["value"])
-                    xgc_price_in_xrp = xrp_amount / xgc_amount
-                
-                # Second request - XRP/USD
-                async with session.post(url, json=xrp_usd_payload) as xrp_usd_response:
-                    if xrp_usd_response.status != 200:
-                        await message.edit(embed=discord.Embed(
-                            title="Error",
-                            description=f"Failed to fetch XRP/USD data: HTTP {xrp_usd_response.status}",
-                            color=discord.Color.red(),
-                            timestamp=datetime.utcnow()
-                        ))
-                        return
-                    
-                    xrp_usd_data = await xrp_usd_response.json()
-                    
-                    # Check if we have offers
-                    if "result" not in xrp_usd_data or "offers" not in xrp_usd_data["result"] or len(xrp_usd_data["result"]["offers"]) == 0:
-                        await message.edit(embed=discord.Embed(
-                            title="XRP Price Not Available",
-                            description="No offers found for XRP/USD on the XRP Ledger DEX.",
-                            color=discord.Color.red(),
-                            timestamp=datetime.utcnow()
-                        ))
-                        return
-                    
-                    # Get the best offer
-                    best_xrp_usd_offer = xrp_usd_data["result"]["offers"][0]
-                    
-                    # Extract values and calculate price
-                    usd_amount = float(best_xrp_usd_offer["TakerGets"]["value"])
-                    xrp_for_usd = float(best_xrp_usd_offer["TakerPays"]) / 1_000_000  # Convert drops to XRP
-                    xrp_price_in_usd = usd_amount / xrp_for_usd
+            session = self.http_service.session
+            # Use public XRP Ledger node
+            url = "https://s1.ripple.com:51234/"
+            
+            # 1. Get XGC/XRP price
+            xgc_xrp_payload = {
+                "method": "book_offers",
+                "params": [{
+                    "taker_gets": {
+                        "currency": "XRP"
+                    },
+                    "taker_pays": {
+                        "currency": self.XGC_CURRENCY,
+                        "issuer": self.XGC_ISSUER
+                    },
+                    "limit": 10
+                }]
+            }
+            
+            # 2. Get XRP/USD price
+            # Bitstamp's USD issuer address
+            USD_ISSUER = "rvYAfWj5gh67oV6fW32ZzP3Aw4Eubs59B"
+            
+            xrp_usd_payload = {
+                "method": "book_offers",
+                "params": [{
+                    "taker_gets": {
+                        "currency": "USD",
+                        "issuer": USD_ISSUER
+                    },
+                    "taker_pays": {
+                        "currency": "XRP"
+                    },
+                    "limit": 10
+                }]
+            }
+            
+            # First request - XGC/XRP
+            async with session.post(url, json=xgc_xrp_payload) as xgc_xrp_response:
+                if xgc_xrp_response.status != 200:
+                    await message.edit(embed=discord.Embed(
+                        title="Error",
+                        description=f"Failed to fetch XGC/XRP data: HTTP {xgc_xrp_response.status}",
+                        color=discord.Color.red(),
+                        timestamp=datetime.utcnow()
+                    ))
+                    return
                 
-                # Calculate XGC/USD price
-                xgc_price_in_usd = xgc_price_in_xrp * xrp_price_in_usd
+                xgc_xrp_data = await xgc_xrp_response.json()
                 
-                # Create success embed
-                embed = discord.Embed(
-                    title="XGC Price in USD",
-                    description=f"Current price calculated from the XRP Ledger DEX",
-                    color=discord.Color.green(),
-                    timestamp=datetime.utcnow()
-                )
+                # Check if we have offers
+                if "result" not in xgc_xrp_data or "offers" not in xgc_xrp_data["result"] or len(xgc_xrp_data["result"]["offers"]) == 0:
+                    await message.edit(embed=discord.Embed(
+                        title="XGC Price Not Available",
+                        description="No offers found for XGC/XRP on the XRP Ledger DEX.",
+                        color=discord.Color.red(),
+                        timestamp=datetime.utcnow()
+                    ))
+                    return
                 
-                embed.add_field(
-                    name="XGC/USD",
-                    value=f"**${xgc_price_in_usd:.6f} USD**",
-                    inline=False
-                )
+                # Get the best offer
+                best_xgc_xrp_offer = xgc_xrp_data["result"]["offers"][0]
                 
-                embed.add_field(
-                    name="XGC/XRP",
-                    value=f"**{xgc_price_in_xrp:.6f} XRP**",
-                    inline=True
-                )
+                # Extract values and calculate price
+                xrp_amount = float(best_xgc_xrp_offer["TakerGets"]) / 1_000_000  # Convert drops to XRP
+                xgc_amount = float(best_xgc_xrp_offer["TakerPays"]["value"])
+                xgc_price_in_xrp = xrp_amount / xgc_amount
+            
+            # Second request - XRP/USD
+            async with session.post(url, json=xrp_usd_payload) as xrp_usd_response:
+                if xrp_usd_response.status != 200:
+                    await message.edit(embed=discord.Embed(
+                        title="Error",
+                        description=f"Failed to fetch XRP/USD data: HTTP {xrp_usd_response.status}",
+                        color=discord.Color.red(),
+                        timestamp=datetime.utcnow()
+                    ))
+                    return
                 
-                embed.add_field(
-                    name="XRP/USD",
-                    value=f"**${xrp_price_in_usd:.4f} USD**",
-                    inline=True
-                )
+                xrp_usd_data = await xrp_usd_response.json()
                 
-                embed.add_field(
-                    name="Data Source",
-                    value="XRP Ledger DEX (Bitstamp for USD)",
-                    inline=False
-                )
+                # Check if we have offers
+                if "result" not in xrp_usd_data or "offers" not in xrp_usd_data["result"] or len(xrp_usd_data["result"]["offers"]) == 0:
+                    await message.edit(embed=discord.Embed(
+                        title="XRP Price Not Available",
+                        description="No offers found for XRP/USD on the XRP Ledger DEX.",
+                        color=discord.Color.red(),
+                        timestamp=datetime.utcnow()
+                    ))
+                    return
                 
-                embed.set_footer(text=f"Requested by {ctx.author.display_name}")
+                # Get the best offer
+                best_xrp_usd_offer = xrp_usd_data["result"]["offers"][0]
                 
-                await message.edit(embed=embed)
-                        
+                # Extract values and calculate price
+                usd_amount = float(best_xrp_usd_offer["TakerGets"]["value"])
+                xrp_for_usd = float(best_xrp_usd_offer["TakerPays"]) / 1_000_000  # Convert drops to XRP
+                xrp_price_in_usd = usd_amount / xrp_for_usd
+            
+            # Calculate XGC/USD price
+            xgc_price_in_usd = xgc_price_in_xrp * xrp_price_in_usd
+            
+            # Create success embed
+            embed = discord.Embed(
+                title="XGC Price in USD",
+                description=f"Current price calculated from the XRP Ledger DEX",
+                color=discord.Color.green(),
+                timestamp=datetime.utcnow()
+            )
+            
+            embed.add_field(
+                name="XGC/USD",
+                value=f"**${xgc_price_in_usd:.6f} USD**",
+                inline=False
+            )
+            
+            embed.add_field(
+                name="XGC/XRP",
+                value=f"**{xgc_price_in_xrp:.6f} XRP**",
+                inline=True
+            )
+            
+            embed.add_field(
+                name="XRP/USD",
+                value=f"**${xrp_price_in_usd:.4f} USD**",
+                inline=True
+            )
+            
+            embed.add_field(
+                name="Data Source",
+                value="XRP Ledger DEX (Bitstamp for USD)",
+                inline=False
+            )
+            
+            embed.set_footer(text=f"Requested by {ctx.author.display_name}")
+            
+            await message.edit(embed=embed)
+                    
         except Exception as e:
             await message.edit(embed=discord.Embed(
                 title="Error",
@@ -415,5 +416,9 @@ class Crypto(commands.Cog):
         embed.set_footer(text=f"Requested by {ctx.author.display_name}")
         await ctx.send(embed=embed)
 
+    async def cog_unload(self):
+        """Release the shared HTTP session when the cog is unloaded"""
+        await self.http_service.release()
+
 async def setup(bot):
     await bot.add_cog(Crypto(bot)) 
\ No newline at end of file
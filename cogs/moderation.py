@@ -45,9 +45,13 @@ class Moderation(commands.Cog):
             except (ValueError, TypeError):
                 pass
         else:
-            # Try to find by name
-            user = discord.utils.find(lambda m: m.name.lower() == user_input.lower() or 
-                                  (m.nick and m.nick.lower() == user_input.lower()), guild.members)
+            # Try to find by name, through the shared name index when it is loaded
+            name_index = self.bot.get_cog("NameIndex")
+            if name_index:
+                user = name_index.find_member(guild, user_input)
+            else:
+                user = discord.utils.find(lambda m: m.name.lower() == user_input.lower() or 
+                                      (m.nick and m.nick.lower() == user_input.lower()), guild.members)
         
         return user
 
@@ -0,0 +1,236 @@
+import discord
+from discord.ext import commands
+import bisect
+from typing import Dict, List, Optional
+
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:
+    process = None  # Without rapidfuzz, suggestions only use prefix matches
+
+class NameTable:
+    """Case-folded name lookups for one kind of object (members, roles or channels) in one guild.
+    
+    Exact lookups are a dict hit. The folded names are also kept in a sorted
+    list, so prefix searches are a binary search instead of a scan.
+    """
+    
+    def __init__(self):
+        self.ids = {}  # folded name -> {object_id}
+        self.names = {}  # object_id -> folded names
+        self.sorted_names = []
+    
+    def add(self, object_id: int, *names: Optional[str], keep_sorted: bool = True):
+        """Index an object under its names, replacing the names it had before.
+        
+        Bulk loads pass keep_sorted=False and call sort() once at the end.
+        """
+        self.remove(object_id)
+        folded = {name.casefold() for name in names if name}
+        self.names[object_id] = folded
+        for name in folded:
+            if name not in self.ids:
+                self.ids[name] = set()
+                if keep_sorted:
+                    bisect.insort(self.sorted_names, name)
+                else:
+                    self.sorted_names.append(name)
+            self.ids[name].add(object_id)
+    
+    def sort(self):
+        """Sort the names after a bulk load."""
+        self.sorted_names.sort()
+    
+    def remove(self, object_id: int):
+        """Forget an object."""
+        for name in self.names.pop(object_id, ()):
+            self.ids[name].discard(object_id)
+            if not self.ids[name]:
+                del self.ids[name]
+                del self.sorted_names[bisect.bisect_left(self.sorted_names, name)]
+    
+    def exact(self, name: str) -> List[int]:
+        """Return the IDs of objects with this name, ignoring case."""
+        return sorted(self.ids.get(name.casefold(), ()))
+    
+    def prefix(self, prefix: str, limit: int = 25) -> List[int]:
+        """Return the IDs of objects with a name starting with prefix, ignoring case, in name order."""
+        prefix = prefix.casefold()
+        found = []
+        position = bisect.bisect_left(self.sorted_names, prefix)
+        while position < len(self.sorted_names) and len(found) < limit:
+            name = self.sorted_names[position]
+            if not name.startswith(prefix):
+                break
+            position += 1
+            found.extend(object_id for object_id in sorted(self.ids[name]) if object_id not in found)
+        return found[:limit]
+    
+    def similar(self, name: str, limit: int = 3, score_cutoff: float = 70) -> List[int]:
+        """Return the IDs of objects with names that start with or closely resemble name, best first.
+        
+        The sorted, case-folded names double as the candidate list for
+        rapidfuzz, so nothing has to be rebuilt per lookup.
+        """
+        name = name.casefold()
+        found = self.prefix(name, limit)
+        if process is not None and len(found) < limit:
+            for match, _, _ in process.extract(name, self.sorted_names, scorer=fuzz.ratio, limit=limit, score_cutoff=score_cutoff):
+                found.extend(object_id for object_id in sorted(self.ids[match]) if object_id not in found)
+        return found[:limit]
+
+class NameIndex(commands.Cog):
+    """Shared name -> ID index for members, roles and channels.
+    
+    Other cogs use it through bot.get_cog("NameIndex") to resolve names
+    without scanning guild.members. Each guild is indexed on first use and
+    then kept current from member, role and channel events.
+    """
+    
+    def __init__(self, bot):
+        self.bot = bot
+        self.guilds: Dict[int, Dict[str, NameTable]] = {}
+    
+    def _tables(self, guild) -> Dict[str, NameTable]:
+        """Return the tables of a guild, indexing it the first time."""
+        if guild.id not in self.guilds:
+            tables = {"members": NameTable(), "roles": NameTable(), "channels": NameTable()}
+            for member in guild.members:
+                tables["members"].add(member.id, *self._member_names(member), keep_sorted=False)
+            for role in guild.roles:
+                tables["roles"].add(role.id, role.name, keep_sorted=False)
+            for channel in guild.channels:
+                tables["channels"].add(channel.id, channel.name, keep_sorted=False)
+            for table in tables.values():
+                table.sort()
+            self.guilds[guild.id] = tables
+        return self.guilds[guild.id]
+    
+    def _member_names(self, member) -> List[Optional[str]]:
+        """Return every name a member can be looked up by."""
+        return [member.name, member.nick, getattr(member, "global_name", None)]
+    
+    def _update(self, guild, table: str, object_id: int, *names: Optional[str]):
+        """Update an object in a guild that has already been indexed; others are indexed when first used."""
+        if guild.id in self.guilds:
+            self.guilds[guild.id][table].add(object_id, *names)
+    
+    def _remove(self, guild, table: str, object_id: int):
+        """Remove an object from a guild that has already been indexed."""
+        if guild.id in self.guilds:
+            self.guilds[guild.id][table].remove(object_id)
+    
+    def _pick(self, candidates: List, name: str, key):
+        """Prefer the candidate whose name matches exactly, including case."""
+        for candidate in candidates:
+            if name in key(candidate):
+                return candidate
+        return candidates[0] if candidates else None
+    
+    def find_member(self, guild, name: str) -> Optional[discord.Member]:
+        """Find a member by username, nickname or display name, ignoring case."""
+        members = [member for member in map(guild.get_member, self._tables(guild)["members"].exact(name)) if member]
+        return self._pick(members, name, self._member_names)
+    
+    def find_role(self, guild, name: str) -> Optional[discord.Role]:
+        """Find a role by name, ignoring case."""
+        roles = [role for role in map(guild.get_role, self._tables(guild)["roles"].exact(name)) if role]
+        return self._pick(roles, name, lambda role: [role.name])
+    
+    def find_channel(self, guild, name: str):
+        """Find a channel by name, ignoring case."""
+        channels = [channel for channel in map(guild.get_channel, self._tables(guild)["channels"].exact(name)) if channel]
+        return self._pick(channels, name, lambda channel: [channel.name])
+    
+    def search(self, guild, table: str, prefix: str, limit: int = 25) -> List:
+        """Return members, roles or channels whose name starts with prefix, ignoring case."""
+        getter = {"members": guild.get_member, "roles": guild.get_role, "channels": guild.get_channel}[table]
+        return [found for found in map(getter, self._tables(guild)[table].prefix(prefix, limit)) if found]
+    
+    def suggest(self, guild, table: str, name: str, limit: int = 3) -> List:
+        """Return members, roles or channels whose names are close to a name that wasn't found."""
+        getter = {"members": guild.get_member, "roles": guild.get_role, "channels": guild.get_channel}[table]
+        return [found for found in map(getter, self._tables(guild)[table].similar(name, limit)) if found]
+    
+    def did_you_mean(self, guild, table: str, name: str) -> str:
+        """Return a " Did you mean ...?" hint for a name that wasn't found, or an empty string."""
+        suggestions = self.suggest(guild, table, name)
+        if not suggestions:
+            return ""
+        return f" Did you mean {', '.join(f'`{found.name}`' for found in suggestions)}?"
+    
+    @commands.Cog.listener()
+    async def on_member_join(self, member):
+        """Index a new member."""
+        self._update(member.guild, "members", member.id, *self._member_names(member))
+    
+    @commands.Cog.listener()
+    async def on_member_remove(self, member):
+        """Forget a member who left."""
+        self._remove(member.guild, "members", member.id)
+    
+    @commands.Cog.listener()
+    async def on_member_update(self, before, after):
+        """Re-index a member whose nickname changed."""
+        if self._member_names(before) != self._member_names(after):
+            self._update(after.guild, "members", after.id, *self._member_names(after))
+    
+    @commands.Cog.listener()
+    async def on_user_update(self, before, after):
+        """A username change applies to the member in every shared guild."""
+        if (before.name, getattr(before, "global_name", None)) == (after.name, getattr(after, "global_name", None)):
+            return
+        for guild in after.mutual_guilds:
+            member = guild.get_member(after.id)
+            if member:
+                self._update(guild, "members", member.id, after.name, member.nick, getattr(after, "global_name", None))
+    
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role):
+        """Index a new role."""
+        self._update(role.guild, "roles", role.id, role.name)
+    
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role):
+        """Forget a deleted role."""
+        self._remove(role.guild, "roles", role.id)
+    
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before, after):
+        """Re-index a renamed role."""
+        if before.name != after.name:
+            self._update(after.guild, "roles", after.id, after.name)
+    
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel):
+        """Index a new channel."""
+        self._update(channel.guild, "channels", channel.id, channel.name)
+    
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        """Forget a deleted channel."""
+        self._remove(channel.guild, "channels", channel.id)
+    
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before, after):
+        """Re-index a renamed channel."""
+        if before.name != after.name:
+            self._update(after.guild, "channels", after.id, after.name)
+    
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        """Drop the tables of a guild the bot left."""
+        self.guilds.pop(guild.id, None)
+
+def did_you_mean(bot, guild, table: str, name: str) -> str:
+    """Suggest close role or channel names when a lookup by name fails.
+    
+    Mentions and IDs get no suggestion, and neither does anything when the NameIndex cog isn't loaded.
+    """
+    name_index = bot.get_cog("NameIndex")
+    if not name_index or name.isdigit() or name.startswith("<"):
+        return ""
+    return name_index.did_you_mean(guild, table, name.lstrip("#"))
+
+async def setup(bot):
+    await bot.add_cog(NameIndex(bot))
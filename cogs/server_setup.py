@@ -1,6 +1,7 @@
 import discord
 from discord.ext import commands
 import config
+from cogs.name_index import did_you_mean
 import asyncio
 
 class ServerSetup(commands.Cog):
@@ -33,8 +34,12 @@ class ServerSetup(commands.Cog):
             except (ValueError, TypeError):
                 pass
         else:
-            # Try to find by name
-            role = discord.utils.get(guild.roles, name=role_input)
+            # Try to find by name, through the shared name index when it is loaded
+            name_index = self.bot.get_cog("NameIndex")
+            if name_index:
+                role = name_index.find_role(guild, role_input)
+            else:
+                role = discord.utils.get(guild.roles, name=role_input)
         
         return role
 
@@ -331,7 +336,7 @@ class ServerSetup(commands.Cog):
         role = self._resolve_role(guild, role_input)
         
         if not role:
-            return await ctx.send(f"❌ Role not found. Please specify a valid mention, name, or ID.")
+            return await ctx.send(f"❌ Role not found. Please specify a valid mention, name, or ID.{did_you_mean(self.bot, guild, 'roles', role_input)}")
         
         try:
             await role.edit(mentionable=True)
@@ -353,7 +358,7 @@ class ServerSetup(commands.Cog):
         role = self._resolve_role(guild, role_input)
         
         if not role:
-            return await ctx.send(f"❌ Role not found. Please specify a valid mention, name, or ID.")
+            return await ctx.send(f"❌ Role not found. Please specify a valid mention, name, or ID.{did_you_mean(self.bot, guild, 'roles', role_input)}")
         
         try:
             await role.edit(mentionable=False)
@@ -1,24 +1,123 @@
 import discord
 from discord.ext import commands, tasks
-import aiohttp
 import json
 import os
 import datetime
 import asyncio
-from typing import Dict, List, Optional
+import collections
+import concurrent.futures
+import hashlib
+import hmac
+import secrets
+import time
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import parse_qs, urlparse
+from xml.etree import ElementTree
 import config
+import http_client
 import traceback
 
+ATOM = "{http://www.w3.org/2005/Atom}"
+YT = "{http://www.youtube.com/xml/schemas/2015}"
+MEDIA = "{http://search.yahoo.com/mrss/}"
+
+class AtomFeedParser:
+    """Streaming parser for YouTube channel Atom feeds.
+    
+    Feed it the response body chunk by chunk. Each <entry> is converted to
+    the same shape as a Data API search result and then cleared from the tree.
+    """
+    
+    def __init__(self):
+        self.parser = ElementTree.XMLPullParser(events=("end",))
+        self.entries = []
+    
+    def feed(self, data: bytes) -> None:
+        """Parse the next chunk of the feed"""
+        self.parser.feed(data)
+        self.read_events()
+    
+    def close(self) -> List[Dict]:
+        """Finish parsing and return the entries in feed order"""
+        self.parser.close()
+        self.read_events()
+        return self.entries
+    
+    def read_events(self) -> None:
+        """Convert the entries completed so far"""
+        for _, element in self.parser.read_events():
+            if element.tag == f"{ATOM}entry":
+                if element.findtext(f"{YT}videoId"):
+                    self.entries.append(self.parse_entry(element))
+                element.clear()
+    
+    def parse_entry(self, entry) -> Dict:
+        """Convert an <entry> element to a search-result-shaped video"""
+        group = entry.find(f"{MEDIA}group")
+        thumbnail = group.find(f"{MEDIA}thumbnail") if group is not None else None
+        
+        return {
+            "id": {"videoId": entry.findtext(f"{YT}videoId")},
+            "snippet": {
+                "title": entry.findtext(f"{ATOM}title", ""),
+                "description": group.findtext(f"{MEDIA}description", "") if group is not None else "",
+                "publishedAt": entry.findtext(f"{ATOM}published", ""),
+                "channelId": entry.findtext(f"{YT}channelId", ""),
+                "channelTitle": entry.findtext(f"{ATOM}author/{ATOM}name", ""),
+                "thumbnails": {"high": {"url": thumbnail.get("url")}} if thumbnail is not None else {}
+            }
+        }
+
+class TokenBucket:
+    """Async token bucket: allows bursts of up to capacity requests, refilled at rate per second."""
+    
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+    
+    async def acquire(self) -> None:
+        """Wait for a token; waiters are served in order"""
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+def parse_atom_feed(chunks: Iterable[bytes]) -> List[Dict]:
+    """Parse a whole feed from an iterable of byte chunks, such as a feed file opened in binary mode"""
+    parser = AtomFeedParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+    return parser.close()
+
 class YouTubeNotifications(commands.Cog):
     """Track YouTube channels and post notifications when new videos are uploaded"""
 
     def __init__(self, bot):
         self.bot = bot
+        self.http_service = http_client.acquire(bot)
         self.config_file = "youtube_config.json"
         self.config = self.load_config()
-        # Only start the background task if an API key is set
-        if self.config.get("api_key"):
+        self.feed_state = {}  # youtube_channel_id -> {etag, last_modified, videos}
+        self.announced = collections.deque(maxlen=500)  # Recently announced video IDs, shared by polling and push
+        self.buckets = {}  # API key (or "feed") -> TokenBucket
+        self.subscription_requests = {}  # youtube_channel_id -> time of the last subscribe request awaiting verification
+        # Feed mode needs no API key; the uploads playlist does
+        if self.can_poll():
             self.check_uploads.start()
+        if self.config.get("websub_callback_url"):
+            self.renew_subscriptions.start()
+    
+    def can_poll(self) -> bool:
+        """Return whether uploads can be polled: feed mode always can, api mode needs an API key"""
+        return self.config.get("detection_mode", "feed") == "feed" or bool(self.config.get("api_key"))
     
     def load_config(self) -> Dict:
         """Load YouTube configuration from file or create default"""
@@ -39,7 +138,13 @@ class YouTubeNotifications(commands.Cog):
         return {
             "api_key": "",
             "check_interval": 10,  # minutes
-            "channels": {},  # youtube_channel_id -> {name, last_video_id, discord_channel_id}
+            "detection_mode": "feed",  # feed (no quota) or api (uploads playlist)
+            "max_concurrent_checks": 5,  # Channels polled at the same time during a sweep
+            "requests_per_second": 5,  # Per API key, and separately for feed requests
+            "websub_hub": "https://pubsubhubbub.appspot.com/subscribe",
+            "websub_callback_url": "",  # Public URL of /youtube/websub; empty disables push notifications
+            "websub_secret": "",
+            "channels": {},  # youtube_channel_id -> {name, last_video_id, discord_channel_id, uploads_playlist_id}
         }
     
     def save_config(self, config: Optional[Dict] = None) -> None:
@@ -68,6 +173,8 @@ class YouTubeNotifications(commands.Cog):
             value=(
                 f"`{config.PREFIX}youtube setapikey <api_key>` - Set your YouTube API key\n"
                 f"`{config.PREFIX}youtube setinterval <minutes>` - Set how often to check for new videos\n"
+                f"`{config.PREFIX}youtube setmode <feed|api>` - Detect uploads from the RSS feed or the API\n"
+                f"`{config.PREFIX}youtube push <callback_url|off>` - Receive instant upload notifications\n"
                 f"`{config.PREFIX}youtube debug` - Test if your API key is working\n"
             ),
             inline=False
@@ -113,7 +220,7 @@ class YouTubeNotifications(commands.Cog):
             
         embed.add_field(
             name="Check Interval",
-            value=f"{self.config.get('check_interval', 10)} minutes\nTask: {task_status}",
+            value=f"{self.config.get('check_interval', 10)} minutes\nMode: {self.config.get('detection_mode', 'feed')}\nTask: {task_status}",
             inline=True
         )
         
@@ -186,32 +293,32 @@ class YouTubeNotifications(commands.Cog):
             
             # Try to get analytics about usage
             try:
-                async with aiohttp.ClientSession() as session:
-                    url = f"https://www.googleapis.com/youtube/v3/channels?part=snippet&mine=true&key={api_key}"
+                session = self.http_service.session
+                url = f"https://www.googleapis.com/youtube/v3/channels?part=snippet&mine=true&key={api_key}"
+                
+                async with session.get(url) as response:
+                    status = response.status
+                    response_text = f"{status} ({response.reason})"
+                    
+                    # If status is not 200, mark as an issue
+                    if status != 200:
+                        embed.title = "YouTube API Key Issue"
+                        embed.description = "⚠️ Your API key works for basic requests but has some limitations"
+                        embed.color = discord.Color.gold()
                     
-                    async with session.get(url) as response:
-                        status = response.status
-                        response_text = f"{status} ({response.reason})"
-                        
-                        # If status is not 200, mark as an issue
-                        if status != 200:
-                            embed.title = "YouTube API Key Issue"
-                            embed.description = "⚠️ Your API key works for basic requests but has some limitations"
-                            embed.color = discord.Color.gold()
-                        
+                    embed.add_field(
+                        name="API Response Code",
+                        value=response_text,
+                        inline=False
+                    )
+                    
+                    # Add explanation for common status codes
+                    if status == 401:
                         embed.add_field(
-                            name="API Response Code",
-                            value=response_text,
+                            name="What this means",
+                            value="Your API key is not authorized for this specific request. This is normal if you didn't set up OAuth2 credentials.",
                             inline=False
                         )
-                        
-                        # Add explanation for common status codes
-                        if status == 401:
-                            embed.add_field(
-                                name="What this means",
-                                value="Your API key is not authorized for this specific request. This is normal if you didn't set up OAuth2 credentials.",
-                                inline=False
-                            )
             except Exception as e:
                 embed.add_field(
                     name="Connection Test",
@@ -265,20 +372,75 @@ class YouTubeNotifications(commands.Cog):
         
         self.check_uploads.change_interval(minutes=minutes)
         
-        if self.config.get("api_key"):
+        if self.can_poll():
             self.check_uploads.start()
             await ctx.send(f"✅ YouTube check interval set to {minutes} minutes and background task restarted.")
         else:
             await ctx.send(f"✅ YouTube check interval set to {minutes} minutes, but background task not started (no API key).")
     
+    @youtube.command(name="setmode")
+    @commands.has_permissions(administrator=True)
+    async def set_mode(self, ctx, mode: str):
+        """Set how new uploads are detected (feed or api)"""
+        mode = mode.lower()
+        if mode not in ("feed", "api"):
+            await ctx.send("❌ Mode must be `feed` (RSS feed, no API quota) or `api` (uploads playlist, 1 quota unit per channel).")
+            return
+        
+        self.config["detection_mode"] = mode
+        self.save_config()
+        
+        if self.can_poll():
+            if not self.check_uploads.is_running():
+                self.check_uploads.start()
+            await ctx.send(f"✅ YouTube uploads will be detected using the {'RSS feed' if mode == 'feed' else 'Data API'}.")
+        else:
+            await ctx.send(f"✅ YouTube uploads will be detected using the Data API once an API key is set with `{config.PREFIX}youtube setapikey <key>`.")
+    
+    @youtube.command(name="push")
+    @commands.has_permissions(administrator=True)
+    async def set_push(self, ctx, callback_url: str):
+        """Subscribe tracked channels to instant WebSub notifications sent to callback_url, or turn them off"""
+        if callback_url.lower() == "off":
+            if not self.config.get("websub_callback_url"):
+                await ctx.send("❌ Push notifications are not enabled.")
+                return
+            
+            # Clear the URL first so the hub's unsubscribe verification is accepted
+            old_callback_url = self.config["websub_callback_url"]
+            self.config["websub_callback_url"] = ""
+            self.save_config()
+            for channel_id in self.config["channels"]:
+                await self.subscribe(channel_id, "unsubscribe", old_callback_url)
+            if self.renew_subscriptions.is_running():
+                self.renew_subscriptions.cancel()
+            await ctx.send("✅ Push notifications turned off. New videos will be found by polling only.")
+            return
+        
+        if not callback_url.startswith(("http://", "https://")):
+            await ctx.send(f"❌ The callback URL must be the public address of this bot's web server, e.g. `https://example.com/youtube/websub`.")
+            return
+        
+        self.config["websub_callback_url"] = callback_url
+        if not self.config.get("websub_secret"):
+            self.config["websub_secret"] = secrets.token_hex(16)
+        self.save_config()
+        
+        failed = [channel_id for channel_id in self.config["channels"] if not await self.subscribe(channel_id)]
+        if not self.renew_subscriptions.is_running():
+            self.renew_subscriptions.start()
+        
+        message = f"✅ Subscribed {len(self.config['channels']) - len(failed)} channels to push notifications at `{callback_url}`."
+        if failed:
+            message += f"\n⚠️ The hub rejected: {', '.join(f'`{channel_id}`' for channel_id in failed)} (will retry hourly)"
+        await ctx.send(message)
+    
     @youtube.command(name="add")
     @commands.has_permissions(administrator=True)
     async def add_channel(self, ctx, youtube_channel_id: str, discord_channel: discord.TextChannel):
         """Add a YouTube channel to track"""
-        api_key = self.config.get("api_key", "")
-        
-        if not api_key:
-            await ctx.send("❌ YouTube API key not set. Please set one with `!youtube setapikey <key>`.")
+        if not self.can_poll():
+            await ctx.send("❌ YouTube API key not set. Please set one with `!youtube setapikey <key>` or switch to `!youtube setmode feed`.")
             return
         
         # Validate the YouTube channel ID before adding
@@ -307,10 +469,14 @@ class YouTubeNotifications(commands.Cog):
         self.config["channels"][youtube_channel_id] = {
             "name": channel_info["title"],
             "last_video_id": None,
-            "discord_channel_id": discord_channel.id
+            "discord_channel_id": discord_channel.id,
+            "uploads_playlist_id": channel_info["uploads_playlist_id"]
         }
         self.save_config()
         
+        if self.config.get("websub_callback_url"):
+            await self.subscribe(youtube_channel_id)
+        
         # Update with latest video information
         latest_video = await self.get_latest_video(youtube_channel_id)
         if latest_video:
@@ -357,6 +523,8 @@ class YouTubeNotifications(commands.Cog):
             channel_name = self.config["channels"][youtube_channel_id]["name"]
             del self.config["channels"][youtube_channel_id]
             self.save_config()
+            if self.config.get("websub_callback_url"):
+                await self.subscribe(youtube_channel_id, "unsubscribe")
             await ctx.send(f"✅ Removed YouTube channel: **{channel_name}** (`{youtube_channel_id}`)")
         else:
             await ctx.send(f"❌ YouTube channel ID not found: `{youtube_channel_id}`")
@@ -394,15 +562,15 @@ class YouTubeNotifications(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def test_notification(self, ctx, youtube_channel_id: str = None):
         """Test notifications for a channel or test the API directly"""
-        api_key = self.config.get("api_key", "")
-        
-        if not api_key:
-            await ctx.send("❌ YouTube API key not set. Please set one with `!youtube setapikey <key>`.")
+        # Feed mode reads the latest upload from the channel's Atom feed; only api mode needs a key
+        if not self.can_poll():
+            await ctx.send("❌ YouTube API key not set. Please set one with `!youtube setapikey <key>` or switch to `!youtube setmode feed`.")
             return
         
         # If no channel ID is specified, test the API directly with a popular channel
         if not youtube_channel_id:
-            status_msg = await ctx.send("🔄 Testing API with a popular YouTube channel (T-Series)...")
+            source = "RSS feed" if self.config.get("detection_mode", "feed") == "feed" else "API"
+            status_msg = await ctx.send(f"🔄 Testing the {source} with a popular YouTube channel (T-Series)...")
             test_channel_id = "UCq-Fj5jknLsUf-MWSy4_brA"  # T-Series channel ID
             
             is_valid, result = await self.validate_youtube_channel(test_channel_id)
@@ -412,7 +580,7 @@ class YouTubeNotifications(commands.Cog):
                 if latest_video:
                     embed = await self.create_video_embed(latest_video)
                     await status_msg.edit(
-                        content=f"✅ API test successful! Found channel: **{result['title']}**\n"
+                        content=f"✅ {source} test successful! Found channel: **{result['title']}**\n"
                                 f"Here's what a notification will look like:",
                         embed=embed
                     )
@@ -423,7 +591,7 @@ class YouTubeNotifications(commands.Cog):
                     )
             else:
                 error = result.get('error', 'Unknown error')
-                await status_msg.edit(content=f"❌ API test failed: {error}")
+                await status_msg.edit(content=f"❌ {source} test failed: {error}")
             return
         
         # If a channel ID is specified but not in our tracking list, try to validate it first
@@ -483,10 +651,9 @@ class YouTubeNotifications(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def force_notification(self, ctx, youtube_channel_id: str):
         """Force post the latest video from a tracked channel without updating tracking status"""
-        api_key = self.config.get("api_key", "")
-        
-        if not api_key:
-            await ctx.send("❌ YouTube API key not set. Please set one with `!youtube setapikey <key>`.")
+        # Feed mode reads the latest upload from the channel's Atom feed; only api mode needs a key
+        if not self.can_poll():
+            await ctx.send("❌ YouTube API key not set. Please set one with `!youtube setapikey <key>` or switch to `!youtube setmode feed`.")
             return
         
         # Check if the channel is being tracked
@@ -528,40 +695,40 @@ class YouTubeNotifications(commands.Cog):
             return False, "No API key provided"
         
         try:
-            async with aiohttp.ClientSession() as session:
-                # Use a simple request that consumes minimal quota
-                url = f"https://www.googleapis.com/youtube/v3/videos?part=id&chart=mostPopular&maxResults=1&key={api_key}"
-                
-                async with session.get(url) as response:
-                    if response.status != 200:
-                        data = await response.json()
-                        error_message = data.get("error", {}).get("message", f"HTTP {response.status}")
-                        error_reason = data.get("error", {}).get("errors", [{}])[0].get("reason", "unknown")
-                        
-                        if response.status == 400:
-                            # Likely an invalid API key format
-                            return False, f"API Error: {error_message}"
-                        elif response.status == 403:
-                            # API key not authorized for YouTube Data API
-                            if "API key not valid" in error_message:
-                                return False, f"Invalid API Key: {error_message}"
-                            else:
-                                return False, f"API Error: {error_message} (YouTube Data API might not be enabled)"
-                        elif response.status == 401:
-                            # Authentication issues
-                            if error_reason == "keyInvalid":
-                                return False, f"Invalid API Key: The API key {api_key[:5]}... is not valid"
-                            else:
-                                return False, f"Authentication Error: {error_message}"
-                        else:
-                            return False, f"API Error: HTTP {response.status} ({response.reason})"
-                    
+            session = self.http_service.session
+            # Use a simple request that consumes minimal quota
+            url = f"https://www.googleapis.com/youtube/v3/videos?part=id&chart=mostPopular&maxResults=1&key={api_key}"
+            
+            async with session.get(url) as response:
+                if response.status != 200:
                     data = await response.json()
+                    error_message = data.get("error", {}).get("message", f"HTTP {response.status}")
+                    error_reason = data.get("error", {}).get("errors", [{}])[0].get("reason", "unknown")
                     
-                    if "items" in data:
-                        return True, "API key is valid"
+                    if response.status == 400:
+                        # Likely an invalid API key format
+                        return False, f"API Error: {error_message}"
+                    elif response.status == 403:
+                        # API key not authorized for YouTube Data API
+                        if "API key not valid" in error_message:
+                            return False, f"Invalid API Key: {error_message}"
+                        else:
+                            return False, f"API Error: {error_message} (YouTube Data API might not be enabled)"
+                    elif response.status == 401:
+                        # Authentication issues
+                        if error_reason == "keyInvalid":
+                            return False, f"Invalid API Key: The API key {api_key[:5]}... is not valid"
+                        else:
+                            return False, f"Authentication Error: {error_message}"
                     else:
-                        return False, "API returned unexpected response format"
+                        return False, f"API Error: HTTP {response.status} ({response.reason})"
+                
+                data = await response.json()
+                
+                if "items" in data:
+                    return True, "API key is valid"
+                else:
+                    return False, "API returned unexpected response format"
         except Exception as e:
             return False, f"Connection error: {str(e)}"
     
@@ -570,65 +737,187 @@ class YouTubeNotifications(commands.Cog):
         api_key = self.config.get("api_key", "")
         
         if not api_key:
+            if self.config.get("detection_mode", "feed") == "feed":
+                return await self.validate_feed_channel(channel_id)
             return False, {"error": "YouTube API key not set"}
         
         try:
-            async with aiohttp.ClientSession() as session:
-                url = f"https://www.googleapis.com/youtube/v3/channels?part=snippet&id={channel_id}&key={api_key}"
-                
-                async with session.get(url) as response:
-                    if response.status != 200:
-                        data = await response.json()
-                        error_message = data.get("error", {}).get("message", f"HTTP {response.status}")
-                        return False, {"error": f"API Error: {error_message}"}
-                    
+            session = self.http_service.session
+            url = f"https://www.googleapis.com/youtube/v3/channels?part=snippet,contentDetails&id={channel_id}&key={api_key}"
+            
+            async with session.get(url) as response:
+                if response.status != 200:
                     data = await response.json()
-                    
-                    if not data.get("items"):
-                        return False, {"error": "Channel not found"}
-                    
-                    channel_info = {
-                        "title": data["items"][0]["snippet"]["title"],
-                        "thumbnail": data["items"][0]["snippet"]["thumbnails"]["default"]["url"]
-                    }
-                    
-                    return True, channel_info
+                    error_message = data.get("error", {}).get("message", f"HTTP {response.status}")
+                    return False, {"error": f"API Error: {error_message}"}
+                
+                data = await response.json()
+                
+                if not data.get("items"):
+                    return False, {"error": "Channel not found"}
+                
+                channel_info = {
+                    "title": data["items"][0]["snippet"]["title"],
+                    "thumbnail": data["items"][0]["snippet"]["thumbnails"]["default"]["url"],
+                    "uploads_playlist_id": data["items"][0]["contentDetails"]["relatedPlaylists"]["uploads"]
+                }
+                
+                return True, channel_info
         except Exception as e:
             traceback_str = traceback.format_exc()
             print(f"Error validating YouTube channel:\n{traceback_str}")
             return False, {"error": str(e)}
     
-    async def get_latest_video(self, channel_id: str) -> Optional[Dict]:
-        """Get the latest video from a YouTube channel"""
+    async def validate_feed_channel(self, channel_id: str) -> tuple:
+        """Validate a YouTube channel ID through its Atom feed, for feed mode without an API key"""
+        video_ids = await self.get_feed_video_ids(channel_id)
+        if video_ids is None:
+            return False, {"error": "Channel not found"}
+        
+        latest = self.feed_state[channel_id]["videos"][video_ids[0]]["snippet"] if video_ids else {}
+        return True, {
+            "title": latest.get("channelTitle") or channel_id,
+            "thumbnail": latest.get("thumbnails", {}).get("high", {}).get("url"),
+            "uploads_playlist_id": f"UU{channel_id[2:]}"
+        }
+    
+    async def throttle(self, key: str) -> None:
+        """Wait for the rate limit of an API key (or "feed") to allow another request"""
+        if key not in self.buckets:
+            rate = self.config.get("requests_per_second", 5)
+            self.buckets[key] = TokenBucket(rate, max(1, int(rate)))
+        await self.buckets[key].acquire()
+    
+    async def api_request(self, endpoint: str, params: Dict) -> Optional[Dict]:
+        """Make a YouTube Data API request and return the JSON response, or None on error"""
         api_key = self.config.get("api_key", "")
         
         if not api_key:
             return None
         
+        await self.throttle(api_key)
         try:
-            async with aiohttp.ClientSession() as session:
-                url = f"https://www.googleapis.com/youtube/v3/search?key={api_key}&channelId={channel_id}&part=snippet,id&order=date&maxResults=1&type=video"
+            session = self.http_service.session
+            url = f"https://www.googleapis.com/youtube/v3/{endpoint}"
+            
+            async with session.get(url, params={**params, "key": api_key}) as response:
+                if response.status != 200:
+                    print(f"YouTube API error ({endpoint}): HTTP {response.status}")
+                    try:
+                        error_data = await response.json()
+                        print(f"Error details: {error_data}")
+                    except:
+                        print(f"Could not parse error response")
+                    return None
                 
-                async with session.get(url) as response:
-                    if response.status != 200:
-                        print(f"YouTube API error: HTTP {response.status}")
-                        try:
-                            error_data = await response.json()
-                            print(f"Error details: {error_data}")
-                        except:
-                            print(f"Could not parse error response")
-                        return None
-                    
-                    data = await response.json()
-                    
-                    if not data.get("items"):
-                        return None
-                    
-                    return data["items"][0]
+                return await response.json()
+        except Exception as e:
+            traceback_str = traceback.format_exc()
+            print(f"Error calling YouTube API ({endpoint}):\n{traceback_str}")
+            return None
+    
+    async def get_uploads_playlist_id(self, channel_id: str) -> Optional[str]:
+        """Get the ID of a channel's uploads playlist, cached in the config for tracked channels"""
+        channel_info = self.config["channels"].get(channel_id, {})
+        if channel_info.get("uploads_playlist_id"):
+            return channel_info["uploads_playlist_id"]
+        
+        data = await self.api_request("channels", {"part": "contentDetails", "id": channel_id})
+        if not data or not data.get("items"):
+            return None
+        
+        playlist_id = data["items"][0]["contentDetails"]["relatedPlaylists"]["uploads"]
+        if channel_id in self.config["channels"]:
+            self.config["channels"][channel_id]["uploads_playlist_id"] = playlist_id
+            self.save_config()
+        return playlist_id
+    
+    async def get_recent_video_ids(self, channel_id: str, max_results: int = 10) -> Optional[List[str]]:
+        """Get the IDs of a channel's most recent uploads, newest first (1 quota unit instead of 100 for search)"""
+        playlist_id = await self.get_uploads_playlist_id(channel_id)
+        if not playlist_id:
+            return None
+        
+        data = await self.api_request("playlistItems", {"part": "contentDetails", "playlistId": playlist_id, "maxResults": max_results})
+        if data is None:
+            return None
+        
+        items = sorted(
+            data.get("items", []),
+            key=lambda item: item["contentDetails"].get("videoPublishedAt", ""),
+            reverse=True
+        )
+        return [item["contentDetails"]["videoId"] for item in items]
+    
+    async def get_feed_video_ids(self, channel_id: str) -> Optional[List[str]]:
+        """Get the IDs of a channel's most recent uploads from its Atom feed, newest first (no API quota)
+        
+        Requests are conditional, so an unchanged feed costs a 304 with no body.
+        """
+        state = self.feed_state.setdefault(channel_id, {"videos": {}})
+        headers = {}
+        if state.get("etag"):
+            headers["If-None-Match"] = state["etag"]
+        if state.get("last_modified"):
+            headers["If-Modified-Since"] = state["last_modified"]
+        
+        await self.throttle("feed")
+        try:
+            session = self.http_service.session
+            url = "https://www.youtube.com/feeds/videos.xml"
+            
+            async with session.get(url, params={"channel_id": channel_id}, headers=headers) as response:
+                if response.status == 304:
+                    return list(state["videos"])
+                
+                if response.status != 200:
+                    print(f"YouTube feed error for {channel_id}: HTTP {response.status}")
+                    return None
+                
+                parser = AtomFeedParser()
+                async for chunk in response.content.iter_chunked(8192):
+                    parser.feed(chunk)
+                entries = parser.close()
+                
+                state["etag"] = response.headers.get("ETag")
+                state["last_modified"] = response.headers.get("Last-Modified")
         except Exception as e:
             traceback_str = traceback.format_exc()
-            print(f"Error getting latest video:\n{traceback_str}")
+            print(f"Error reading YouTube feed for {channel_id}:\n{traceback_str}")
             return None
+        
+        entries.sort(key=lambda entry: entry["snippet"]["publishedAt"], reverse=True)
+        state["videos"] = {entry["id"]["videoId"]: entry for entry in entries}
+        return list(state["videos"])
+    
+    async def poll_channel(self, channel_id: str) -> Optional[List[str]]:
+        """Get a channel's recent upload IDs, newest first, using the configured detection mode"""
+        if self.config.get("detection_mode", "feed") == "feed":
+            video_ids = await self.get_feed_video_ids(channel_id)
+            if video_ids is not None:
+                return video_ids
+            # Fall back to the uploads playlist while the feed is unavailable
+        
+        return await self.get_recent_video_ids(channel_id)
+    
+    async def get_videos(self, video_ids: List[str]) -> Dict[str, Dict]:
+        """Look up videos in batches of 50 and return them by ID, shaped like search results"""
+        videos = {}
+        for start in range(0, len(video_ids), 50):
+            data = await self.api_request("videos", {"part": "snippet", "id": ",".join(video_ids[start:start + 50])})
+            for item in (data or {}).get("items", []):
+                videos[item["id"]] = {"id": {"videoId": item["id"]}, "snippet": item["snippet"]}
+        return videos
+    
+    async def get_latest_video(self, channel_id: str) -> Optional[Dict]:
+        """Get the latest video from a YouTube channel"""
+        video_ids = await self.poll_channel(channel_id)
+        if not video_ids:
+            return None
+        
+        # Without an API key (or quota) the feed entry is all there is
+        video_id = video_ids[0]
+        return (await self.get_videos([video_id])).get(video_id) or self.feed_state.get(channel_id, {}).get("videos", {}).get(video_id)
     
     async def create_video_embed(self, video_item: Dict) -> discord.Embed:
         """Create an embed for a YouTube video"""
@@ -658,70 +947,277 @@ class YouTubeNotifications(commands.Cog):
         
         return embed
     
-    @tasks.loop(minutes=10)
-    async def check_uploads(self):
-        """Check for new uploads from all tracked YouTube channels"""
-        if not self.config.get("api_key") or not self.config.get("channels"):
+    def find_new_videos(self, channel_id: str, video_ids: List[str]) -> List[str]:
+        """Return the uploads newer than the last one announced for a channel, oldest first"""
+        channel_info = self.config["channels"][channel_id]
+        last_known_id = channel_info.get("last_video_id")
+        
+        if not video_ids or video_ids[0] == last_known_id:
+            return []
+        
+        # For first-time checks, just record the video ID without posting
+        if last_known_id is None:
+            print(f"First check for {channel_info['name']}, recording latest video: {video_ids[0]}")
+            self.config["channels"][channel_id]["last_video_id"] = video_ids[0]
+            self.save_config()
+            return []
+        
+        # If the last known video fell out of the window (or was deleted), only announce the newest
+        if last_known_id not in video_ids:
+            return video_ids[:1]
+        
+        return list(reversed(video_ids[:video_ids.index(last_known_id)]))
+    
+    async def announce_video(self, channel_id: str, video: Dict) -> None:
+        """Record a new video as announced and post it to the channel's Discord channel"""
+        channel_info = self.config["channels"][channel_id]
+        video_id = video["id"]["videoId"]
+        
+        # A video can be found by a push notification and a sweep at the same time
+        if video_id in self.announced:
             return
+        self.announced.append(video_id)
         
-        print(f"[{datetime.datetime.now()}] Checking for YouTube uploads...")
+        print(f"New video found for {channel_info['name']}: {video_id}")
+        
+        # Update the last known video ID
+        self.config["channels"][channel_id]["last_video_id"] = video_id
+        self.config["channels"][channel_id]["last_published"] = video["snippet"]["publishedAt"]
+        self.save_config()
         
-        for channel_id, channel_info in self.config["channels"].items():
+        # Get the Discord channel to post to
+        discord_channel = self.bot.get_channel(channel_info["discord_channel_id"])
+        if not discord_channel:
+            print(f"Discord channel not found for {channel_info['name']}")
+            return
+        
+        # Create and send notification
+        embed = await self.create_video_embed(video)
+        
+        await discord_channel.send(
+            f"🚨 **New Content Alert!** 🚨\n📺 **{video['snippet']['channelTitle']}** just dropped a fresh video!\n👀 **Click the video title in the embed below to watch on YouTube!** 💯",
+            embed=embed
+        )
+    
+    async def check_channel(self, channel_id: str, semaphore: asyncio.Semaphore) -> tuple:
+        """Poll one channel during a sweep and return (channel_id, new video IDs), never raising"""
+        async with semaphore:
             try:
-                # Add a delay between requests to avoid rate limiting
-                await asyncio.sleep(1)
-                
-                latest_video = await self.get_latest_video(channel_id)
-                if not latest_video:
-                    print(f"No videos found or error for channel: {channel_info['name']}")
-                    continue
-                
-                video_id = latest_video["id"]["videoId"]
-                last_known_id = channel_info.get("last_video_id")
-                
-                # Skip if we've already seen this video or if this is the first check
-                if last_known_id == video_id:
-                    continue
-                
-                # For first-time checks, just record the video ID without posting
-                if last_known_id is None:
-                    print(f"First check for {channel_info['name']}, recording latest video: {video_id}")
-                    self.config["channels"][channel_id]["last_video_id"] = video_id
-                    self.save_config()
-                    continue
-                
-                print(f"New video found for {channel_info['name']}: {video_id}")
+                video_ids = await asyncio.wait_for(self.poll_channel(channel_id), timeout=30)
+                if video_ids is None:
+                    print(f"No videos found or error for channel: {self.config['channels'][channel_id]['name']}")
+                    return channel_id, []
                 
-                # Update the last known video ID
-                self.config["channels"][channel_id]["last_video_id"] = video_id
-                self.save_config()
-                
-                # Get the Discord channel to post to
-                discord_channel = self.bot.get_channel(channel_info["discord_channel_id"])
-                if not discord_channel:
-                    print(f"Discord channel not found for {channel_info['name']}")
-                    continue
-                
-                # Create and send notification
-                embed = await self.create_video_embed(latest_video)
-                
-                await discord_channel.send(
-                    f"🚨 **New Content Alert!** 🚨\n📺 **{latest_video['snippet']['channelTitle']}** just dropped a fresh video!\n👀 **Click the video title in the embed below to watch on YouTube!** 💯",
-                    embed=embed
-                )
+                return channel_id, self.find_new_videos(channel_id, video_ids)
+            except asyncio.TimeoutError:
+                print(f"Timed out checking for uploads for {channel_id}")
             except Exception as e:
                 traceback_str = traceback.format_exc()
                 print(f"Error checking for uploads for {channel_id}:\n{traceback_str}")
+            return channel_id, []
+    
+    @tasks.loop(minutes=10)
+    async def check_uploads(self):
+        """Check for new uploads from all tracked YouTube channels"""
+        if not self.can_poll() or not self.config.get("channels"):
+            return
+        
+        print(f"[{datetime.datetime.now()}] Checking for YouTube uploads...")
+        
+        # Poll the feeds or uploads playlists concurrently; one slow or failing channel doesn't hold up the rest
+        started = time.monotonic()
+        semaphore = asyncio.Semaphore(self.config.get("max_concurrent_checks", 5))
+        results = await asyncio.gather(*(
+            self.check_channel(channel_id, semaphore) for channel_id in list(self.config["channels"])
+        ))
+        new_videos = {channel_id: video_ids for channel_id, video_ids in results if video_ids}
+        print(f"Checked {len(results)} YouTube channels in {time.monotonic() - started:.1f}s")
+        
+        if not new_videos:
+            return
+        
+        # Fetch details for every new video in as few requests as possible
+        videos = await self.get_videos([video_id for video_ids in new_videos.values() for video_id in video_ids])
+        
+        for channel_id, video_ids in new_videos.items():
+            for video_id in video_ids:
+                # Fall back to the feed entry if the API lookup failed (e.g. quota exhausted)
+                video = videos.get(video_id) or self.feed_state.get(channel_id, {}).get("videos", {}).get(video_id)
+                if not video:
+                    continue  # Private or removed since it was listed
+                try:
+                    await self.announce_video(channel_id, video)
+                except Exception as e:
+                    traceback_str = traceback.format_exc()
+                    print(f"Error posting upload {video_id} for {channel_id}:\n{traceback_str}")
     
     @check_uploads.before_loop
     async def before_check_uploads(self):
         """Wait until the bot is ready before starting the loop"""
         await self.bot.wait_until_ready()
     
-    def cog_unload(self):
-        """Stop the background task when the cog is unloaded"""
+    def topic_url(self, channel_id: str) -> str:
+        """Return the WebSub topic URL of a channel's feed"""
+        return f"https://www.youtube.com/xml/feeds/videos.xml?channel_id={channel_id}"
+    
+    async def subscribe(self, channel_id: str, mode: str = "subscribe", callback_url: Optional[str] = None) -> bool:
+        """Ask the hub to (un)subscribe the callback URL to a channel; the hub confirms by calling the callback"""
+        try:
+            session = self.http_service.session
+            data = {
+                "hub.callback": callback_url or self.config["websub_callback_url"],
+                "hub.mode": mode,
+                "hub.topic": self.topic_url(channel_id),
+                "hub.verify": "async",
+                "hub.secret": self.config.get("websub_secret", ""),
+                "hub.lease_seconds": 432000  # 5 days
+            }
+            
+            async with session.post(self.config.get("websub_hub", "https://pubsubhubbub.appspot.com/subscribe"), data=data) as response:
+                if response.status not in (202, 204):
+                    print(f"WebSub hub rejected {mode} for {channel_id}: HTTP {response.status} {await response.text()}")
+                    return False
+                
+                if mode == "subscribe":
+                    self.subscription_requests[channel_id] = time.time()
+                return True
+        except Exception as e:
+            traceback_str = traceback.format_exc()
+            print(f"Error sending WebSub {mode} for {channel_id}:\n{traceback_str}")
+            return False
+    
+    def handle_websub(self, method: str, args: Dict, headers: Dict, body: bytes) -> tuple:
+        """Handle a request to /youtube/websub and return (body, status)
+        
+        Runs on the web server thread, so anything that touches the config or
+        Discord is handed to the bot's event loop.
+        """
+        if method == "GET":
+            # Subscription verification: echo the challenge if we asked for this
+            topic = args.get("hub.topic", "")
+            channel_id = parse_qs(urlparse(topic).query).get("channel_id", [""])[0]
+            mode = args.get("hub.mode")
+            try:
+                lease_seconds = int(args.get("hub.lease_seconds", 432000))
+            except ValueError:
+                return "Invalid hub.lease_seconds", 400
+            
+            # The tracked channels belong to the event loop, so the check runs there
+            future = asyncio.run_coroutine_threadsafe(self.verify_subscription(channel_id, mode, lease_seconds), self.bot.loop)
+            try:
+                confirmed = future.result(timeout=10)
+            except concurrent.futures.TimeoutError:
+                future.cancel()
+                return "Bot is busy", 503
+            
+            if confirmed:
+                return args.get("hub.challenge", ""), 200
+            return "Unknown subscription", 404
+        
+        # Notification: the hub signs the body with our secret; ignore anything that doesn't match
+        secret = self.config.get("websub_secret", "")
+        if not secret:
+            # Anyone can sign with an empty key, so nothing can be trusted before a secret exists
+            print("Rejecting WebSub notification: no websub_secret is set")
+            return "", 403
+        
+        method_name, _, signature = headers.get("X-Hub-Signature", "").partition("=")
+        if method_name not in ("sha1", "sha256"):
+            print("Ignoring unsigned WebSub notification")
+            return "", 204
+        
+        expected = hmac.new(secret.encode(), body, getattr(hashlib, method_name)).hexdigest()
+        if not hmac.compare_digest(expected, signature):
+            print("Ignoring WebSub notification with a bad signature")
+            return "", 204
+        
+        try:
+            entries = parse_atom_feed([body])
+        except ElementTree.ParseError as e:
+            print(f"Could not parse WebSub notification: {e}")
+            return "", 204
+        
+        if entries:
+            asyncio.run_coroutine_threadsafe(self.handle_push(entries), self.bot.loop)
+        return "", 204
+    
+    async def verify_subscription(self, channel_id: str, mode: str, lease_seconds: int) -> bool:
+        """Return whether a hub's verification request matches what we asked for, recording the lease of a subscription"""
+        tracked = channel_id in self.config["channels"] and bool(self.config.get("websub_callback_url"))
+        if mode == "subscribe" and tracked:
+            self.record_lease(channel_id, lease_seconds)
+            return True
+        return mode == "unsubscribe" and not tracked
+    
+    def record_lease(self, channel_id: str, lease_seconds: int) -> None:
+        """Remember when a verified subscription expires so it can be renewed in time"""
+        if channel_id in self.config["channels"]:
+            self.config["channels"][channel_id]["websub_expires"] = int(time.time()) + lease_seconds
+            self.save_config()
+    
+    def parse_published(self, published: str) -> datetime.datetime:
+        """Parse a publishedAt timestamp from the API or a feed"""
+        return datetime.datetime.fromisoformat(published.replace('Z', '+00:00'))
+    
+    async def handle_push(self, entries: List[Dict]) -> None:
+        """Announce the videos in a push notification that are actually new"""
+        new_entries = []
+        for entry in entries:
+            channel_info = self.config["channels"].get(entry["snippet"]["channelId"])
+            video_id = entry["id"]["videoId"]
+            if not channel_info or video_id in self.announced or video_id == channel_info.get("last_video_id"):
+                continue
+            
+            # The hub also pings when an old video's title or description is edited
+            if channel_info.get("last_published"):
+                cutoff = self.parse_published(channel_info["last_published"])
+            else:
+                cutoff = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=1)
+            if self.parse_published(entry["snippet"]["publishedAt"]) <= cutoff:
+                continue
+            
+            new_entries.append(entry)
+        
+        if not new_entries:
+            return
+        
+        new_entries.sort(key=lambda entry: self.parse_published(entry["snippet"]["publishedAt"]))
+        videos = await self.get_videos([entry["id"]["videoId"] for entry in new_entries])
+        
+        for entry in new_entries:
+            video_id = entry["id"]["videoId"]
+            try:
+                await self.announce_video(entry["snippet"]["channelId"], videos.get(video_id) or entry)
+            except Exception as e:
+                traceback_str = traceback.format_exc()
+                print(f"Error posting pushed upload {video_id}:\n{traceback_str}")
+    
+    @tasks.loop(hours=1)
+    async def renew_subscriptions(self):
+        """Renew WebSub subscriptions that expire within a day (or were never verified)"""
+        if not self.config.get("websub_callback_url"):
+            return
+        
+        now = time.time()
+        for channel_id, channel_info in list(self.config["channels"].items()):
+            # Give a recent request an hour to be verified before asking again
+            if now - self.subscription_requests.get(channel_id, 0) < 3600:
+                continue
+            if channel_info.get("websub_expires", 0) < now + 86400:
+                await self.subscribe(channel_id)
+    
+    @renew_subscriptions.before_loop
+    async def before_renew_subscriptions(self):
+        """Wait until the bot is ready before starting the loop"""
+        await self.bot.wait_until_ready()
+    
+    async def cog_unload(self):
+        """Stop the background tasks and release the shared HTTP session when the cog is unloaded"""
         if self.check_uploads.is_running():
             self.check_uploads.cancel()
+        if self.renew_subscriptions.is_running():
+            self.renew_subscriptions.cancel()
+        await self.http_service.release()
 
 async def setup(bot):
     await bot.add_cog(YouTubeNotifications(bot)) 
\ No newline at end of file
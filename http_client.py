@@ -0,0 +1,44 @@
+import aiohttp
+
+class HTTPService:
+    """Bot-wide aiohttp session for outbound HTTP, shared by every cog.
+
+    One pooled session keeps connections to googleapis and the XRPL node warm
+    between calls instead of paying for DNS, TCP and TLS on every request.
+    Cogs acquire the service when they load and release it when they unload;
+    the session is closed when the last cog lets go.
+    """
+
+    def __init__(self, limit: int = 100, limit_per_host: int = 10, dns_cache_ttl: int = 300, timeout: float = 30):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=10)
+        self.users = 0
+        self._session = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Return the shared session, creating it on first use (it must be created inside the event loop)"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_cache_ttl
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self._session
+
+    async def release(self) -> None:
+        """Stop using the service; the last user to release it closes the session"""
+        self.users = max(0, self.users - 1)
+        if self.users == 0 and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+def acquire(bot) -> HTTPService:
+    """Return the bot's shared HTTP service (created on first use) and count the caller as a user"""
+    if getattr(bot, "http_service", None) is None:
+        bot.http_service = HTTPService()
+    bot.http_service.users += 1
+    return bot.http_service
@@ -0,0 +1 @@
+"""Building blocks of the advanced permissions cog: storage, scheduling, indexing and policies."""
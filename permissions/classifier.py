@@ -0,0 +1,66 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+class ChannelClassifier:
+    """Sorts channels into labels by keywords in their names.
+    
+    A scheme maps labels to keyword lists. The keywords of each label are
+    compiled into one regex when the scheme is registered, and the labels of
+    every channel are cached per guild and scheme. The cache is kept current
+    from channel create, rename and delete events, so presets, policies and
+    the classify command don't rescan channel names on every run.
+    """
+    
+    def __init__(self):
+        self.keywords: Dict[str, Dict[str, Tuple[str, ...]]] = {}
+        self.patterns: Dict[str, List[Tuple[str, "re.Pattern"]]] = {}
+        # guild_id -> scheme -> {channel_id: frozenset of labels}
+        self.guilds: Dict[int, Dict[str, Dict[int, frozenset]]] = {}
+    
+    def register(self, scheme: str, keywords: Dict[str, List[str]]):
+        """Compile a scheme; registering the same keywords again keeps the cache."""
+        normalized = {label: tuple(str(keyword).lower() for keyword in words) for label, words in keywords.items()}
+        if self.keywords.get(scheme) == normalized:
+            return
+        
+        self.keywords[scheme] = normalized
+        self.patterns[scheme] = [
+            (label, re.compile("|".join(re.escape(keyword) for keyword in words)))
+            for label, words in normalized.items() if words
+        ]
+        for cache in self.guilds.values():
+            cache.pop(scheme, None)
+    
+    def _labels_for_name(self, scheme: str, name: str) -> frozenset:
+        """Return the labels whose keywords appear in a channel name."""
+        name = name.lower()
+        return frozenset(label for label, pattern in self.patterns[scheme] if pattern.search(name))
+    
+    def classify(self, guild, scheme: str) -> Dict[int, frozenset]:
+        """Return {channel_id: labels} for every channel in a guild, building it on first use."""
+        cache = self.guilds.setdefault(guild.id, {})
+        if scheme not in cache:
+            cache[scheme] = {channel.id: self._labels_for_name(scheme, channel.name) for channel in guild.channels}
+        return cache[scheme]
+    
+    def labels(self, channel, scheme: str) -> frozenset:
+        """Return the labels of one channel."""
+        classified = self.classify(channel.guild, scheme)
+        if channel.id not in classified:
+            classified[channel.id] = self._labels_for_name(scheme, channel.name)
+        return classified[channel.id]
+    
+    def first(self, channel, scheme: str, order: List[str], default: Optional[str] = None) -> Optional[str]:
+        """Return the first label in order that a channel has, or default."""
+        labels = self.labels(channel, scheme)
+        return next((label for label in order if label in labels), default)
+    
+    def update_channel(self, channel):
+        """Re-classify a created or renamed channel in every cached scheme."""
+        for scheme, classified in self.guilds.get(channel.guild.id, {}).items():
+            classified[channel.id] = self._labels_for_name(scheme, channel.name)
+    
+    def remove_channel(self, channel):
+        """Forget a deleted channel."""
+        for classified in self.guilds.get(channel.guild.id, {}).values():
+            classified.pop(channel.id, None)
@@ -0,0 +1,75 @@
+import time
+from typing import Dict, Optional, Tuple
+
+class PermissionDriftDetector:
+    """Tracks channels whose live overwrites disagree with the stored permission settings.
+    
+    The stored settings are compiled into expected allow/deny bits per channel
+    and role, covering only the permissions they mention. Channels are then
+    re-checked one at a time from gateway events, so the drift report stays
+    current without polling the guild.
+    
+    Each drifted channel records where the difference came from: "manual" for
+    an edit made outside the bot, "bot" for one of the cog's own writes and
+    "settings" when the stored settings changed instead.
+    """
+    
+    def __init__(self):
+        self._expected = {}  # guild_id -> {channel_id: {target_id: (allow, deny, mask)}}
+        self.drift = {}  # guild_id -> {channel_id: {"targets", "source", "since"}}
+    
+    def has_guild(self, guild) -> bool:
+        """Check whether the expected state of a guild is compiled and current."""
+        return guild.id in self._expected
+    
+    def set_expected(self, guild, expected: Dict[int, Dict[int, Tuple[int, int, int]]]):
+        """Replace a guild's expected state and re-check all of its channels."""
+        self._expected[guild.id] = expected
+        previous = self.drift.get(guild.id, {})
+        self.drift[guild.id] = {}
+        for channel in guild.channels:
+            self.check_channel(channel, previous.get(channel.id, {}).get("source", "settings"))
+    
+    def invalidate(self):
+        """Forget the expected state after the stored settings change; it is recompiled on next use."""
+        self._expected.clear()
+    
+    def check_channel(self, channel, source: str = "manual", overwrites: Optional[Dict] = None) -> Optional[Dict]:
+        """Compare one channel (or the given overwrites for it) with its expected state and return its drift entry, if any."""
+        drift = self.drift.setdefault(channel.guild.id, {})
+        expected = self._expected.get(channel.guild.id, {}).get(channel.id)
+        if not expected:
+            drift.pop(channel.id, None)
+            return None
+        
+        live = {}
+        for target, overwrite in (channel.overwrites if overwrites is None else overwrites).items():
+            allow, deny = overwrite.pair()
+            live[target.id] = (allow.value, deny.value)
+        
+        targets = {}
+        for target_id, (allow, deny, mask) in expected.items():
+            live_allow, live_deny = live.get(target_id, (0, 0))
+            if (live_allow & mask, live_deny & mask) != (allow, deny):
+                targets[target_id] = (live_allow & mask, live_deny & mask, allow, deny, mask)
+        
+        if not targets:
+            drift.pop(channel.id, None)
+            return None
+        
+        previous = drift.get(channel.id)
+        drift[channel.id] = {
+            "targets": targets,
+            "source": source,
+            "since": previous["since"] if previous else time.time()
+        }
+        return drift[channel.id]
+    
+    def remove_channel(self, channel):
+        """Forget a deleted channel."""
+        self._expected.get(channel.guild.id, {}).pop(channel.id, None)
+        self.drift.get(channel.guild.id, {}).pop(channel.id, None)
+    
+    def for_guild(self, guild) -> Dict[int, Dict]:
+        """Return the drift entries of a guild, keyed by channel ID."""
+        return self.drift.get(guild.id, {})
@@ -0,0 +1,91 @@
+import discord
+from typing import Optional, Tuple
+from permissions.index import PermissionIndex
+
+class EffectivePermissionResolver:
+    """Computes what a member can actually do in a channel using permission bitmasks.
+    
+    Results depend only on the member's set of roles (plus a member overwrite,
+    if the channel has one), so they are memoized per role-set signature.
+    Channel results are tied to the index's overwrite map for that channel and
+    are dropped automatically when the index replaces it; role permission
+    changes clear the whole cache.
+    """
+    
+    ADMINISTRATOR = discord.Permissions.administrator.flag
+    VIEW_CHANNEL = discord.Permissions.view_channel.flag
+    
+    def __init__(self, index: PermissionIndex):
+        self.index = index
+        self._base_cache = {}  # (guild_id, signature) -> permissions value
+        self._channel_cache = {}  # channel_id -> (overwrite map, {(signature, member_id): permissions value})
+    
+    @staticmethod
+    def signature(member) -> Tuple[int, ...]:
+        """Return the cache key for a member's role set."""
+        return tuple(sorted(role.id for role in member.roles))
+    
+    def invalidate_roles(self):
+        """Forget every cached result after a role's permissions changed."""
+        self._base_cache.clear()
+        self._channel_cache.clear()
+    
+    def base_permissions(self, guild, signature: Tuple[int, ...]) -> int:
+        """Return the server-wide permissions granted by a set of roles."""
+        key = (guild.id, signature)
+        if key not in self._base_cache:
+            value = guild.default_role.permissions.value
+            for role_id in signature:
+                role = guild.get_role(role_id)
+                if role:
+                    value |= role.permissions.value
+            if value & self.ADMINISTRATOR:
+                value = discord.Permissions.all().value
+            self._base_cache[key] = value
+        return self._base_cache[key]
+    
+    def channel_permissions(self, guild, channel_id: int, signature: Tuple[int, ...], member_id: Optional[int] = None) -> int:
+        """Return the permissions a role set (and optionally a member) has in a channel."""
+        overwrites = self.index.overwrites_for(channel_id)
+        cached = self._channel_cache.get(channel_id)
+        if cached is None or cached[0] is not overwrites:
+            cached = (overwrites, {})
+            self._channel_cache[channel_id] = cached
+        
+        # Only members with their own overwrite in this channel need their own cache entry
+        if member_id not in overwrites:
+            member_id = None
+        key = (signature, member_id)
+        if key in cached[1]:
+            return cached[1][key]
+        
+        value = self.base_permissions(guild, signature)
+        if not value & self.ADMINISTRATOR:
+            # @everyone overwrite, then all role overwrites combined, then the member overwrite
+            allow, deny = overwrites.get(guild.id, (0, 0))
+            value = (value & ~deny) | allow
+            
+            role_allow = role_deny = 0
+            for role_id in signature:
+                if role_id != guild.id and role_id in overwrites:
+                    role_allow |= overwrites[role_id][0]
+                    role_deny |= overwrites[role_id][1]
+            value = (value & ~role_deny) | role_allow
+            
+            if member_id is not None:
+                allow, deny = overwrites[member_id]
+                value = (value & ~deny) | allow
+            
+            # Without view_channel no other permission in the channel applies
+            if not value & self.VIEW_CHANNEL:
+                value = 0
+        
+        cached[1][key] = value
+        return value
+    
+    def for_member(self, member, channel) -> discord.Permissions:
+        """Return a member's effective permissions in a channel."""
+        if member.id == member.guild.owner_id:
+            return discord.Permissions.all()
+        self.index.ensure_guild(member.guild)
+        return discord.Permissions(self.channel_permissions(member.guild, channel.id, self.signature(member), member.id))
@@ -0,0 +1,119 @@
+from typing import Dict, List, Tuple
+
+class PermissionIndex:
+    """In-memory index of channel overwrites and channel group membership.
+    
+    Overwrites are kept per channel as {target_id: (allow, deny)}, with reverse
+    maps from every permission bit to the targets and channels that allow or
+    deny it. Channels are re-indexed one at a time as they change, so lookups
+    such as "who can send in #x" never rescan the guild.
+    """
+    
+    def __init__(self):
+        self._indexed_guilds = set()
+        self._overwrites = {}  # channel_id -> {target_id: (allow, deny)}
+        self._target_channels = {}  # target_id -> {channel_id}
+        self._allow = {}  # flag -> {target_id: {channel_id}}
+        self._deny = {}  # flag -> {target_id: {channel_id}}
+        self._groups = {}  # channel_id -> {group_name}
+    
+    @staticmethod
+    def _bits(value: int):
+        """Yield every set bit of a permission value."""
+        while value:
+            bit = value & -value
+            yield bit
+            value ^= bit
+    
+    def ensure_guild(self, guild):
+        """Index every channel of the guild the first time it is queried."""
+        if guild.id in self._indexed_guilds:
+            return
+        
+        for channel in guild.channels:
+            self.update_channel(channel.id, channel.overwrites)
+        self._indexed_guilds.add(guild.id)
+    
+    def _unlink(self, channel_id: int):
+        """Remove a channel's overwrites from the reverse maps."""
+        for target_id, (allow, deny) in self._overwrites.pop(channel_id, {}).items():
+            self._target_channels.get(target_id, set()).discard(channel_id)
+            for reverse, value in ((self._allow, allow), (self._deny, deny)):
+                for flag in self._bits(value):
+                    reverse[flag][target_id].discard(channel_id)
+                    if not reverse[flag][target_id]:
+                        del reverse[flag][target_id]
+    
+    def update_channel(self, channel_id: int, overwrites: Dict):
+        """Replace the indexed overwrites of a channel with the given overwrite map."""
+        self._unlink(channel_id)
+        
+        entries = {}
+        for target, overwrite in overwrites.items():
+            allow, deny = overwrite.pair()
+            if not (allow.value or deny.value):
+                continue
+            
+            entries[target.id] = (allow.value, deny.value)
+            self._target_channels.setdefault(target.id, set()).add(channel_id)
+            for reverse, value in ((self._allow, allow.value), (self._deny, deny.value)):
+                for flag in self._bits(value):
+                    reverse.setdefault(flag, {}).setdefault(target.id, set()).add(channel_id)
+        
+        self._overwrites[channel_id] = entries
+    
+    def remove_channel(self, channel_id: int):
+        """Forget a deleted channel."""
+        self._unlink(channel_id)
+        self._groups.pop(channel_id, None)
+    
+    def remove_target(self, target_id: int):
+        """Forget a deleted role or a member who left; Discord drops their overwrites too."""
+        for channel_id in list(self._target_channels.pop(target_id, set())):
+            # Replace rather than mutate the map so cached results tied to it are dropped
+            entries = dict(self._overwrites[channel_id])
+            allow, deny = entries.pop(target_id)
+            self._overwrites[channel_id] = entries
+            for reverse, value in ((self._allow, allow), (self._deny, deny)):
+                for flag in self._bits(value):
+                    reverse[flag].pop(target_id, None)
+    
+    def set_groups(self, channel_groups: Dict[str, List[int]]):
+        """Rebuild the channel -> groups map from the stored channel groups."""
+        self._groups = {}
+        for group_name, channel_ids in channel_groups.items():
+            for channel_id in channel_ids:
+                self._groups.setdefault(channel_id, set()).add(group_name)
+    
+    def groups_for(self, channel_id: int) -> List[str]:
+        """Return the names of the groups a channel belongs to."""
+        return sorted(self._groups.get(channel_id, ()))
+    
+    def overwrites_for(self, channel_id: int) -> Dict[int, Tuple[int, int]]:
+        """Return {target_id: (allow, deny)} for a channel."""
+        return self._overwrites.get(channel_id, {})
+    
+    def channels_with_target(self, target_id: int) -> set:
+        """Return the IDs of channels that have an overwrite for the target."""
+        return self._target_channels.get(target_id, set())
+    
+    def targets_for(self, channel_id: int, flag: int) -> Tuple[List[int], List[int]]:
+        """Return the targets explicitly allowed and denied a permission in a channel."""
+        allowed, denied = [], []
+        for target_id, (allow, deny) in self.overwrites_for(channel_id).items():
+            if allow & flag:
+                allowed.append(target_id)
+            elif deny & flag:
+                denied.append(target_id)
+        return allowed, denied
+    
+    def channels_for(self, target_id: int, flag: int) -> Tuple[set, set]:
+        """Return the channels where a target is explicitly allowed and denied a permission."""
+        return (
+            self._allow.get(flag, {}).get(target_id, set()),
+            self._deny.get(flag, {}).get(target_id, set())
+        )
+    
+    def targets_with(self, flag: int) -> List[int]:
+        """Return every target that is explicitly allowed a permission somewhere."""
+        return list(self._allow.get(flag, {}))
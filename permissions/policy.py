@@ -0,0 +1,190 @@
+import discord
+import config
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+from permissions.classifier import ChannelClassifier
+
+try:
+    import yaml
+except ImportError:
+    yaml = None  # YAML policies are optional; JSON policies always work
+
+class PermissionPolicy:
+    """A declarative description of the channel permissions a guild should have.
+    
+    A policy has named groups of channels and rules that set overwrites for
+    roles on those groups. It is compiled against the live guild into staged
+    overwrite operations, which the cog then applies with the batched engine.
+    See policies/xgc.json for an example.
+    
+    Groups can select channels by:
+    - "channels": channel names or IDs
+    - "match": keywords that must appear in the channel name
+    - "categories": category names or IDs, selecting all of their channels
+    - "group": a channel group stored with the channels commands
+    - "exclude": channel names or IDs to leave out
+    - "exclude_match": keywords that leave a channel out
+    
+    Rules reference a "group" (or a list of "groups"), a "role" (a role name,
+    ID, "@everyone" or "$verified") and "allow", "deny" and "neutral"
+    permission lists.
+    
+    By default the policy owns the overwrite of every role it mentions on
+    the channels it targets; set "replace" to false to merge into the existing
+    overwrites instead. Set "first_match" to true to put each channel in only
+    the first group that selects it.
+    """
+    
+    def __init__(self, data: Dict, name: str = "policy"):
+        self.data = data
+        self.name = data.get("name", name)
+        self.replace = data.get("replace", True)
+        self.first_match = data.get("first_match", False)
+    
+    @classmethod
+    def parse(cls, text: str, filename: str) -> "PermissionPolicy":
+        """Parse a JSON or YAML policy; YAML needs PyYAML to be installed. Syntax errors raise ValueError."""
+        name = os.path.splitext(os.path.basename(filename))[0]
+        if filename.endswith((".yaml", ".yml")):
+            if yaml is None:
+                raise ValueError("YAML policies need PyYAML (`pip install pyyaml`). Use a .json policy instead.")
+            try:
+                data = yaml.safe_load(text)
+            except yaml.YAMLError as e:
+                raise ValueError(str(e))
+        else:
+            data = json.loads(text)
+        
+        cls.validate(data)
+        return cls(data, name)
+    
+    GROUP_LIST_KEYS = ("channels", "match", "categories", "exclude", "exclude_match")
+    RULE_LIST_KEYS = ("groups", "allow", "deny", "neutral")
+    
+    @classmethod
+    def validate(cls, data):
+        """Check the shape of parsed policy data, raising ValueError that names the offending key."""
+        if not isinstance(data, dict) or not isinstance(data.get("rules"), list):
+            raise ValueError("A policy must be an object with a \"rules\" list.")
+        
+        groups = data.get("groups", {})
+        if not isinstance(groups, dict):
+            raise ValueError("\"groups\" must be an object mapping group names to group specifications.")
+        for group_name, spec in groups.items():
+            if not isinstance(spec, dict):
+                raise ValueError(f"groups.{group_name} must be an object.")
+            for key in cls.GROUP_LIST_KEYS:
+                if not isinstance(spec.get(key, []), list) or not all(isinstance(item, (str, int)) for item in spec.get(key, [])):
+                    raise ValueError(f"groups.{group_name}.{key} must be a list of names or IDs.")
+            if not isinstance(spec.get("group", ""), str):
+                raise ValueError(f"groups.{group_name}.group must be a stored channel group name.")
+        
+        for number, rule in enumerate(data["rules"], start=1):
+            if not isinstance(rule, dict):
+                raise ValueError(f"rules[{number}] must be an object.")
+            for key in cls.RULE_LIST_KEYS:
+                if not isinstance(rule.get(key, []), list) or not all(isinstance(item, str) for item in rule.get(key, [])):
+                    raise ValueError(f"rules[{number}].{key} must be a list of strings.")
+            if not isinstance(rule.get("group", ""), str):
+                raise ValueError(f"rules[{number}].group must be a group name.")
+            if not isinstance(rule.get("role", ""), (str, int)) or isinstance(rule.get("role"), bool):
+                raise ValueError(f"rules[{number}].role must be a role name or ID.")
+    
+    def keyword_scheme(self) -> Dict[str, List[str]]:
+        """Return the "match" and "exclude_match" keywords of every group as a classifier scheme."""
+        scheme = {}
+        for group_name, spec in self.data.get("groups", {}).items():
+            scheme[group_name] = spec.get("match", [])
+            scheme[f"!{group_name}"] = spec.get("exclude_match", [])
+        return scheme
+    
+    def _channel_matches(self, channel, group_name: str, spec: Dict, stored_groups: Dict[str, List[int]], labels: frozenset) -> bool:
+        """Check whether a channel belongs to a group specification."""
+        channel_name = channel.name.lower()
+        if str(channel.id) in map(str, spec.get("exclude", [])) or channel_name in [str(name).lower() for name in spec.get("exclude", [])]:
+            return False
+        if f"!{group_name}" in labels:
+            return False
+        
+        if channel_name in [str(name).lower() for name in spec.get("channels", [])] or str(channel.id) in map(str, spec.get("channels", [])):
+            return True
+        if group_name in labels:
+            return True
+        
+        category = getattr(channel, "category", None)
+        if category is not None:
+            category_refs = [str(ref).lower() for ref in spec.get("categories", [])]
+            if category.name.lower() in category_refs or str(category.id) in category_refs:
+                return True
+        
+        return "group" in spec and channel.id in stored_groups.get(spec["group"], [])
+    
+    def resolve_groups(self, guild, stored_groups: Dict[str, List[int]], classifier: Optional[ChannelClassifier] = None) -> Dict[str, List]:
+        """Return the channels of every group in the policy."""
+        classifier = classifier or ChannelClassifier()
+        scheme = f"policy:{self.name}"
+        classifier.register(scheme, self.keyword_scheme())
+        classified = classifier.classify(guild, scheme)
+        
+        groups = {group_name: [] for group_name in self.data.get("groups", {})}
+        for channel in guild.channels:
+            if isinstance(channel, discord.CategoryChannel):
+                continue
+            
+            labels = classified.get(channel.id, frozenset())
+            for group_name, spec in self.data.get("groups", {}).items():
+                if self._channel_matches(channel, group_name, spec, stored_groups, labels):
+                    groups[group_name].append(channel)
+                    if self.first_match:
+                        break
+        return groups
+    
+    def _resolve_role(self, guild, reference):
+        """Resolve a role reference used in a rule."""
+        reference = str(reference)
+        if reference.lower() in ("@everyone", "everyone"):
+            return guild.default_role
+        if reference.lower() == "$verified":
+            return guild.get_role(config.VERIFIED_ROLE_ID)
+        if reference.isdigit():
+            return guild.get_role(int(reference))
+        return discord.utils.get(guild.roles, name=reference)
+    
+    def compile(self, guild, stored_groups: Dict[str, List[int]], classifier: Optional[ChannelClassifier] = None) -> Tuple[List[Tuple[object, object, Dict[str, Optional[bool]]]], List[str]]:
+        """Turn the policy into (channel, role, permissions) operations plus warnings.
+        
+        Operations are in rule order; permissions from several rules for the
+        same channel and role are meant to be combined.
+        """
+        groups = self.resolve_groups(guild, stored_groups, classifier)
+        operations = []
+        warnings = []
+        
+        for number, rule in enumerate(self.data["rules"], start=1):
+            role = self._resolve_role(guild, rule.get("role", ""))
+            if role is None:
+                warnings.append(f"Rule {number}: role '{rule.get('role')}' not found, skipped.")
+                continue
+            
+            permissions = {}
+            for key, value in (("allow", True), ("deny", False), ("neutral", None)):
+                for perm in rule.get(key, []):
+                    if perm not in discord.Permissions.VALID_FLAGS:
+                        warnings.append(f"Rule {number}: unknown permission '{perm}', skipped.")
+                        continue
+                    permissions[perm] = value
+            
+            if not permissions and any(rule.get(key) for key in ("allow", "deny", "neutral")):
+                warnings.append(f"Rule {number}: no valid permissions left, skipped.")
+                continue
+            
+            group_names = rule.get("groups") or [rule.get("group")]
+            for group_name in group_names:
+                if group_name not in groups:
+                    warnings.append(f"Rule {number}: group '{group_name}' is not defined, skipped.")
+                    continue
+                for channel in groups[group_name]:
+                    operations.append((channel, role, permissions))
+        
+        return operations, warnings
@@ -0,0 +1,65 @@
+import discord
+import asyncio
+import math
+import time
+from typing import Optional
+
+class ProgressReporter:
+    """Shows the progress of a bulk operation by editing one status message.
+    
+    Edits are throttled to one per interval and never overlap, so a long run
+    spends its REST budget on the permission edits instead of chat messages.
+    The message shows the percentage done, an ETA and the errors so far.
+    """
+    
+    def __init__(self, message, label: str, interval: float = 2.0):
+        self.message = message
+        self.label = label
+        self.interval = interval
+        self.total = 0
+        self.done = 0
+        self.errors = 0
+        self.started = self.last_edit = time.monotonic()
+        self._edit_task = None
+    
+    def start(self, total: int):
+        """Reset the counters for an operation over total channels."""
+        self.total = total
+        self.done = 0
+        self.errors = 0
+        self.started = self.last_edit = time.monotonic()
+    
+    def advance(self, error: Optional[Exception] = None):
+        """Count a finished channel and refresh the message if the interval has passed."""
+        self.done += 1
+        if error is not None:
+            self.errors += 1
+        
+        now = time.monotonic()
+        if now - self.last_edit < self.interval or self.done >= self.total:
+            return
+        if self._edit_task is not None and not self._edit_task.done():
+            return
+        
+        self.last_edit = now
+        self._edit_task = asyncio.ensure_future(self._edit(self.render(now)))
+    
+    def render(self, now: float) -> str:
+        """Return the status text for the current progress."""
+        percent = self.done * 100 // self.total if self.total else 100
+        eta = (now - self.started) / self.done * (self.total - self.done) if self.done else 0
+        text = f"⏳ {self.label}... {self.done}/{self.total} channels ({percent}%), about {math.ceil(eta)}s left"
+        if self.errors:
+            text += f", {self.errors} errors so far"
+        return text
+    
+    async def _edit(self, content: str):
+        try:
+            await self.message.edit(content=content)
+        except discord.HTTPException:
+            pass  # Progress is cosmetic; the final summary still gets sent
+    
+    async def close(self):
+        """Wait for an in-flight edit so it can't land after the final status message."""
+        if self._edit_task is not None:
+            await self._edit_task
@@ -0,0 +1,95 @@
+import discord
+import asyncio
+import math
+import time
+from typing import List, Optional, Tuple
+
+# discord.py releases whose private rate limit state edit_bucket_state() was written against
+BUCKET_INTERNALS_VERSIONS = {(2, 2), (2, 3)}
+
+def edit_bucket_state(bot, channel_id: int) -> Optional[Tuple[int, int, float]]:
+    """Return (remaining, outgoing, expires) of discord.py's bucket for editing a channel, or None if unknown.
+    
+    The buckets are private discord.py state, so they are only read on the
+    releases listed in BUCKET_INTERNALS_VERSIONS and anything unexpected is
+    treated as unknown; callers then fall back to the observed latency.
+    """
+    if discord.version_info[:2] not in BUCKET_INTERNALS_VERSIONS:
+        return None
+    
+    try:
+        http = bot.http
+        bucket_hash = http._bucket_hashes.get(PermissionScheduler.EDIT_ROUTE)
+        bucket = http._buckets.get(f"{bucket_hash or PermissionScheduler.EDIT_ROUTE}:{channel_id}")
+        if bucket is None or bucket.expires is None:
+            return None
+        return bucket.remaining, bucket.outgoing, bucket.expires
+    except (AttributeError, TypeError):
+        return None
+
+class PermissionScheduler:
+    """Runs channel edits at bounded concurrency while watching Discord's rate limit buckets.
+    
+    discord.py already enforces rate limits, so instead of sleeping a fixed
+    amount after every edit we only hold a request back when the channel's
+    edit bucket is close to empty, and let everything else run concurrently.
+    """
+    
+    EDIT_ROUTE = "PATCH /channels/{channel_id}"
+    
+    def __init__(self, bot, concurrency: int = 8, reserve: int = 1):
+        self.bot = bot
+        self.concurrency = concurrency
+        self.reserve = reserve  # Tokens to leave in a bucket before backing off
+        self.average_latency = 0.3  # Moving average of a single edit, in seconds
+        self._semaphore = asyncio.Semaphore(concurrency)
+    
+    def bucket_delay(self, channel_id: int) -> float:
+        """Seconds to wait before the channel's edit bucket has spare tokens again."""
+        state = edit_bucket_state(self.bot, channel_id)
+        if state is None:
+            return 0.0
+        
+        remaining, outgoing, expires = state
+        now = asyncio.get_running_loop().time()
+        if now >= expires or remaining - outgoing > self.reserve:
+            return 0.0
+        
+        return expires - now
+    
+    def estimate_seconds(self, channel_ids) -> float:
+        """Roughly estimate how long editing the given channels takes under the current rate limits."""
+        channel_ids = list(channel_ids)
+        if not channel_ids:
+            return 0.0
+        
+        waves = math.ceil(len(channel_ids) / self.concurrency)
+        global_floor = len(channel_ids) / 50  # Discord allows 50 requests per second globally
+        waiting = max(self.bucket_delay(channel_id) for channel_id in channel_ids)
+        return max(waves * self.average_latency, global_floor) + waiting
+    
+    async def run(self, channels, operation, on_result=None) -> List[Tuple[object, Optional[Exception], float]]:
+        """Run operation(channel) for every channel and return (channel, error, seconds) per channel.
+        
+        on_result(channel, error, seconds) is called as soon as each channel finishes.
+        """
+        
+        async def run_one(channel):
+            async with self._semaphore:
+                delay = self.bucket_delay(channel.id)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                
+                started = time.perf_counter()
+                try:
+                    await operation(channel)
+                    error = None
+                except Exception as e:
+                    error = e
+                elapsed = time.perf_counter() - started
+                self.average_latency = self.average_latency * 0.8 + elapsed * 0.2
+                if on_result is not None:
+                    on_result(channel, error, elapsed)
+                return channel, error, elapsed
+        
+        return await asyncio.gather(*(run_one(channel) for channel in channels))
@@ -0,0 +1,121 @@
+import discord
+import datetime
+import hashlib
+import json
+from typing import Dict, List, Optional
+from permissions.store import JsonStore
+
+class PermissionSnapshotStore:
+    """Versioned, content-addressed snapshots of a guild's permission state.
+    
+    Every channel's overwrite set is stored once under a hash of its contents,
+    so channels sharing the same overwrites, and channels that did not change
+    between two snapshots, cost only a hash reference per snapshot.
+    """
+    
+    def __init__(self, path: str = "permission_snapshots.json", max_snapshots: int = 50):
+        self.path = path
+        self.max_snapshots = max_snapshots
+        # Snapshots are taken rarely and are large, so they are written right away instead of journaled
+        self.store = JsonStore(path, delay=0, indent=None, journal=False)
+        self.data = self.store.load() or {"next_id": 1, "objects": {}, "snapshots": []}
+    
+    def save(self):
+        """Save the snapshot store to file."""
+        self.store.save(self.data)
+    
+    @staticmethod
+    def channel_state(overwrites: Dict) -> List[List[int]]:
+        """Reduce an overwrite map to a canonical, sorted [target_id, type, allow, deny] list."""
+        state = []
+        for target, overwrite in overwrites.items():
+            allow, deny = overwrite.pair()
+            if allow.value or deny.value:
+                is_role = isinstance(target, discord.Role) or getattr(target, "type", None) is discord.Role
+                state.append([target.id, 0 if is_role else 1, allow.value, deny.value])
+        return sorted(state)
+    
+    @staticmethod
+    def overwrite_entries(state: List[List[int]]) -> Dict[str, dict]:
+        """Convert a channel state into the entry format used by lockdown snapshots."""
+        return {
+            str(target_id): {"type": "role" if target_type == 0 else "member", "allow": allow, "deny": deny}
+            for target_id, target_type, allow, deny in state
+        }
+    
+    def _put(self, state: List[List[int]]) -> str:
+        """Store a channel state under its content hash and return the hash."""
+        encoded = json.dumps(state, separators=(",", ":"))
+        key = hashlib.sha1(encoded.encode("utf-8")).hexdigest()[:16]
+        self.data["objects"].setdefault(key, state)
+        return key
+    
+    def live_state(self, guild) -> Dict:
+        """Capture the guild's current channel overwrites and role permissions."""
+        return {
+            "channels": {str(channel.id): self.channel_state(channel.overwrites) for channel in guild.channels},
+            "roles": {str(role.id): role.permissions.value for role in guild.roles}
+        }
+    
+    def resolve(self, snapshot: Dict) -> Dict:
+        """Expand a stored snapshot into the same shape as live_state()."""
+        return {
+            "channels": {channel_id: self.data["objects"].get(key, []) for channel_id, key in snapshot["channels"].items()},
+            "roles": dict(snapshot["roles"])
+        }
+    
+    def take(self, guild, name: str) -> Dict:
+        """Record a new snapshot of the guild and return it."""
+        state = self.live_state(guild)
+        snapshot = {
+            "id": self.data["next_id"],
+            "name": name,
+            "guild_id": guild.id,
+            "taken_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "channels": {channel_id: self._put(channel_state) for channel_id, channel_state in state["channels"].items()},
+            "roles": state["roles"]
+        }
+        self.data["next_id"] += 1
+        self.data["snapshots"].append(snapshot)
+        self._prune(guild.id)
+        self.save()
+        return snapshot
+    
+    def _prune(self, guild_id: int):
+        """Drop the guild's oldest snapshots beyond max_snapshots and any objects no longer referenced."""
+        guild_snapshots = self.list(guild_id)
+        expired = {snapshot["id"] for snapshot in guild_snapshots[:-self.max_snapshots]}
+        if not expired:
+            return
+        
+        self.data["snapshots"] = [snapshot for snapshot in self.data["snapshots"] if snapshot["id"] not in expired]
+        referenced = {key for snapshot in self.data["snapshots"] for key in snapshot["channels"].values()}
+        self.data["objects"] = {key: state for key, state in self.data["objects"].items() if key in referenced}
+    
+    def list(self, guild_id: int) -> List[Dict]:
+        """Return the guild's snapshots, oldest first."""
+        return [snapshot for snapshot in self.data["snapshots"] if snapshot["guild_id"] == guild_id]
+    
+    def get(self, guild_id: int, reference: str) -> Optional[Dict]:
+        """Find a snapshot by ID, or the most recent one with the given name."""
+        snapshots = self.list(guild_id)
+        if reference.isdigit():
+            for snapshot in snapshots:
+                if snapshot["id"] == int(reference):
+                    return snapshot
+        
+        for snapshot in reversed(snapshots):
+            if snapshot["name"].lower() == reference.lower():
+                return snapshot
+        return None
+    
+    @staticmethod
+    def diff(before: Dict, after: Dict) -> Dict[str, List[str]]:
+        """Compare two resolved states and return the IDs that were added, removed or changed."""
+        result = {}
+        for kind in ("channels", "roles"):
+            old, new = before[kind], after[kind]
+            result[f"{kind}_added"] = [key for key in new if key not in old]
+            result[f"{kind}_removed"] = [key for key in old if key not in new]
+            result[f"{kind}_changed"] = [key for key in new if key in old and new[key] != old[key]]
+        return result
@@ -0,0 +1,176 @@
+import asyncio
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+class JsonStore:
+    """Debounced, atomic JSON file persistence with an optional change journal.
+    
+    save() coalesces every call made within `delay` seconds into a single
+    write. The write goes to a temporary file that is renamed over the original
+    in an executor, so the event loop never blocks on disk and a crash can never
+    leave a half-written file. With journaling enabled, each save also appends
+    the changed top-level keys to `<path>.journal` right away; load() replays
+    those entries, so nothing is lost if the bot dies before the next write.
+    """
+    
+    def __init__(self, path: str, delay: float = 2.0, indent: Optional[int] = 4, journal: bool = True):
+        self.path = path
+        self.delay = delay
+        self.indent = indent
+        self.journal_path = f"{path}.journal" if journal else None
+        self._data = None
+        self._encoded_keys = {}  # Top-level key -> JSON text as of the last journal entry
+        self._journal_bytes = 0
+        self._dirty = False
+        self._timer = None
+        self._flush_task = None
+    
+    def load(self) -> Optional[Dict]:
+        """Read the file and replay any journal entries written after it; None if there is nothing to load."""
+        data = None
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    data = json.load(f)
+            except Exception as e:
+                print(f"Error loading {self.path}: {e}")
+        
+        if self.journal_path and os.path.exists(self.journal_path):
+            valid_bytes = 0
+            with open(self.journal_path, 'r+b') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A torn final line from a crash mid-append; cut it off so later entries stay readable
+                        f.truncate(valid_bytes)
+                        break
+                    valid_bytes += len(line)
+                    data = data if data is not None else {}
+                    data.update(entry.get("set", {}))
+                    for key in entry.get("del", []):
+                        data.pop(key, None)
+            self._journal_bytes = valid_bytes
+        
+        if data is not None:
+            self._remember(data)
+        return data
+    
+    def _remember(self, data: Dict, keys: Optional[List[str]] = None) -> Tuple[Dict, List[str]]:
+        """Record the encoded top-level keys and return what changed since the last call.
+        
+        Only the given keys are encoded; without them every key is compared.
+        """
+        if keys is None:
+            keys = list(data)
+            removed = [key for key in self._encoded_keys if key not in data]
+        else:
+            removed = [key for key in keys if key not in data and key in self._encoded_keys]
+        encoded = {key: json.dumps(data[key], sort_keys=True) for key in keys if key in data}
+        changed = {key: data[key] for key, text in encoded.items() if self._encoded_keys.get(key) != text}
+        for key in removed:
+            del self._encoded_keys[key]
+        self._encoded_keys.update(encoded)
+        return changed, removed
+    
+    def save(self, data: Dict, keys: Optional[List[str]] = None):
+        """Journal the change now and schedule a coalesced write of the whole file.
+        
+        Pass the top-level keys that were changed so only those are encoded for the journal.
+        """
+        self._data = data
+        if self.journal_path:
+            changed, removed = self._remember(data, keys)
+            if not changed and not removed and not self._dirty:
+                return
+            
+            if changed or removed:
+                line = json.dumps({"set": changed, "del": removed}, separators=(",", ":")) + "\n"
+                encoded = line.encode("utf-8")
+                try:
+                    # Binary mode, so the byte count matches the offsets _trim_journal() and load() use
+                    with open(self.journal_path, 'ab') as f:
+                        f.write(encoded)
+                    self._journal_bytes += len(encoded)
+                except Exception as e:
+                    print(f"Error writing journal {self.journal_path}: {e}")
+        
+        self._dirty = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (e.g. during startup): write straight away
+            self.flush_now()
+            return
+        
+        if self._timer is None:
+            self._timer = loop.call_later(self.delay, self._start_flush)
+    
+    def _start_flush(self):
+        self._timer = None
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.ensure_future(self.flush())
+        else:
+            # A write is still running; try again once it is done
+            self._timer = asyncio.get_running_loop().call_later(self.delay, self._start_flush)
+    
+    def _write_atomic(self, payload: str):
+        """Write payload to a temporary file and rename it over the target."""
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+    
+    def _trim_journal(self, written_bytes: int):
+        """Drop the journal entries that are now part of the file."""
+        if not self.journal_path:
+            return
+        try:
+            with open(self.journal_path, 'r+b') as f:
+                f.seek(written_bytes)
+                remainder = f.read()
+                f.seek(0)
+                f.write(remainder)
+                f.truncate()
+            self._journal_bytes = len(remainder)
+        except FileNotFoundError:
+            self._journal_bytes = 0
+    
+    async def flush(self):
+        """Write pending changes now, off the event loop."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._flush_task is not None and not self._flush_task.done() and self._flush_task is not asyncio.current_task():
+            await self._flush_task
+        if not self._dirty:
+            return
+        
+        self._dirty = False
+        payload = json.dumps(self._data, indent=self.indent, separators=None if self.indent else (",", ":"))
+        journaled = self._journal_bytes
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self._write_atomic, payload)
+            self._trim_journal(journaled)
+        except Exception as e:
+            self._dirty = True
+            print(f"Error saving {self.path}: {e}")
+    
+    def flush_now(self):
+        """Write pending changes synchronously; used when no event loop is available."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._dirty:
+            return
+        
+        self._dirty = False
+        try:
+            self._write_atomic(json.dumps(self._data, indent=self.indent, separators=None if self.indent else (",", ":")))
+            self._trim_journal(self._journal_bytes)
+        except Exception as e:
+            self._dirty = True
+            print(f"Error saving {self.path}: {e}")
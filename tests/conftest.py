@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Make the bot's top-level modules (config, http_client, cogs) importable from the tests
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
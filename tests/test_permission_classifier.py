@@ -0,0 +1,52 @@
+import types
+
+from permissions.classifier import ChannelClassifier
+
+SCHEME = {"public": ["welcome", "Rules"], "verified_only": ["general", "chat"], "admin_only": ["admin"], "empty": []}
+
+def make_guild(*names):
+    guild = types.SimpleNamespace(id=1)
+    guild.channels = [types.SimpleNamespace(id=100 + number, name=name, guild=guild) for number, name in enumerate(names)]
+    return guild
+
+def test_channels_get_every_matching_label():
+    classifier = ChannelClassifier()
+    classifier.register("preset", SCHEME)
+    guild = make_guild("welcome-and-RULES", "admin-chat", "memes")
+    
+    assert classifier.classify(guild, "preset") == {
+        100: frozenset({"public"}),
+        101: frozenset({"verified_only", "admin_only"}),
+        102: frozenset()
+    }
+    admin_chat = guild.channels[1]
+    assert classifier.first(admin_chat, "preset", ["admin_only", "verified_only"]) == "admin_only"
+    assert classifier.first(guild.channels[2], "preset", ["public"], "default") == "default"
+
+def test_cache_follows_channel_events():
+    classifier = ChannelClassifier()
+    classifier.register("preset", SCHEME)
+    guild = make_guild("general")
+    classifier.classify(guild, "preset")
+    
+    guild.channels[0].name = "welcome"
+    assert classifier.labels(guild.channels[0], "preset") == {"verified_only"}
+    classifier.update_channel(guild.channels[0])
+    assert classifier.labels(guild.channels[0], "preset") == {"public"}
+    
+    new = types.SimpleNamespace(id=200, name="admin", guild=guild)
+    assert classifier.labels(new, "preset") == {"admin_only"}
+    classifier.remove_channel(new)
+    assert 200 not in classifier.classify(guild, "preset")
+
+def test_registering_new_keywords_drops_the_cache():
+    classifier = ChannelClassifier()
+    classifier.register("preset", SCHEME)
+    guild = make_guild("memes")
+    cached = classifier.classify(guild, "preset")
+    
+    classifier.register("preset", dict(SCHEME))
+    assert classifier.classify(guild, "preset") is cached
+    
+    classifier.register("preset", {**SCHEME, "media": ["memes"]})
+    assert classifier.classify(guild, "preset") == {100: frozenset({"media"})}
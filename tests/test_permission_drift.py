@@ -0,0 +1,55 @@
+import types
+
+import discord
+
+from permissions.drift import PermissionDriftDetector
+
+SEND = discord.Permissions.send_messages.flag
+VIEW = discord.Permissions.view_channel.flag
+
+class Target:
+    def __init__(self, target_id: int):
+        self.id = target_id
+
+def make_guild():
+    guild = types.SimpleNamespace(id=1)
+    guild.channels = [types.SimpleNamespace(id=100, guild=guild, overwrites={})]
+    return guild
+
+def test_only_masked_permissions_count_as_drift():
+    detector = PermissionDriftDetector()
+    guild = make_guild()
+    channel = guild.channels[0]
+    # Role 50 should be denied sending; nothing is said about its other permissions
+    detector.set_expected(guild, {100: {50: (0, SEND, SEND)}})
+    
+    assert detector.for_guild(guild)[100]["source"] == "settings"
+    
+    channel.overwrites = {Target(50): discord.PermissionOverwrite(send_messages=False, view_channel=True)}
+    assert detector.check_channel(channel) is None
+    assert detector.for_guild(guild) == {}
+    
+    channel.overwrites = {Target(50): discord.PermissionOverwrite(send_messages=True)}
+    entry = detector.check_channel(channel)
+    assert entry["source"] == "manual"
+    assert entry["targets"] == {50: (SEND, 0, 0, SEND, SEND)}
+
+def test_drift_keeps_its_first_timestamp():
+    detector = PermissionDriftDetector()
+    guild = make_guild()
+    detector.set_expected(guild, {100: {50: (VIEW, 0, VIEW)}})
+    since = detector.for_guild(guild)[100]["since"]
+    
+    assert detector.check_channel(guild.channels[0], "bot")["since"] == since
+    
+    detector.remove_channel(guild.channels[0])
+    assert detector.for_guild(guild) == {}
+
+def test_invalidate_forgets_the_expected_state():
+    detector = PermissionDriftDetector()
+    guild = make_guild()
+    detector.set_expected(guild, {})
+    
+    assert detector.has_guild(guild)
+    detector.invalidate()
+    assert not detector.has_guild(guild)
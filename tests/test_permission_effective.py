@@ -0,0 +1,74 @@
+import types
+
+import discord
+
+from permissions.effective import EffectivePermissionResolver
+from permissions.index import PermissionIndex
+
+VIEW = discord.Permissions(view_channel=True)
+SEND = discord.Permissions(send_messages=True)
+
+class FakeRole:
+    def __init__(self, role_id: int, permissions: discord.Permissions):
+        self.id = role_id
+        self.permissions = permissions
+
+class FakeGuild:
+    def __init__(self):
+        self.id = 1
+        self.owner_id = 999
+        self.default_role = FakeRole(1, discord.Permissions(view_channel=True, send_messages=True))
+        self.roles = {role.id: role for role in (
+            self.default_role,
+            FakeRole(50, discord.Permissions.none()),  # Verified
+            FakeRole(60, discord.Permissions.none()),  # Muted
+            FakeRole(70, discord.Permissions(administrator=True))
+        )}
+        self.channels = [types.SimpleNamespace(id=100, overwrites={})]
+    
+    def get_role(self, role_id):
+        return self.roles.get(role_id)
+
+def member(guild, member_id: int, *role_ids: int):
+    return types.SimpleNamespace(id=member_id, guild=guild, roles=[guild.roles[role_id] for role_id in (1, *role_ids)])
+
+def setup():
+    guild = FakeGuild()
+    channel = guild.channels[0]
+    channel.overwrites = {
+        guild.default_role: discord.PermissionOverwrite(view_channel=False),
+        guild.roles[50]: discord.PermissionOverwrite(view_channel=True, send_messages=True),
+        guild.roles[60]: discord.PermissionOverwrite(send_messages=False),
+        FakeRole(9, discord.Permissions.none()): discord.PermissionOverwrite(send_messages=False)  # Member 9
+    }
+    return guild, channel, EffectivePermissionResolver(PermissionIndex())
+
+def test_overwrites_apply_in_discord_order():
+    guild, channel, resolver = setup()
+    
+    # @everyone can't see the channel, so nothing else applies
+    assert resolver.for_member(member(guild, 2), channel).value == 0
+    assert resolver.for_member(member(guild, 3, 50), channel) == VIEW | SEND
+    # Role overwrites are combined and allows win over denies
+    assert resolver.for_member(member(guild, 4, 50, 60), channel) == VIEW | SEND
+    # The member overwrite comes last
+    assert resolver.for_member(member(guild, 9, 50), channel) == VIEW
+
+def test_administrators_and_the_owner_bypass_overwrites():
+    guild, channel, resolver = setup()
+    
+    assert resolver.for_member(member(guild, 5, 70), channel) == discord.Permissions.all()
+    assert resolver.for_member(member(guild, guild.owner_id), channel) == discord.Permissions.all()
+
+def test_cached_results_follow_index_and_role_changes():
+    guild, channel, resolver = setup()
+    verified = member(guild, 3, 50)
+    assert resolver.for_member(verified, channel) == VIEW | SEND
+    
+    resolver.index.update_channel(100, {guild.roles[50]: discord.PermissionOverwrite(send_messages=False)})
+    assert resolver.for_member(verified, channel) == VIEW
+    
+    guild.default_role.permissions = discord.Permissions.none()
+    assert resolver.for_member(verified, channel) == VIEW
+    resolver.invalidate_roles()
+    assert resolver.for_member(verified, channel).value == 0
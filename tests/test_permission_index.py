@@ -0,0 +1,48 @@
+import discord
+
+from permissions.index import PermissionIndex
+
+SEND = discord.Permissions.send_messages.flag
+VIEW = discord.Permissions.view_channel.flag
+
+class Target:
+    def __init__(self, target_id: int):
+        self.id = target_id
+
+def test_update_channel_fills_the_reverse_maps():
+    index = PermissionIndex()
+    index.update_channel(100, {
+        Target(50): discord.PermissionOverwrite(send_messages=True),
+        Target(60): discord.PermissionOverwrite(send_messages=False, view_channel=False),
+        Target(70): discord.PermissionOverwrite()
+    })
+    
+    assert index.targets_for(100, SEND) == ([50], [60])
+    assert index.channels_for(60, VIEW) == (set(), {100})
+    assert index.channels_with_target(70) == set()
+    
+    # Re-indexing replaces the old entries
+    index.update_channel(100, {Target(60): discord.PermissionOverwrite(send_messages=True)})
+    assert index.targets_for(100, SEND) == ([60], [])
+    assert index.channels_for(60, VIEW) == (set(), set())
+    assert index.targets_with(SEND) == [60]
+
+def test_removed_target_disappears_everywhere():
+    index = PermissionIndex()
+    for channel_id in (100, 101):
+        index.update_channel(channel_id, {Target(50): discord.PermissionOverwrite(send_messages=True)})
+    
+    before = index.overwrites_for(100)
+    index.remove_target(50)
+    
+    assert index.overwrites_for(100) == {} and index.overwrites_for(100) is not before
+    assert index.channels_for(50, SEND) == (set(), set())
+    assert index.targets_with(SEND) == []
+
+def test_groups_for_channel():
+    index = PermissionIndex()
+    index.set_groups({"public": [100, 101], "verified_only": [101]})
+    
+    assert index.groups_for(101) == ["public", "verified_only"]
+    index.remove_channel(101)
+    assert index.groups_for(101) == []
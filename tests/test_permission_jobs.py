@@ -0,0 +1,113 @@
+import asyncio
+
+import discord
+import pytest
+
+import config
+from cogs.advanced_permissions import AdvancedPermissions
+
+class FakeRole:
+    type = discord.Role
+    
+    def __init__(self, role_id: int, name: str):
+        self.id = role_id
+        self.name = name
+        self.permissions = discord.Permissions.none()
+
+class FakeChannel:
+    def __init__(self, guild, channel_id: int, name: str):
+        self.guild = guild
+        self.id = channel_id
+        self.name = name
+        self.category = None
+        self.overwrites = {}
+
+class FakeGuild:
+    def __init__(self):
+        self.id = 1
+        self.default_role = FakeRole(1, "@everyone")
+        self.verified = FakeRole(50, "Verified")
+        self.roles = [self.default_role, self.verified]
+        self.channels = [FakeChannel(self, 100 + number, name) for number, name in enumerate(["general", "memes"])]
+        self.text_channels = self.channels
+    
+    def get_role(self, role_id):
+        return next((role for role in self.roles if role.id == role_id), None)
+    
+    def get_channel(self, channel_id):
+        return next((channel for channel in self.channels if channel.id == channel_id), None)
+
+class FakeMessage:
+    async def edit(self, **kwargs):
+        pass
+
+class FakeCtx:
+    def __init__(self, guild):
+        self.guild = guild
+        self.channel = guild.channels[0]
+    
+    async def send(self, *args, **kwargs):
+        return FakeMessage()
+
+class FakeBot:
+    def get_cog(self, name):
+        return None
+
+@pytest.fixture
+def cog(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config, "VERIFIED_ROLE_ID", 50)
+    return AdvancedPermissions(FakeBot())
+
+def test_lockdown_snapshot_is_taken_right_before_the_first_edit(cog, monkeypatch):
+    guild = FakeGuild()
+    ctx = FakeCtx(guild)
+    seen = {}
+    
+    async def send_plan(ctx, overwrite_maps, title, scheduler=None):
+        pass
+    
+    async def apply(overwrite_maps, reason=None, scheduler=None, on_result=None, progress=None):
+        job = cog.jobs_data["jobs"][-1]
+        seen["snapshot"] = cog.snapshots.get(guild.id, str(job["snapshot_id"]))
+        seen["original"] = dict(cog.permissions_data["original_permissions"])
+        seen["scheduler"] = scheduler
+        return list(overwrite_maps), [], []
+    
+    monkeypatch.setattr(cog, "_send_plan", send_plan)
+    monkeypatch.setattr(cog, "_apply_overwrite_maps", apply)
+    
+    asyncio.run(cog.server_lockdown.callback(cog, ctx, "--plan"))
+    assert cog.snapshots.list(guild.id) == []
+    assert not cog.permissions_data.get("original_permissions")
+    
+    # Changed after the lockdown was planned: the snapshot must still hold it
+    guild.channels[1].overwrites = {guild.default_role: discord.PermissionOverwrite(view_channel=False)}
+    asyncio.run(cog.server_lockdown.callback(cog, ctx))
+    
+    assert seen["snapshot"]["name"] == "pre-lockdown all"
+    assert cog.snapshots.resolve(seen["snapshot"])["channels"]["101"] == [[1, 0, 0, discord.Permissions(view_channel=True).value]]
+    assert seen["original"]["101"] == {"1": {"type": "role", "allow": 0, "deny": discord.Permissions(view_channel=True).value}}
+    assert seen["scheduler"] is cog.lockdown_scheduler
+    assert sorted(cog.permissions_data["locked_channels"]) == [100, 101]
+
+def test_resumed_job_keeps_its_snapshot(cog, monkeypatch):
+    guild = FakeGuild()
+    
+    async def apply(overwrite_maps, reason=None, scheduler=None, on_result=None, progress=None):
+        return list(overwrite_maps), [], []
+    
+    monkeypatch.setattr(cog, "_apply_overwrite_maps", apply)
+    overwrite_maps = {guild.channels[0]: {guild.verified: discord.PermissionOverwrite(send_messages=False)}}
+    
+    started = {"id": 7, "guild_id": 1, "name": "preset", "reason": None, "status": "running", "channels": {},
+               "completed": [], "errors": [], "snapshot_name": "before preset", "snapshot_id": 3}
+    asyncio.run(cog._execute_job(guild, started, dict(overwrite_maps)))
+    assert cog.snapshots.list(guild.id) == []
+    assert started["snapshot_id"] == 3
+    
+    # Stopped before the first edit: the snapshot is taken when the job is resumed
+    not_started = dict(started, snapshot_id=None, status="running")
+    asyncio.run(cog._execute_job(guild, not_started, dict(overwrite_maps)))
+    assert [snapshot["name"] for snapshot in cog.snapshots.list(guild.id)] == ["before preset"]
+    assert not_started["snapshot_id"] == cog.snapshots.list(guild.id)[0]["id"]
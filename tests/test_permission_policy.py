@@ -0,0 +1,154 @@
+import json
+import os
+import types
+
+import pytest
+
+import config
+from permissions import policy as policy_module
+from permissions.policy import PermissionPolicy
+
+XGC_POLICY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "policies", "xgc.json")
+
+class FakeGuild:
+    def __init__(self):
+        self.id = 1
+        self.default_role = types.SimpleNamespace(id=1, name="@everyone")
+        self.roles = [self.default_role, types.SimpleNamespace(id=50, name="Verified"), types.SimpleNamespace(id=60, name="Moderator")]
+        self.channels = []
+    
+    def add_channel(self, channel_id: int, name: str, category=None):
+        channel = types.SimpleNamespace(id=channel_id, name=name, category=category, guild=self)
+        self.channels.append(channel)
+        return channel
+    
+    def get_role(self, role_id):
+        return next((role for role in self.roles if role.id == role_id), None)
+
+@pytest.fixture
+def guild(monkeypatch):
+    monkeypatch.setattr(config, "VERIFIED_ROLE_ID", 50)
+    guild = FakeGuild()
+    staff = types.SimpleNamespace(id=10, name="Staff Area")
+    guild.add_channel(100, "welcome")
+    guild.add_channel(101, "general-chat")
+    guild.add_channel(102, "alpha-chat")
+    guild.add_channel(103, "reports", category=staff)
+    guild.add_channel(104, "memes")
+    return guild
+
+def channel_names(operations, role_name: str):
+    return sorted(channel.name for channel, role, _ in operations if role.name == role_name)
+
+def test_groups_select_channels_in_every_supported_way(guild):
+    policy = PermissionPolicy({
+        "groups": {
+            "chat": {"match": ["chat"], "exclude_match": ["alpha"]},
+            "named": {"channels": ["WELCOME", "104"], "exclude": ["memes"]},
+            "staff": {"categories": ["staff area"]},
+            "stored": {"group": "media"}
+        },
+        "rules": []
+    })
+    groups = policy.resolve_groups(guild, {"media": [104]})
+    
+    assert {name: [channel.name for channel in channels] for name, channels in groups.items()} == {
+        "chat": ["general-chat"],
+        "named": ["welcome"],
+        "staff": ["reports"],
+        "stored": ["memes"]
+    }
+
+def test_first_match_puts_a_channel_in_one_group(guild):
+    data = {"groups": {"alpha": {"match": ["alpha"]}, "chat": {"match": ["chat"]}}, "rules": []}
+    
+    assert [channel.name for channel in PermissionPolicy(data).resolve_groups(guild, {})["chat"]] == ["general-chat", "alpha-chat"]
+    data["first_match"] = True
+    assert [channel.name for channel in PermissionPolicy(data).resolve_groups(guild, {})["chat"]] == ["general-chat"]
+
+def test_compile_resolves_roles_and_permissions(guild):
+    policy = PermissionPolicy({
+        "groups": {"chat": {"match": ["chat"]}},
+        "rules": [
+            {"group": "chat", "role": "@everyone", "deny": ["view_channel"], "neutral": ["send_messages"]},
+            {"group": "chat", "role": "$verified", "allow": ["view_channel"]},
+            {"group": "chat", "role": "60", "allow": ["manage_messages"]}
+        ]
+    })
+    operations, warnings = policy.compile(guild, {})
+    
+    assert warnings == []
+    assert channel_names(operations, "@everyone") == ["alpha-chat", "general-chat"]
+    assert operations[0][2] == {"view_channel": False, "send_messages": None}
+    assert [(role.name, permissions) for channel, role, permissions in operations if channel.id == 101] == [
+        ("@everyone", {"view_channel": False, "send_messages": None}),
+        ("Verified", {"view_channel": True}),
+        ("Moderator", {"manage_messages": True})
+    ]
+
+def test_compile_warns_and_skips_bad_rules(guild):
+    policy = PermissionPolicy({
+        "groups": {"chat": {"match": ["chat"]}},
+        "rules": [
+            {"group": "chat", "role": "Nobody", "allow": ["view_channel"]},
+            {"group": "chat", "role": "Verified", "allow": ["fly"]},
+            {"groups": ["chat", "missing"], "role": "Verified", "allow": ["view_channel", "teleport"]}
+        ]
+    })
+    operations, warnings = policy.compile(guild, {})
+    
+    assert warnings == [
+        "Rule 1: role 'Nobody' not found, skipped.",
+        "Rule 2: unknown permission 'fly', skipped.",
+        "Rule 2: no valid permissions left, skipped.",
+        "Rule 3: unknown permission 'teleport', skipped.",
+        "Rule 3: group 'missing' is not defined, skipped."
+    ]
+    assert [(channel.name, permissions) for channel, _, permissions in operations] == [
+        ("general-chat", {"view_channel": True}),
+        ("alpha-chat", {"view_channel": True})
+    ]
+
+def test_shipped_policy_compiles(guild):
+    with open(XGC_POLICY) as f:
+        policy = PermissionPolicy.parse(f.read(), XGC_POLICY)
+    operations, _ = policy.compile(guild, {})
+    
+    assert policy.name == "xgc"
+    assert sorted(set(channel_names(operations, "Verified"))) == ["alpha-chat", "general-chat", "welcome"]
+    # Each channel is in one group only: "chat" puts alpha-chat in "general" before "alpha" is checked
+    assert [permissions for channel, role, permissions in operations if channel.name == "alpha-chat" and role.name == "Verified"] == [
+        {"view_channel": True, "read_messages": True, "send_messages": True, "add_reactions": True}
+    ]
+
+def test_parse_rejects_invalid_policies():
+    with pytest.raises(ValueError):
+        PermissionPolicy.parse("[]", "list.json")
+    with pytest.raises(ValueError):
+        PermissionPolicy.parse("{", "broken.json")
+
+@pytest.mark.parametrize("policy, key", [
+    ({"rules": "abc"}, '"rules"'),
+    ({"rules": [], "groups": []}, '"groups"'),
+    ({"rules": [], "groups": {"chat": ["chat"]}}, "groups.chat "),
+    ({"rules": [], "groups": {"chat": {"match": "chat"}}}, "groups.chat.match"),
+    ({"rules": [], "groups": {"chat": {"exclude": [{"name": "x"}]}}}, "groups.chat.exclude"),
+    ({"rules": ["chat"]}, r"rules\[1\] "),
+    ({"rules": [{"group": "chat", "role": "Verified", "allow": "view_channel"}]}, r"rules\[1\]\.allow"),
+    ({"rules": [{}, {"groups": "chat", "role": "Verified"}]}, r"rules\[2\]\.groups"),
+    ({"rules": [{"group": ["chat"], "role": "Verified"}]}, r"rules\[1\]\.group "),
+    ({"rules": [{"group": "chat", "role": ["Verified"]}]}, r"rules\[1\]\.role")
+])
+def test_parse_rejects_malformed_policies(policy, key):
+    with pytest.raises(ValueError, match=key):
+        PermissionPolicy.parse(json.dumps(policy), "malformed.json")
+
+def test_yaml_policies(monkeypatch):
+    pytest.importorskip("yaml")
+    assert PermissionPolicy.parse("rules: []\n", "policies/raid.yaml").name == "raid"
+    with pytest.raises(ValueError):
+        PermissionPolicy.parse("rules: [\n", "broken.yml")
+    
+    monkeypatch.setattr(policy_module, "yaml", None)
+    with pytest.raises(ValueError, match="PyYAML"):
+        PermissionPolicy.parse("rules: []\n", "raid.yaml")
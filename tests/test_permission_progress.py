@@ -0,0 +1,35 @@
+import asyncio
+
+from permissions.progress import ProgressReporter
+
+class FakeMessage:
+    def __init__(self):
+        self.edits = []
+    
+    async def edit(self, content):
+        self.edits.append(content)
+
+def test_render_shows_percentage_eta_and_errors():
+    reporter = ProgressReporter(FakeMessage(), "Applying preset")
+    reporter.start(4)
+    reporter.advance()
+    reporter.advance(RuntimeError("boom"))
+    
+    text = reporter.render(reporter.started + 10)
+    assert text == "⏳ Applying preset... 2/4 channels (50%), about 10s left, 1 errors so far"
+
+def test_edits_are_throttled():
+    message = FakeMessage()
+    
+    async def scenario():
+        reporter = ProgressReporter(message, "Applying preset", interval=3600)
+        reporter.start(100)
+        for _ in range(50):
+            reporter.advance()
+        reporter.last_edit -= 3600
+        reporter.advance()
+        await reporter.close()
+    
+    asyncio.run(scenario())
+    assert len(message.edits) == 1
+    assert message.edits[0].startswith("⏳ Applying preset... 51/100 channels (51%)")
@@ -0,0 +1,52 @@
+import asyncio
+import types
+
+import discord
+import pytest
+
+from permissions import scheduler
+from permissions.scheduler import PermissionScheduler, edit_bucket_state
+
+def make_bot(**bucket):
+    """A bot whose HTTP client holds one edit bucket for channel 100"""
+    buckets = {f"{PermissionScheduler.EDIT_ROUTE}:100": types.SimpleNamespace(**bucket)} if bucket else {}
+    return types.SimpleNamespace(http=types.SimpleNamespace(_buckets=buckets, _bucket_hashes={}))
+
+@pytest.fixture(autouse=True)
+def supported_version(monkeypatch):
+    monkeypatch.setattr(scheduler, "BUCKET_INTERNALS_VERSIONS", {discord.version_info[:2]})
+
+def test_bucket_delay_waits_for_an_empty_bucket():
+    async def scenario():
+        expires = asyncio.get_running_loop().time() + 5
+        full = PermissionScheduler(make_bot(remaining=5, outgoing=0, expires=expires))
+        empty = PermissionScheduler(make_bot(remaining=1, outgoing=0, expires=expires))
+        return full.bucket_delay(100), empty.bucket_delay(100)
+    
+    full, empty = asyncio.run(scenario())
+    assert full == 0.0
+    assert 4 < empty <= 5
+
+def test_unknown_bucket_state_means_no_delay(monkeypatch):
+    assert edit_bucket_state(make_bot(), 100) is None
+    assert edit_bucket_state(types.SimpleNamespace(http=None), 100) is None
+    
+    monkeypatch.setattr(scheduler, "BUCKET_INTERNALS_VERSIONS", set())
+    assert edit_bucket_state(make_bot(remaining=0, outgoing=0, expires=1.0), 100) is None
+
+def test_run_reports_every_channel():
+    channels = [types.SimpleNamespace(id=channel_id) for channel_id in (1, 2, 3)]
+    reported = []
+    
+    async def operation(channel):
+        if channel.id == 2:
+            raise discord.DiscordException("boom")
+    
+    async def scenario():
+        return await PermissionScheduler(make_bot(), concurrency=2).run(
+            channels, operation, lambda channel, error, seconds: reported.append(channel.id)
+        )
+    
+    results = asyncio.run(scenario())
+    assert sorted(reported) == [1, 2, 3]
+    assert [error is None for _, error, _ in results] == [True, False, True]
@@ -0,0 +1,52 @@
+import types
+
+import discord
+
+from permissions.snapshots import PermissionSnapshotStore
+
+class FakeRole:
+    type = discord.Role
+    
+    def __init__(self, role_id: int):
+        self.id = role_id
+
+VERIFIED = FakeRole(50)
+
+def make_guild(*overwrites):
+    """A guild with one channel per overwrite map, IDs starting at 100"""
+    guild = types.SimpleNamespace(id=1, roles=[types.SimpleNamespace(id=50, permissions=discord.Permissions(send_messages=True))])
+    guild.channels = [types.SimpleNamespace(id=100 + number, overwrites=overwrite) for number, overwrite in enumerate(overwrites)]
+    return guild
+
+def test_identical_overwrites_are_stored_once(tmp_path):
+    store = PermissionSnapshotStore(str(tmp_path / "snapshots.json"))
+    locked = {VERIFIED: discord.PermissionOverwrite(send_messages=False)}
+    guild = make_guild(locked, dict(locked), {})
+    
+    snapshot = store.take(guild, "before")
+    assert snapshot["channels"]["100"] == snapshot["channels"]["101"]
+    assert len(store.data["objects"]) == 2
+    assert store.resolve(snapshot) == store.live_state(guild)
+    assert store.live_state(guild)["channels"]["100"] == [[50, 0, 0, discord.Permissions(send_messages=True).value]]
+
+def test_get_by_id_or_latest_name(tmp_path):
+    store = PermissionSnapshotStore(str(tmp_path / "snapshots.json"))
+    guild = make_guild({})
+    first = store.take(guild, "Daily")
+    second = store.take(guild, "daily")
+    
+    assert store.get(1, str(first["id"])) is first
+    assert store.get(1, "DAILY") is second
+    assert store.get(2, "daily") is None
+
+def test_diff_and_pruning(tmp_path):
+    store = PermissionSnapshotStore(str(tmp_path / "snapshots.json"), max_snapshots=1)
+    guild = make_guild({})
+    before = store.resolve(store.take(guild, "before"))
+    guild.channels[0].overwrites = {VERIFIED: discord.PermissionOverwrite(view_channel=False)}
+    after = store.resolve(store.take(guild, "after"))
+    
+    assert store.diff(before, after)["channels_changed"] == ["100"]
+    assert [snapshot["name"] for snapshot in store.list(1)] == ["after"]
+    assert len(store.data["objects"]) == 1
+    assert PermissionSnapshotStore(str(tmp_path / "snapshots.json")).data == store.data
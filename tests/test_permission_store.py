@@ -0,0 +1,36 @@
+import asyncio
+import json
+
+from permissions.store import JsonStore
+
+def test_journal_is_replayed_before_the_file_is_written(tmp_path):
+    path = str(tmp_path / "data.json")
+    
+    async def scenario():
+        store = JsonStore(path, delay=60)
+        store.save({"groups": {"a": [1]}, "public": []})
+        store.save({"groups": {"a": [1], "b": [2]}, "public": []}, ["groups"])
+        # The bot dies before the debounced write: only the journal exists
+        return JsonStore(path).load()
+    
+    assert asyncio.run(scenario()) == {"groups": {"a": [1], "b": [2]}, "public": []}
+
+def test_flush_writes_the_file_and_trims_the_journal(tmp_path):
+    path = str(tmp_path / "data.json")
+    
+    async def scenario():
+        store = JsonStore(path, delay=60)
+        store.save({"groups": {}})
+        await store.flush()
+    
+    asyncio.run(scenario())
+    with open(path) as f:
+        assert json.load(f) == {"groups": {}}
+    assert (tmp_path / "data.json.journal").read_bytes() == b""
+
+def test_torn_journal_line_is_dropped(tmp_path):
+    path = str(tmp_path / "data.json")
+    (tmp_path / "data.json.journal").write_bytes(b'{"set":{"a":1},"del":[]}\n{"set":{"b"')
+    
+    assert JsonStore(path).load() == {"a": 1}
+    assert (tmp_path / "data.json.journal").read_bytes() == b'{"set":{"a":1},"del":[]}\n'
@@ -0,0 +1,89 @@
+import asyncio
+
+import discord
+import pytest
+
+from cogs.advanced_permissions import AdvancedPermissions
+
+class FakeRole:
+    type = discord.Role
+    
+    def __init__(self, role_id: int, name: str):
+        self.id = role_id
+        self.name = name
+
+class FakeChannel:
+    def __init__(self, guild, channel_id: int, name: str, category=None):
+        self.guild = guild
+        self.id = channel_id
+        self.name = name
+        self.category = category
+        self.overwrites = {}
+
+class FakeCategory(discord.CategoryChannel):
+    # Plain attributes in place of the properties that read the guild's channel cache
+    category = None
+    overwrites = None
+    channels = None
+    
+    def __init__(self, guild, channel_id: int, name: str):
+        self.guild = guild
+        self.id = channel_id
+        self.name = name
+        self.overwrites = {}
+        self.channels = []
+
+class FakeGuild:
+    def __init__(self):
+        self.id = 1
+        self.default_role = FakeRole(1, "@everyone")
+        self.roles = [self.default_role, FakeRole(60, "Moderator")]
+        # A text channel listed before the category and named just like it
+        self.channels = [FakeChannel(self, 100, "staff")]
+        self.categories = [FakeCategory(self, 10, "Staff")]
+        self.categories[0].channels = [FakeChannel(self, 101, "reports", self.categories[0])]
+        self.channels += self.categories + self.categories[0].channels
+    
+    def get_role(self, role_id):
+        return next((role for role in self.roles if role.id == role_id), None)
+    
+    def get_channel(self, channel_id):
+        return next((channel for channel in self.channels if channel.id == channel_id), None)
+
+class FakeBot:
+    def get_cog(self, name):
+        return None
+
+class FakeCtx:
+    def __init__(self, guild):
+        self.guild = guild
+        self.sent = []
+    
+    async def send(self, content=None, **kwargs):
+        self.sent.append(content)
+
+@pytest.fixture
+def cog(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return AdvancedPermissions(FakeBot())
+
+@pytest.mark.parametrize("reference", ["staff", "Staff", "10", "<#10>"])
+def test_categories_ignore_channels_named_like_a_category(cog, monkeypatch, reference):
+    guild = FakeGuild()
+    ctx = FakeCtx(guild)
+    planned = {}
+    
+    async def capture_plan(ctx, overwrite_maps, title, scheduler=None):
+        planned.update(overwrite_maps)
+    
+    monkeypatch.setattr(cog, "_send_plan", capture_plan)
+    asyncio.run(cog.restrict_send.callback(cog, ctx, "--categories", reference, "--roles", "Moderator", "--plan"))
+    
+    assert sorted(channel.name for channel in planned) == ["Staff", "reports"]
+    assert ctx.sent == []
+
+def test_a_text_channel_id_is_not_a_category(cog, monkeypatch):
+    ctx = FakeCtx(FakeGuild())
+    asyncio.run(cog.restrict_send.callback(cog, ctx, "--categories", "100", "--roles", "Moderator", "--plan"))
+    
+    assert ctx.sent == ["⚠️ Could not find category: 100", "❌ No valid channels specified."]
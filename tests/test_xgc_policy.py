@@ -0,0 +1,98 @@
+import asyncio
+import os
+
+import discord
+import pytest
+
+import config
+from cogs.advanced_permissions import AdvancedPermissions
+from permissions.policy import PermissionPolicy
+
+XGC_POLICY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "policies", "xgc.json")
+
+# Names chosen to hit every group, the overlaps between them and channels that match nothing
+CHANNEL_NAMES = [
+    "verification", "welcome", "rules", "total-members", "xrp-price", "welcome-chat", "verification-rules",
+    "announcements", "general", "chat", "voice-chat", "raids", "giveaways", "game-night", "game-log",
+    "project-hub", "alpha-chat", "alpha", "alpha-log", "mod-chat", "admin", "staff-room", "mod-log",
+    "bot-log", "testing", "memes"
+]
+
+class FakeRole:
+    def __init__(self, role_id: int, name: str):
+        self.id = role_id
+        self.name = name
+
+class FakeChannel:
+    def __init__(self, guild, channel_id: int, name: str):
+        self.guild = guild
+        self.id = channel_id
+        self.name = name
+        self.category = None
+        self.overwrites = {}
+
+class FakeGuild:
+    def __init__(self):
+        self.id = 1
+        self.default_role = FakeRole(1, "@everyone")
+        self.roles = [self.default_role] + [
+            FakeRole(role_id, name) for role_id, name in
+            ((50, "Verified"), (51, "NFT Holder"), (52, "XGC"), (53, "Moderator"), (54, "Admin"), (55, "Muted"))
+        ]
+        self.channels = [FakeChannel(self, 100 + number, name) for number, name in enumerate(CHANNEL_NAMES)]
+        # Overwrites for roles neither side mentions are left alone by both
+        self.channels[8].overwrites = {self.roles[-1]: discord.PermissionOverwrite(send_messages=False)}
+    
+    def get_role(self, role_id):
+        return next((role for role in self.roles if role.id == role_id), None)
+    
+    def get_channel(self, channel_id):
+        return next((channel for channel in self.channels if channel.id == channel_id), None)
+    
+    def get_member(self, member_id):
+        return None
+
+class FakeBot:
+    def get_cog(self, name):
+        return None
+
+class FakeCtx:
+    def __init__(self, guild):
+        self.guild = guild
+    
+    async def send(self, *args, **kwargs):
+        pass
+
+def normalize(overwrite_maps):
+    """Reduce staged overwrite maps to {channel name: {role name: (allow, deny)}}"""
+    result = {}
+    for channel, overwrites in overwrite_maps.items():
+        for target, overwrite in overwrites.items():
+            allow, deny = overwrite.pair()
+            if allow.value or deny.value:
+                result.setdefault(channel.name, {})[target.name] = (allow.value, deny.value)
+    return result
+
+@pytest.fixture
+def cog(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config, "VERIFIED_ROLE_ID", 50)
+    return AdvancedPermissions(FakeBot())
+
+def test_xgc_policy_matches_setup_xgc_permissions(cog, monkeypatch):
+    guild = FakeGuild()
+    planned = {}
+    
+    async def capture_plan(ctx, overwrite_maps, title, scheduler=None):
+        planned.update(overwrite_maps)
+    
+    monkeypatch.setattr(cog, "_send_plan", capture_plan)
+    asyncio.run(cog.setup_xgc_permissions.callback(cog, FakeCtx(guild), "--plan"))
+    
+    with open(XGC_POLICY) as f:
+        policy = PermissionPolicy.parse(f.read(), XGC_POLICY)
+    compiled, warnings = cog._compile_policy(guild, policy)
+    
+    assert warnings == []
+    assert normalize(planned)
+    assert normalize(compiled) == normalize(planned)
@@ -0,0 +1,148 @@
+import asyncio
+import os
+
+import pytest
+
+from cogs.youtube_notifications import ATOM, AtomFeedParser, YouTubeNotifications, parse_atom_feed
+
+FEED_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "feed.xml")
+
+with open(FEED_PATH, 'rb') as f:
+    FEED = f.read()
+
+def chunks(data: bytes, size: int):
+    """Split data into chunks of size bytes, like a streamed response body"""
+    return [data[start:start + size] for start in range(0, len(data), size)]
+
+@pytest.mark.parametrize("size", [1, 7, 64, len(FEED)])
+def test_parse_in_chunks(size):
+    entries = parse_atom_feed(chunks(FEED, size))
+    
+    assert [entry["id"]["videoId"] for entry in entries] == ["AAA", "BBB"]
+    assert entries == parse_atom_feed([FEED])
+
+def test_namespaced_fields():
+    entry = parse_atom_feed([FEED])[0]
+    snippet = entry["snippet"]
+    
+    # Atom, yt: and media: elements all resolve through their namespaces
+    assert snippet["title"] == "Older & wiser"
+    assert snippet["publishedAt"] == "2024-01-01T10:00:00+00:00"
+    assert snippet["channelId"] == "UCabc"
+    assert snippet["channelTitle"] == "XGC - XRP GOD CANDLE"
+    assert snippet["description"] == "Descr ✓"
+    assert snippet["thumbnails"] == {"high": {"url": "https://i1.ytimg.com/vi/AAA/hqdefault.jpg"}}
+
+def test_entries_are_cleared_after_parsing():
+    parser = AtomFeedParser()
+    seen = []
+    read_events = parser.parser.read_events
+    
+    def recording_read_events():
+        for event, element in read_events():
+            seen.append(element)
+            yield event, element
+    
+    parser.parser.read_events = recording_read_events
+    for chunk in chunks(FEED, 16):
+        parser.feed(chunk)
+    entries = parser.close()
+    
+    entry_elements = [element for element in seen if element.tag == f"{ATOM}entry"]
+    assert len(entries) == len(entry_elements) == 2
+    assert all(len(element) == 0 for element in entry_elements)
+
+class FakeResponse:
+    def __init__(self, status: int):
+        self.status = status
+        self.headers = {"ETag": '"v1"', "Last-Modified": "Thu, 01 Feb 2024 10:00:00 GMT"}
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        return False
+    
+    @property
+    def content(self):
+        return self
+    
+    async def iter_chunked(self, size: int):
+        for chunk in chunks(FEED, size):
+            yield chunk
+
+class FakeSession:
+    def __init__(self):
+        self.requests = []
+    
+    def get(self, url, params=None, headers=None):
+        self.requests.append(headers)
+        return FakeResponse(304 if headers else 200)
+
+class FakeHTTPService:
+    def __init__(self):
+        self.session = FakeSession()
+
+def make_cog() -> YouTubeNotifications:
+    """Create the cog without a bot, with just the state the feed reader uses"""
+    cog = YouTubeNotifications.__new__(YouTubeNotifications)
+    cog.config = {"channels": {}, "requests_per_second": 100}
+    cog.feed_state = {}
+    cog.buckets = {}
+    cog.http_service = FakeHTTPService()
+    return cog
+
+def test_feed_video_ids_sorted_by_published_date():
+    cog = make_cog()
+    
+    # The fixture lists the older upload first
+    assert asyncio.run(cog.get_feed_video_ids("UCabc")) == ["BBB", "AAA"]
+
+def test_unchanged_feed_uses_conditional_request():
+    cog = make_cog()
+    
+    async def poll_twice():
+        return await cog.get_feed_video_ids("UCabc"), await cog.get_feed_video_ids("UCabc")
+    
+    first, second = asyncio.run(poll_twice())
+    assert first == second == ["BBB", "AAA"]
+    assert cog.http_service.session.requests == [
+        {},
+        {"If-None-Match": '"v1"', "If-Modified-Since": "Thu, 01 Feb 2024 10:00:00 GMT"}
+    ]
+
+class FakeMessage:
+    def __init__(self, content):
+        self.content = content
+    
+    async def edit(self, content=None, embed=None):
+        self.content = content
+
+class FakeDiscordChannel:
+    mention = "#uploads"
+    
+    def __init__(self):
+        self.sent = []
+    
+    async def send(self, content=None, embed=None):
+        self.sent.append((content, embed))
+        return FakeMessage(content)
+
+def test_force_notification_works_in_feed_mode_without_api_key():
+    cog = make_cog()
+    cog.config["channels"]["UCabc"] = {"name": "XGC", "discord_channel_id": 1}
+    channel = FakeDiscordChannel()
+    cog.bot = type("Bot", (), {"get_channel": lambda self, channel_id: channel})()
+    
+    asyncio.run(cog.force_notification.callback(cog, channel, "UCabc"))
+    
+    # The status message goes to the same fake channel, so only embeds are compared
+    assert [embed.url for _, embed in channel.sent if embed] == ["https://www.youtube.com/watch?v=BBB"]
+    
+    # api mode still needs a key
+    channel.sent.clear()
+    cog.config["detection_mode"] = "api"
+    asyncio.run(cog.force_notification.callback(cog, channel, "UCabc"))
+    assert [content for content, _ in channel.sent] == [
+        "❌ YouTube API key not set. Please set one with `!youtube setapikey <key>` or switch to `!youtube setmode feed`."
+    ]
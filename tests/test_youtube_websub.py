@@ -0,0 +1,182 @@
+import asyncio
+import contextlib
+import os
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from cogs.youtube_notifications import YouTubeNotifications
+from websub_hub import FakeHub
+
+FEED_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "feed.xml")
+TOPIC = "https://www.youtube.com/xml/feeds/videos.xml?channel_id=UCabc"
+SECRET = "s3cret"
+
+with open(FEED_PATH, 'rb') as f:
+    FEED = f.read()
+
+class FakeChannel:
+    def __init__(self):
+        self.sent = []
+    
+    async def send(self, content, embed=None):
+        self.sent.append(embed)
+
+class FakeBot:
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.channel = FakeChannel()
+    
+    def get_channel(self, channel_id):
+        return self.channel
+    
+    async def wait_until_ready(self):
+        await asyncio.Event().wait()
+
+def callback_app(cog: YouTubeNotifications) -> web.Application:
+    """Stand-in for the bot's web server route: handle_websub runs on a worker thread, like under Flask"""
+    async def websub(request: web.Request) -> web.Response:
+        body = await request.read()
+        text, status = await asyncio.get_running_loop().run_in_executor(
+            None, cog.handle_websub, request.method, request.query, request.headers, body
+        )
+        return web.Response(text=text, status=status)
+    
+    app = web.Application()
+    app.router.add_route("*", "/youtube/websub", websub)
+    return app
+
+@contextlib.asynccontextmanager
+async def push_setup():
+    """Yield a cog subscribed to UCabc through a local hub, and the hub"""
+    hub = FakeHub()
+    await hub.start()
+    bot = FakeBot()
+    cog = YouTubeNotifications(bot)
+    callback = TestServer(callback_app(cog))
+    await callback.start_server()
+    
+    cog.config.update({
+        "websub_hub": hub.url,
+        "websub_callback_url": str(callback.make_url("/youtube/websub")),
+        "websub_secret": SECRET,
+        "channels": {
+            "UCabc": {
+                "name": "XGC",
+                "last_video_id": "AAA",
+                "last_published": "2024-01-01T10:00:00+00:00",
+                "discord_channel_id": 1
+            }
+        }
+    })
+    try:
+        yield cog, hub
+    finally:
+        await hub.close()
+        await callback.close()
+        await cog.cog_unload()
+
+async def settle():
+    """Let notifications handed to the event loop finish"""
+    for _ in range(20):
+        await asyncio.sleep(0.01)
+
+def test_subscription_challenge_is_echoed(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    
+    async def scenario():
+        async with push_setup() as (cog, hub):
+            assert await cog.subscribe("UCabc")
+            await hub.settle()
+            assert hub.verifications == [("subscribe", TOPIC, 200, True)]
+            assert TOPIC in hub.subscriptions
+            assert cog.config["channels"]["UCabc"]["websub_expires"] > 0
+    
+    asyncio.run(scenario())
+
+def test_subscription_for_untracked_channel_is_refused(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    
+    async def scenario():
+        async with push_setup() as (cog, hub):
+            assert await cog.subscribe("UCother")
+            await hub.settle()
+            assert hub.verifications == [("subscribe", cog.topic_url("UCother"), 404, False)]
+            assert not hub.subscriptions
+    
+    asyncio.run(scenario())
+
+def test_signed_notification_is_announced(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    
+    async def scenario():
+        async with push_setup() as (cog, hub):
+            await cog.subscribe("UCabc")
+            await hub.settle()
+            assert await hub.publish(TOPIC, FEED) == 204
+            await settle()
+            
+            # Only BBB is newer than the last announced upload
+            assert [embed.url for embed in cog.bot.channel.sent] == ["https://www.youtube.com/watch?v=BBB"]
+            assert cog.config["channels"]["UCabc"]["last_video_id"] == "BBB"
+    
+    asyncio.run(scenario())
+
+def test_notification_with_bad_signature_is_ignored(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    
+    async def scenario():
+        async with push_setup() as (cog, hub):
+            await cog.subscribe("UCabc")
+            await hub.settle()
+            assert await hub.publish(TOPIC, FEED, secret="wrong") == 204
+            await settle()
+            
+            assert cog.bot.channel.sent == []
+            assert cog.config["channels"]["UCabc"]["last_video_id"] == "AAA"
+    
+    asyncio.run(scenario())
+
+def test_repeated_notification_is_announced_once(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    
+    async def scenario():
+        async with push_setup() as (cog, hub):
+            await cog.subscribe("UCabc")
+            await hub.settle()
+            await hub.publish(TOPIC, FEED)
+            await hub.publish(TOPIC, FEED)
+            await settle()
+            
+            assert len(cog.bot.channel.sent) == 1
+    
+    asyncio.run(scenario())
+
+def test_malformed_lease_is_rejected(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    
+    async def scenario():
+        async with push_setup() as (cog, hub):
+            params = {"hub.mode": "subscribe", "hub.topic": TOPIC, "hub.challenge": "abc", "hub.lease_seconds": "soon"}
+            async with hub.session.get(cog.config["websub_callback_url"], params=params) as response:
+                assert response.status == 400
+            assert "websub_expires" not in cog.config["channels"]["UCabc"]
+    
+    asyncio.run(scenario())
+
+def test_notification_without_a_secret_is_rejected(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    
+    async def scenario():
+        async with push_setup() as (cog, hub):
+            await cog.subscribe("UCabc")
+            await hub.settle()
+            # A body signed with an empty key would otherwise pass the HMAC check
+            cog.config["websub_secret"] = ""
+            assert await hub.publish(TOPIC, FEED, secret="") == 403
+            await settle()
+            
+            assert cog.bot.channel.sent == []
+            assert cog.config["channels"]["UCabc"]["last_video_id"] == "AAA"
+    
+    asyncio.run(scenario())
@@ -0,0 +1,84 @@
+import asyncio
+import hashlib
+import hmac
+import secrets
+from typing import Dict, Optional
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+class FakeHub:
+    """Local WebSub hub for tests.
+    
+    Accepts (un)subscribe requests like pubsubhubbub.appspot.com, verifies
+    them by calling the subscriber's callback with a challenge, and publishes
+    notifications signed with the subscriber's secret.
+    """
+    
+    def __init__(self):
+        self.subscriptions = {}  # topic -> {"callback", "secret"}
+        self.verifications = []  # (mode, topic, status, challenge echoed)
+        self.tasks = set()
+        app = web.Application()
+        app.router.add_post("/subscribe", self.handle_subscribe)
+        self.server = TestServer(app)
+        self.session = None
+    
+    @property
+    def url(self) -> str:
+        return str(self.server.make_url("/subscribe"))
+    
+    async def start(self) -> None:
+        await self.server.start_server()
+        self.session = aiohttp.ClientSession()
+    
+    async def close(self) -> None:
+        await self.settle()
+        await self.session.close()
+        await self.server.close()
+    
+    async def handle_subscribe(self, request: web.Request) -> web.Response:
+        form = dict(await request.post())
+        if form.get("hub.mode") not in ("subscribe", "unsubscribe") or not form.get("hub.callback"):
+            return web.Response(status=400)
+        
+        # Verification is asynchronous, like the real hub's hub.verify=async
+        task = asyncio.ensure_future(self.verify(form))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return web.Response(status=202)
+    
+    async def verify(self, form: Dict[str, str]) -> None:
+        """Ask the callback to confirm the request and apply it if the challenge comes back"""
+        challenge = secrets.token_hex(8)
+        params = {
+            "hub.mode": form["hub.mode"],
+            "hub.topic": form["hub.topic"],
+            "hub.challenge": challenge,
+            "hub.lease_seconds": form.get("hub.lease_seconds", "432000")
+        }
+        async with self.session.get(form["hub.callback"], params=params) as response:
+            confirmed = response.status == 200 and await response.text() == challenge
+            self.verifications.append((form["hub.mode"], form["hub.topic"], response.status, confirmed))
+        
+        if not confirmed:
+            return
+        if form["hub.mode"] == "subscribe":
+            self.subscriptions[form["hub.topic"]] = {"callback": form["hub.callback"], "secret": form.get("hub.secret", "")}
+        else:
+            self.subscriptions.pop(form["hub.topic"], None)
+    
+    async def settle(self) -> None:
+        """Wait for pending verifications to finish"""
+        while self.tasks:
+            await asyncio.gather(*self.tasks)
+    
+    async def publish(self, topic: str, body: bytes, secret: Optional[str] = None) -> int:
+        """Deliver a notification to the topic's subscriber, signed with its secret unless another is given"""
+        subscription = self.subscriptions[topic]
+        key = subscription["secret"] if secret is None else secret
+        signature = hmac.new(key.encode(), body, hashlib.sha1).hexdigest()
+        headers = {"Content-Type": "application/atom+xml", "X-Hub-Signature": f"sha1={signature}"}
+        async with self.session.post(subscription["callback"], data=body, headers=headers) as response:
+            return response.status